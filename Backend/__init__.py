@@ -1,33 +1,128 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Green servers need the standard library patched before Flask, SQLAlchemy or
+# redis create any lock or socket. `python -m Backend.server` imports this
+# package before the server module runs, so the patching has to happen here.
+if os.getenv('SOCKETIO_ASYNC_MODE') == 'eventlet':
+    import eventlet
+    eventlet.monkey_patch()
+    try:
+        from psycogreen.eventlet import patch_psycopg
+        patch_psycopg()
+    except ImportError:
+        print("Warning: psycogreen is not installed; database calls will block the eventlet hub")
+elif os.getenv('SOCKETIO_ASYNC_MODE') == 'gevent':
+    from gevent import monkey
+    monkey.patch_all()
+    try:
+        from psycogreen.gevent import patch_psycopg
+        patch_psycopg()
+    except ImportError:
+        print("Warning: psycogreen is not installed; database calls will block the gevent hub")
+
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_socketio import SocketIO
-from dotenv import load_dotenv
-import os
 
 # Initialize extensions without app first
 db = SQLAlchemy()
 socketio = SocketIO()
-load_dotenv()
 
-def create_app():
+def create_app(start_background_tasks=True):
     app = Flask(__name__)
     app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('SQLALCHEMY_DATABASE_URI')
     app.config['SECRET_KEY'] = os.getenv('SECRET_KEY')
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    # Connection pool sized for concurrent requests, sockets and background workers
+    if not (app.config['SQLALCHEMY_DATABASE_URI'] or '').startswith('sqlite'):
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+            'pool_size': int(os.getenv('DB_POOL_SIZE', 10)),
+            'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', 20)),
+            'pool_timeout': int(os.getenv('DB_POOL_TIMEOUT_SECONDS', 30)),
+            'pool_recycle': int(os.getenv('DB_POOL_RECYCLE_SECONDS', 1800)),
+            'pool_pre_ping': True
+        }
+    # 'threading' (dev server), 'eventlet' or 'gevent'; the green modes are
+    # patched at the top of this module and served by Backend.server
+    app.config['SOCKETIO_ASYNC_MODE'] = os.getenv('SOCKETIO_ASYNC_MODE', 'threading')
     app.config['TOKEN_EXPIRATION_HOURS'] = int(os.getenv('TOKEN_EXPIRATION_HOURS', 24))
+    app.config['AUTH_TOKEN_MODE'] = os.getenv('AUTH_TOKEN_MODE', 'opaque')  # 'opaque' or 'signed'
+    app.config['TOKEN_REVOCATION_REFRESH_SECONDS'] = int(os.getenv('TOKEN_REVOCATION_REFRESH_SECONDS', 30))
+    app.config['TOKEN_CACHE_MAX_SIZE'] = int(os.getenv('TOKEN_CACHE_MAX_SIZE', 10000))
+    app.config['TOKEN_CACHE_TTL_SECONDS'] = int(os.getenv('TOKEN_CACHE_TTL_SECONDS', 60))
+    app.config['TOKEN_REAPER_INTERVAL_MINUTES'] = int(os.getenv('TOKEN_REAPER_INTERVAL_MINUTES', 15))
+    app.config['TOKEN_REAPER_BATCH_SIZE'] = int(os.getenv('TOKEN_REAPER_BATCH_SIZE', 1000))
+    app.config['EVENT_COUNTER_RECONCILE_INTERVAL_MINUTES'] = int(os.getenv('EVENT_COUNTER_RECONCILE_INTERVAL_MINUTES', 60))
+    app.config['FEED_CACHE_BACKEND'] = os.getenv('FEED_CACHE_BACKEND', 'memory')  # 'memory' or 'redis'
+    app.config['FEED_CACHE_REDIS_URL'] = os.getenv('FEED_CACHE_REDIS_URL', 'redis://localhost:6379/0')
+    app.config['FEED_CACHE_MAX_SIZE'] = int(os.getenv('FEED_CACHE_MAX_SIZE', 1000))
+    app.config['FEED_CACHE_SHARED_TTL_SECONDS'] = int(os.getenv('FEED_CACHE_SHARED_TTL_SECONDS', 30))
+    app.config['FEED_CACHE_OVERLAY_TTL_SECONDS'] = int(os.getenv('FEED_CACHE_OVERLAY_TTL_SECONDS', 300))
+    app.config['UNREAD_CACHE_MAX_SIZE'] = int(os.getenv('UNREAD_CACHE_MAX_SIZE', 10000))
+    app.config['UNREAD_CACHE_TTL_SECONDS'] = int(os.getenv('UNREAD_CACHE_TTL_SECONDS', 60))
+    app.config['CHAT_SESSION_TTL_SECONDS'] = int(os.getenv('CHAT_SESSION_TTL_SECONDS', 300))
+    app.config['CHAT_WRITE_BEHIND'] = os.getenv('CHAT_WRITE_BEHIND', 'false').lower() in ('1', 'true', 'yes')
+    app.config['CHAT_FLUSH_INTERVAL_MS'] = int(os.getenv('CHAT_FLUSH_INTERVAL_MS', 200))
+    app.config['CHAT_FLUSH_BATCH_SIZE'] = int(os.getenv('CHAT_FLUSH_BATCH_SIZE', 500))
+    app.config['CHAT_ID_BLOCK_SIZE'] = int(os.getenv('CHAT_ID_BLOCK_SIZE', 100))
+    app.config['CHAT_SPILL_DIR'] = os.getenv('CHAT_SPILL_DIR', os.path.join(app.instance_path, 'chat_spill'))
+    app.config['CHAT_SPILL_FSYNC'] = os.getenv('CHAT_SPILL_FSYNC', 'true').lower() in ('1', 'true', 'yes')
+    app.config['TYPING_EMIT_INTERVAL_MS'] = int(os.getenv('TYPING_EMIT_INTERVAL_MS', 500))
+    app.config['TYPING_TTL_SECONDS'] = int(os.getenv('TYPING_TTL_SECONDS', 5))
+    app.config['REMINDER_OFFSETS'] = os.getenv('REMINDER_OFFSETS', '24h,1h,10m')
+    app.config['REMINDER_CHECK_INTERVAL_MINUTES'] = int(os.getenv('REMINDER_CHECK_INTERVAL_MINUTES', 30))  # safety-net sweep
+    app.config['REMINDER_TIMER_RELOAD_MINUTES'] = int(os.getenv('REMINDER_TIMER_RELOAD_MINUTES', 15))
+    app.config['DIGEST_TIME'] = os.getenv('DIGEST_TIME', '09:00')
+    app.config['DIGEST_CHUNK_SIZE'] = int(os.getenv('DIGEST_CHUNK_SIZE', 1000))
+    app.config['DIGEST_EVENTS_PER_USER'] = int(os.getenv('DIGEST_EVENTS_PER_USER', 5))
+    app.config['DIGEST_CANDIDATE_EVENTS'] = int(os.getenv('DIGEST_CANDIDATE_EVENTS', 50))
+    app.config['SCHEDULER_TICK_SECONDS'] = int(os.getenv('SCHEDULER_TICK_SECONDS', 30))
+    app.config['SCHEDULER_LOCK_KEY'] = int(os.getenv('SCHEDULER_LOCK_KEY', 7310021))  # pg advisory lock id
+    app.config['NOTIFICATION_COUNTER_RECONCILE_INTERVAL_MINUTES'] = int(os.getenv('NOTIFICATION_COUNTER_RECONCILE_INTERVAL_MINUTES', 60))
+    app.config['NOTIFICATION_RETENTION_DAYS'] = int(os.getenv('NOTIFICATION_RETENTION_DAYS', 90))
+    app.config['NOTIFICATION_ARCHIVE_INTERVAL_HOURS'] = int(os.getenv('NOTIFICATION_ARCHIVE_INTERVAL_HOURS', 24))
+    # Socket.IO message queue (e.g. redis://host:6379/0) lets several server
+    # processes, and the job worker process, emit to each other's clients
+    app.config['SOCKETIO_MESSAGE_QUEUE'] = os.getenv('SOCKETIO_MESSAGE_QUEUE') or None
+    app.config['SOCKETIO_CHANNEL'] = os.getenv('SOCKETIO_CHANNEL', 'flask-socketio')
+    app.config['PRESENCE_BACKEND'] = os.getenv('PRESENCE_BACKEND', 'memory')  # 'memory' or 'redis'
+    app.config['PRESENCE_REDIS_URL'] = os.getenv('PRESENCE_REDIS_URL', app.config['SOCKETIO_MESSAGE_QUEUE'] or 'redis://localhost:6379/0')
+    app.config['PRESENCE_TTL_SECONDS'] = int(os.getenv('PRESENCE_TTL_SECONDS', 60))  # sessions of a dead process expire after this
+    app.config['JOB_WORKER_THREADS'] = int(os.getenv('JOB_WORKER_THREADS', 2))  # 0 = run `python -m Backend.worker` instead
+    app.config['JOB_POLL_INTERVAL_SECONDS'] = float(os.getenv('JOB_POLL_INTERVAL_SECONDS', 1))
+    app.config['JOB_MAX_ATTEMPTS'] = int(os.getenv('JOB_MAX_ATTEMPTS', 5))
+    app.config['JOB_BACKOFF_BASE_SECONDS'] = int(os.getenv('JOB_BACKOFF_BASE_SECONDS', 10))
+    app.config['JOB_BACKOFF_MAX_SECONDS'] = int(os.getenv('JOB_BACKOFF_MAX_SECONDS', 600))
+    app.config['JOB_LOCK_TIMEOUT_SECONDS'] = int(os.getenv('JOB_LOCK_TIMEOUT_SECONDS', 300))
+    app.config['JOB_RETENTION_DAYS'] = int(os.getenv('JOB_RETENTION_DAYS', 7))
 
     # Initialize extensions with app
     db.init_app(app)
+    from Backend.utils.token_cache import token_cache
+    token_cache.init_app(app)
+    from Backend.utils.feed_cache import feed_cache
+    feed_cache.init_app(app)
+    from Backend.utils.unread_cache import unread_counts
+    unread_counts.init_app(app)
+    from Backend.utils.presence_store import presence
+    presence.init_app(app)
+    from Backend.utils.chat_sessions import chat_sessions
+    chat_sessions.init_app(app)
     socketio.init_app(app, 
                      cors_allowed_origins="*",
-                     async_mode='threading',
+                     async_mode=app.config['SOCKETIO_ASYNC_MODE'],
                      logger=False,
                      engineio_logger=False,
                      ping_timeout=60,
                      ping_interval=25,
                      transports=['polling', 'websocket'],
                      allow_upgrades=True,
-                     manage_session=False)
+                     manage_session=False,
+                     message_queue=app.config['SOCKETIO_MESSAGE_QUEUE'],
+                     channel=app.config['SOCKETIO_CHANNEL'])
     
     with app.app_context():
         # Import all models to ensure they're registered
@@ -50,6 +145,14 @@ def create_app():
             except Exception as fallback_error:
                 print(f"Error: Could not create tables: {str(fallback_error)}")
         
+        # Load the signed-token revocation list
+        try:
+            from Backend.services.signed_token_service import revocation_list
+            revocation_list.refresh_seconds = app.config['TOKEN_REVOCATION_REFRESH_SECONDS']
+            revocation_list.load()
+        except Exception as e:
+            print(f"Warning: Could not load token revocation list: {str(e)}")
+        
         # Register blueprints
         from Backend.routes.auth import auth_bp
         from Backend.routes.events import events_bp
@@ -94,12 +197,99 @@ def create_app():
         from Backend import socket_handlers
         print("✓ Socket handlers imported and registered")
         
-        # Start reminder scheduler
+        if not start_background_tasks:
+            return app
+        
+        # Start in-process job workers
+        try:
+            from .tasks.job_queue import job_workers
+            job_workers.init_app(app)
+            print(f"✓ Job workers started ({app.config['JOB_WORKER_THREADS']} threads)")
+        except Exception as e:
+            print(f"Warning: Could not start job workers: {str(e)}")
+        
+        # Start the typing indicator emitter
+        try:
+            from .utils.typing_presence import typing_presence
+            typing_presence.init_app(app, socketio)
+            print("✓ Typing presence emitter started")
+        except Exception as e:
+            print(f"Warning: Could not start typing presence emitter: {str(e)}")
+        
+        # Start write-behind chat persistence (replays spilled messages first)
+        try:
+            from .tasks.chat_writer import chat_writer
+            chat_writer.init_app(app)
+            if chat_writer.enabled:
+                print("✓ Chat write-behind flusher started")
+        except Exception as e:
+            print(f"Warning: Could not start chat write-behind, writing chat messages synchronously: {str(e)}")
+        
+        # Periodic jobs share one scheduler thread bound to this app; only the
+        # process holding the scheduler lock runs them
+        from .tasks.scheduler import scheduler
+        scheduler.init_app(app)
+        
+        try:
+            from .tasks.reminder_scheduler import schedule_reminders
+            schedule_reminders(
+                scheduler,
+                interval_minutes=app.config['REMINDER_CHECK_INTERVAL_MINUTES'],
+                digest_at=app.config['DIGEST_TIME']
+            )
+        except Exception as e:
+            print(f"Warning: Could not schedule reminders: {str(e)}")
+        
+        try:
+            from .tasks.token_reaper import schedule_token_reaper
+            schedule_token_reaper(
+                scheduler,
+                interval_minutes=app.config['TOKEN_REAPER_INTERVAL_MINUTES'],
+                batch_size=app.config['TOKEN_REAPER_BATCH_SIZE']
+            )
+        except Exception as e:
+            print(f"Warning: Could not schedule token reaper: {str(e)}")
+        
+        try:
+            from .tasks.event_counter_reconciler import schedule_event_counter_reconciler
+            schedule_event_counter_reconciler(
+                scheduler,
+                interval_minutes=app.config['EVENT_COUNTER_RECONCILE_INTERVAL_MINUTES']
+            )
+        except Exception as e:
+            print(f"Warning: Could not schedule event counter reconciler: {str(e)}")
+        
+        try:
+            from .tasks.notification_counter_reconciler import schedule_notification_counter_reconciler
+            schedule_notification_counter_reconciler(
+                scheduler,
+                interval_minutes=app.config['NOTIFICATION_COUNTER_RECONCILE_INTERVAL_MINUTES']
+            )
+        except Exception as e:
+            print(f"Warning: Could not schedule notification counter reconciler: {str(e)}")
+        
+        try:
+            from .tasks.notification_archiver import schedule_notification_archiver
+            schedule_notification_archiver(
+                scheduler,
+                interval_hours=app.config['NOTIFICATION_ARCHIVE_INTERVAL_HOURS'],
+                retention_days=app.config['NOTIFICATION_RETENTION_DAYS']
+            )
+        except Exception as e:
+            print(f"Warning: Could not schedule notification archiver: {str(e)}")
+        
+        try:
+            scheduler.start()
+            print(f"✓ Scheduler started ({len(scheduler.jobs)} jobs)")
+        except Exception as e:
+            print(f"Warning: Could not start scheduler: {str(e)}")
+        
+        # Fire event reminders at their exact time; reminders.due above is the fallback sweep
         try:
-            from .tasks.reminder_scheduler import start_reminder_scheduler
-            start_reminder_scheduler()
-            print("✓ Reminder scheduler started")
+            from .tasks.reminder_timer import reminder_timer
+            reminder_timer.init_app(app)
+            print("✓ Reminder timer started")
         except Exception as e:
-            print(f"Warning: Could not start reminder scheduler: {str(e)}")
+            print(f"Warning: Could not start reminder timer: {str(e)}")
     
     return app
\ No newline at end of file
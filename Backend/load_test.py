@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Server mode load test
+Starts Backend.server once per SOCKETIO_ASYNC_MODE on its own port, then
+opens concurrent Socket.IO clients and hammers a REST endpoint from a thread
+pool. Prints connections established, connect latency and requests/second
+per mode. Needs a reachable database and the packages in test_requirements.txt;
+each server's output is kept in --log-dir.
+
+Usage:
+    python Backend/load_test.py [--clients 200] [--requests 2000] [--path /api/admin/events/recent]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import socketio
+
+MODES = [('threading', 7101), ('eventlet', 7102), ('gevent', 7103)]
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def start_server(mode, port, log_dir):
+    """Start Backend.server; its output goes to <log_dir>/<mode>.log and is shown if it fails to start"""
+    env = dict(os.environ, SOCKETIO_ASYNC_MODE=mode, PORT=str(port), HOST='127.0.0.1')
+    log_path = os.path.join(log_dir, f'{mode}.log')
+    with open(log_path, 'w') as log:
+        process = subprocess.Popen(
+            [sys.executable, '-m', 'Backend.server'], cwd=ROOT, env=env,
+            stdout=log, stderr=subprocess.STDOUT
+        )
+    url = f'http://127.0.0.1:{port}'
+    for _ in range(60):
+        if process.poll() is not None:
+            break
+        try:
+            urllib.request.urlopen(url + '/', timeout=1)
+        except urllib.error.HTTPError:
+            return process, url
+        except Exception:
+            time.sleep(0.5)
+            continue
+        return process, url
+    process.terminate()
+    process.wait()
+    with open(log_path) as log:
+        output = ''.join(log.readlines()[-20:])
+    raise RuntimeError(f"{mode} server did not start on port {port} (log: {log_path})\n{output}")
+
+def connect_client(url):
+    client = socketio.Client(reconnection=False)
+    started = time.perf_counter()
+    try:
+        client.connect(url, transports=['websocket'], wait_timeout=10)
+        return client, time.perf_counter() - started
+    except Exception:
+        return None, None
+
+def socket_test(url, clients):
+    with ThreadPoolExecutor(max_workers=min(clients, 100)) as pool:
+        results = list(pool.map(lambda _: connect_client(url), range(clients)))
+    connected = [client for client, _ in results if client]
+    latencies = sorted(latency for _, latency in results if latency is not None)
+    for client in connected:
+        client.disconnect()
+    p95 = latencies[int(len(latencies) * 0.95) - 1] if latencies else None
+    return len(connected), p95
+
+def rest_test(url, requests, path):
+    def fetch(_):
+        try:
+            urllib.request.urlopen(url + path, timeout=10).read()
+            return True
+        except Exception:
+            return False
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=50) as pool:
+        ok = sum(pool.map(fetch, range(requests)))
+    return ok, requests / (time.perf_counter() - started)
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare server async modes')
+    parser.add_argument('--clients', type=int, default=200)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--path', default='/api/admin/events/recent')
+    parser.add_argument('--log-dir', default=tempfile.gettempdir())
+    args = parser.parse_args()
+
+    for mode, port in MODES:
+        print(f"\n=== {mode} (port {port}) ===")
+        try:
+            process, url = start_server(mode, port, args.log_dir)
+        except Exception as e:
+            print(f"❌ {str(e)}")
+            continue
+        try:
+            connected, p95 = socket_test(url, args.clients)
+            print(f"Sockets: {connected}/{args.clients} connected, p95 connect {p95 or 0:.3f}s")
+            ok, rate = rest_test(url, args.requests, args.path)
+            print(f"REST: {ok}/{args.requests} ok, {rate:.1f} req/s")
+        finally:
+            process.terminate()
+            process.wait()
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
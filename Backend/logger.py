@@ -1,33 +1,88 @@
+import atexit
+import json
 import os
+import queue
 import sys
 import threading
+import time
 from datetime import datetime
 
+LEVELS = {'DEBUG': 10, 'INFO': 20, 'WARN': 30, 'ERROR': 40}
+STOP = None  # queued by close(): the writer exits after the lines before it
+
 class Logger:
+    """
+    Process-wide buffered logger.
+    Calls only format the line and put it on a bounded queue; a background
+    writer thread appends batches to the log file, kept open, and rotates it
+    by size and age. When the writer falls behind and the queue is full, new
+    lines are dropped and counted instead of growing memory or blocking the
+    request. Settings come from the environment:
+
+        LOG_FILE (combined.log), LOG_LEVEL (INFO), LOG_FORMAT (text | json),
+        LOG_MAX_BYTES (10 MB), LOG_BACKUP_COUNT (5), LOG_ROTATE_HOURS (24, 0 = off),
+        LOG_QUEUE_SIZE (10000), LOG_FLUSH_INTERVAL_MS (200)
+    """
     _instance = None
     _lock = threading.Lock()
+    _writer_lock = threading.Lock()  # separate: __new__ logs while holding _lock
 
     def __new__(cls):
         if cls._instance is None:
             with cls._lock:
                 if cls._instance is None:  # Double-checked locking to ensure thread safety
                     cls._instance = super().__new__(cls)
-                    cls._instance.log_file_path = os.path.join('.', 'combined.log')
+                    cls._instance._configure()
                     cls._instance._initialize_logger()
         return cls._instance
 
+    def _configure(self):
+        self.log_file_path = os.getenv('LOG_FILE', os.path.join('.', 'combined.log'))
+        self.level = LEVELS.get(os.getenv('LOG_LEVEL', 'INFO').upper(), LEVELS['INFO'])
+        self.json_format = os.getenv('LOG_FORMAT', 'text').lower() == 'json'
+        self.max_bytes = int(os.getenv('LOG_MAX_BYTES', 10 * 1024 * 1024))
+        self.backup_count = int(os.getenv('LOG_BACKUP_COUNT', 5))
+        self.rotate_seconds = float(os.getenv('LOG_ROTATE_HOURS', 24)) * 3600
+        self.flush_interval = int(os.getenv('LOG_FLUSH_INTERVAL_MS', 200)) / 1000
+        self._queue = queue.Queue(maxsize=int(os.getenv('LOG_QUEUE_SIZE', 10000)))
+        self._file = None
+        self._opened_at = None
+        self._writer = None
+        self._pid = None
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()  # request threads count, the writer resets
+        self.written = 0
+        atexit.register(self.close)
+
     def _initialize_logger(self):
         self.info(f"App started on process id: {os.getpid()}")
 
     def _log(self, message, level):
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        log_message = f"{timestamp} [{level}]: {message}\n"
+        if LEVELS[level] < self.level:
+            return
+        if self._pid != os.getpid():
+            self._start_writer()
+
+        now = datetime.now()
+        if self.json_format:
+            line = json.dumps({
+                'timestamp': now.isoformat(timespec='milliseconds'),
+                'level': level,
+                'message': str(message),
+                'pid': self._pid,
+                'thread': threading.current_thread().name
+            }, default=str)
+        else:
+            line = f"{now.strftime('%Y-%m-%d %H:%M:%S')} [{level}]: {message}"
 
         try:
-            with open(self.log_file_path, 'a') as log_file:
-                log_file.write(log_message)
-        except IOError as e:
-            print(f"Error writing to log file: {e}", file=sys.stderr)
+            self._queue.put_nowait(line + "\n")
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped += 1
+
+    def debug(self, message):
+        self._log(message, 'DEBUG')
 
     def info(self, message):
         self._log(message, 'INFO')
@@ -37,3 +92,111 @@ class Logger:
 
     def error(self, message):
         self._log(message, 'ERROR')
+
+    def flush(self, timeout=5):
+        """Wait until everything queued so far is written"""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def close(self):
+        """Flush, stop the writer and close the file (registered with atexit)"""
+        with self._writer_lock:
+            writer = self._writer
+            if writer is not None and self._pid == os.getpid():
+                self.flush()
+                try:
+                    self._queue.put(STOP, timeout=1)
+                except queue.Full:
+                    pass
+                writer.join(timeout=5)
+                if writer.is_alive():
+                    return  # still writing: closing the file under it would kill it
+                # A later call starts a new writer
+                self._writer = None
+                self._pid = None
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def stats(self):
+        return {
+            'queued': self._queue.qsize(),
+            'written': self.written,
+            'dropped': self.dropped,
+            'level': next(name for name, value in LEVELS.items() if value == self.level),
+            'format': 'json' if self.json_format else 'text'
+        }
+
+    def _start_writer(self):
+        # Also runs after a fork: the parent's writer thread does not exist in the child
+        with self._writer_lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._file = None
+            self._writer = threading.Thread(target=self._run_writer, daemon=True, name='log-writer')
+            self._writer.start()
+
+    def _run_writer(self):
+        stopping = False
+        while not stopping:
+            try:
+                lines = [self._queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                continue
+            # Drain whatever else is waiting so one write covers the batch
+            while len(lines) < 1000 and lines[-1] is not STOP:
+                try:
+                    lines.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            queued = len(lines)
+            if lines[-1] is STOP:
+                stopping = True
+                lines.pop()
+
+            with self._dropped_lock:
+                dropped, self.dropped = self.dropped, 0
+            if dropped:
+                lines.append(f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} [WARN]: Logger dropped {dropped} messages (queue full)\n")
+            if lines:
+                self._write(''.join(lines))
+            for _ in range(queued):
+                self._queue.task_done()
+
+    def _write(self, data):
+        try:
+            if self._file is None:
+                self._open()
+            elif self._should_rotate(len(data)):
+                self._rotate()
+            self._file.write(data)
+            self._file.flush()
+            self.written += data.count("\n")
+        except (IOError, OSError) as e:
+            print(f"Error writing to log file: {e}", file=sys.stderr)
+            self._file = None
+
+    def _open(self):
+        self._file = open(self.log_file_path, 'a', encoding='utf-8')
+        self._opened_at = time.time()
+
+    def _should_rotate(self, incoming):
+        if self.max_bytes and self._file.tell() + incoming > self.max_bytes:
+            return True
+        return bool(self.rotate_seconds) and time.time() - self._opened_at >= self.rotate_seconds
+
+    def _rotate(self):
+        """combined.log -> combined.log.1 -> ... -> combined.log.<backup_count>"""
+        self._file.close()
+        if self.backup_count:
+            for index in range(self.backup_count - 1, 0, -1):
+                source = f"{self.log_file_path}.{index}"
+                if os.path.exists(source):
+                    os.replace(source, f"{self.log_file_path}.{index + 1}")
+            if os.path.exists(self.log_file_path):
+                os.replace(self.log_file_path, f"{self.log_file_path}.1")
+        else:
+            open(self.log_file_path, 'w').close()
+        self._open()
\ No newline at end of file
@@ -1,19 +1,102 @@
 from flask import request, jsonify
 from functools import wraps
+from sqlalchemy.orm import joinedload
 from Backend.models.auth_token import AuthToken
+from Backend.models.user import User
+from Backend.services.signed_token_service import SignedTokenService
+from Backend.utils.token_cache import token_cache
 from datetime import datetime
 
-def verify_token(token):
-    """Return the user if token is valid, else None."""
+class LazyUser:
+    """
+    The authenticated user, handed to routes as current_user.
+    user_id comes from the token entry; the User row is loaded on the first
+    access to any other attribute, so routes that only need
+    current_user.user_id make no users query.
+    """
+    __slots__ = ('user_id', '_user')
+
+    def __init__(self, user_id):
+        self.user_id = user_id
+        self._user = None
+
+    def __getattr__(self, name):
+        if self._user is None:
+            self._user = User.query.get(self.user_id)
+        return getattr(self._user, name)
+
+    def __repr__(self):
+        return f"<LazyUser {self.user_id}>"
+
+def resolve_token(token):
+    """
+    Return the resolved identity for a token, or None if the token is unknown.
+
+    The entry is a dict with user_id, expires_at, role, is_admin and is_active.
+    Lookups go through the shared token cache; on a miss the token, its user and
+    the role profile are loaded in a single query and cached until expiry.
+    In signed mode (AUTH_TOKEN_MODE=signed) signed tokens are verified from
+    their payload without touching the database.
+    Expiry is left to the caller so it can report "Token expired" separately.
+    """
     if not token:
         return None
 
-    stored_token = AuthToken.query.filter_by(token=token).first()
-    if not stored_token:
+    if SignedTokenService.is_enabled() and SignedTokenService.looks_signed(token):
+        payload = SignedTokenService.decode(token)
+        if not payload:
+            return None
+        return {
+            'user_id': payload['uid'],
+            'expires_at': payload['expires_at'],
+            'role': payload['role'],
+            'is_admin': payload['adm'],
+            'is_active': True
+        }
+
+    entry = token_cache.get(token)
+    if entry:
+        return entry
+
+    stored_token = AuthToken.find_by_token(token).options(
+        joinedload(AuthToken.user).joinedload(User.student),
+        joinedload(AuthToken.user).joinedload(User.faculty),
+        joinedload(AuthToken.user).joinedload(User.admin)
+    ).first()
+
+    if not stored_token or not stored_token.user:
         return None
-    if stored_token.expires_at < datetime.utcnow():
+
+    user = stored_token.user
+    if user.student:
+        role = 'student'
+    elif user.faculty:
+        role = 'faculty'
+    elif user.admin:
+        role = 'admin'
+    else:
+        role = None
+
+    entry = {
+        'user_id': user.user_id,
+        'expires_at': stored_token.expires_at or datetime.max,
+        'role': role,
+        'is_admin': user.admin is not None,
+        'is_active': user.is_active
+    }
+
+    if entry['expires_at'] >= datetime.utcnow():
+        token_cache.set(token, entry)
+    return entry
+
+def verify_token(token):
+    """Return the user (a LazyUser) if token is valid, else None."""
+    entry = resolve_token(token)
+    if not entry:
+        return None
+    if entry['expires_at'] < datetime.utcnow() or not entry['is_active']:
         return None
-    return stored_token.user
+    return LazyUser(entry['user_id'])
 
 def validate_auth_header():
     """Shared validation logic for auth headers"""
@@ -52,23 +135,32 @@ def token_required(f):
         if error_response:
             return error_response, status_code
 
-        stored_token = AuthToken.query.filter_by(token=token).first()
+        entry = resolve_token(token)
         
-        if not stored_token:
+        if not entry:
             return jsonify({
                 "success": False,
                 "error": "Invalid token",
                 "status_code": 401
             }), 401
 
-        if stored_token.expires_at < datetime.utcnow():
+        if entry['expires_at'] < datetime.utcnow():
             return jsonify({
                 "success": False,
                 "error": "Token expired",
                 "status_code": 401
             }), 401
+
+        if not entry['is_active']:
+            return jsonify({
+                "success": False,
+                "error": "Account is inactive",
+                "status_code": 401
+            }), 401
         
-        request.current_user = stored_token.user
+        request.auth_token = token
+        request.auth_entry = entry
+        request.current_user = LazyUser(entry['user_id'])
         return f(request.current_user, **kwargs)  # Only pass kwargs
     return decorated
 
@@ -79,23 +171,30 @@ def admin_required(f):
         if error_response:
             return error_response, status_code
 
-        stored_token = AuthToken.query.filter_by(token=token).first()
+        entry = resolve_token(token)
         
-        if not stored_token:
+        if not entry:
             return jsonify({
                 "success": False,
                 "error": "Invalid token",
                 "status_code": 401
             }), 401
 
-        if stored_token.expires_at < datetime.utcnow():
+        if entry['expires_at'] < datetime.utcnow():
             return jsonify({
                 "success": False,
                 "error": "Token expired",
                 "status_code": 401
             }), 401
 
-        if not stored_token.user.admin:
+        if not entry['is_active']:
+            return jsonify({
+                "success": False,
+                "error": "Account is inactive",
+                "status_code": 401
+            }), 401
+
+        if not entry['is_admin']:
             return jsonify({
                 "success": False,
                 "error": "Admin privileges required",
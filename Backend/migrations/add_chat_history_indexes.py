@@ -0,0 +1,44 @@
+"""
+Migration to add the composite indexes behind keyset-paginated chat history
+
+Usage:
+    python -m Backend.migrations.add_chat_history_indexes
+"""
+from sqlalchemy import text
+from Backend import db, create_app
+
+CHAT_HISTORY_INDEXES = {
+    'event_chats': (
+        'idx_event_chat_window',
+        "CREATE INDEX idx_event_chat_window ON event_chats (event_id, chat_type, timestamp, id)"
+    ),
+    'club_chats': (
+        'idx_club_chat_window',
+        "CREATE INDEX idx_club_chat_window ON club_chats (club_id, sent_at, message_id)"
+    ),
+}
+
+def migrate_chat_history_indexes():
+    """Create the chat history indexes that do not exist yet"""
+    app = create_app()
+
+    with app.app_context():
+        try:
+            inspector = db.inspect(db.engine)
+
+            for table, (index_name, statement) in CHAT_HISTORY_INDEXES.items():
+                existing_indexes = [idx['name'] for idx in inspector.get_indexes(table)]
+                if index_name not in existing_indexes:
+                    print(f"Executing: {statement}")
+                    db.session.execute(text(statement))
+
+            db.session.commit()
+            print("✅ Chat history index migration completed successfully")
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Migration failed: {str(e)}")
+            raise e
+
+if __name__ == "__main__":
+    migrate_chat_history_indexes()
@@ -0,0 +1,28 @@
+"""
+Migration to create the digest_runs checkpoint table
+create_app() creates the table if it is missing; this script does the same
+for deployments that run migrations explicitly.
+
+Usage:
+    python -m Backend.migrations.add_digest_runs
+"""
+from Backend import db, create_app
+
+def migrate_digest_runs():
+    """Create digest_runs"""
+    app = create_app(start_background_tasks=False)
+
+    with app.app_context():
+        try:
+            from Backend.models.digest_run import DigestRun
+
+            DigestRun.__table__.create(db.engine, checkfirst=True)
+            print("✅ digest_runs table ready")
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Migration failed: {str(e)}")
+            raise e
+
+if __name__ == "__main__":
+    migrate_digest_runs()
\ No newline at end of file
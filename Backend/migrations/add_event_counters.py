@@ -0,0 +1,31 @@
+"""
+Migration to create and backfill the event_counters table
+create_app() creates the table if it is missing; this script fills it with
+the current registration/approved/attendance/feedback/message counts.
+
+Usage:
+    python -m Backend.migrations.add_event_counters
+"""
+from Backend import db, create_app
+
+def migrate_event_counters():
+    """Backfill event_counters from the source tables"""
+    app = create_app()
+
+    with app.app_context():
+        try:
+            from Backend.models.event_counters import EventCounters
+            from Backend.tasks.event_counter_reconciler import reconcile_event_counters
+
+            EventCounters.__table__.create(db.engine, checkfirst=True)
+
+            repaired = reconcile_event_counters()
+            print(f"✅ Event counters backfilled for {repaired} events")
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Migration failed: {str(e)}")
+            raise e
+
+if __name__ == "__main__":
+    migrate_event_counters()
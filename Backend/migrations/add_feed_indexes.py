@@ -0,0 +1,44 @@
+"""
+Migration to add the composite indexes behind the keyset-paginated social feed
+
+Usage:
+    python -m Backend.migrations.add_feed_indexes
+"""
+from sqlalchemy import text
+from Backend import db, create_app
+
+FEED_INDEXES = {
+    'events': (
+        'idx_event_feed',
+        "CREATE INDEX idx_event_feed ON events (approval_status, event_date, event_id)"
+    ),
+    'admin_postings': (
+        'idx_admin_posting_feed',
+        "CREATE INDEX idx_admin_posting_feed ON admin_postings (is_pinned, created_at, posting_id)"
+    ),
+}
+
+def migrate_feed_indexes():
+    """Create the feed indexes that do not exist yet"""
+    app = create_app()
+
+    with app.app_context():
+        try:
+            inspector = db.inspect(db.engine)
+
+            for table, (index_name, statement) in FEED_INDEXES.items():
+                existing_indexes = [idx['name'] for idx in inspector.get_indexes(table)]
+                if index_name not in existing_indexes:
+                    print(f"Executing: {statement}")
+                    db.session.execute(text(statement))
+
+            db.session.commit()
+            print("✅ Feed index migration completed successfully")
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Migration failed: {str(e)}")
+            raise e
+
+if __name__ == "__main__":
+    migrate_feed_indexes()
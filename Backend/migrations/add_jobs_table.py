@@ -0,0 +1,33 @@
+"""
+Migration to create the background jobs table and its claim index
+create_app() also creates the table on a fresh database; this script is for
+existing deployments.
+
+Usage:
+    python -m Backend.migrations.add_jobs_table
+"""
+from Backend import db, create_app
+
+def migrate_jobs_table():
+    """Create the jobs table if it does not exist yet"""
+    app = create_app(start_background_tasks=False)
+
+    with app.app_context():
+        try:
+            from Backend.models.job import Job
+
+            inspector = db.inspect(db.engine)
+            if 'jobs' in inspector.get_table_names():
+                print("✅ jobs table already exists")
+                return
+
+            Job.__table__.create(db.engine, checkfirst=True)
+            print("✅ jobs table created")
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Migration failed: {str(e)}")
+            raise e
+
+if __name__ == "__main__":
+    migrate_jobs_table()
\ No newline at end of file
@@ -0,0 +1,31 @@
+"""
+Migration to create and backfill the notification_counters table
+create_app() creates the table if it is missing; this script fills it with
+every user's current unread direct-notification count.
+
+Usage:
+    python -m Backend.migrations.add_notification_counters
+"""
+from Backend import db, create_app
+
+def migrate_notification_counters():
+    """Backfill notification_counters from the notifications table"""
+    app = create_app(start_background_tasks=False)
+
+    with app.app_context():
+        try:
+            from Backend.models.notification_counter import NotificationCounter
+            from Backend.tasks.notification_counter_reconciler import reconcile_notification_counters
+
+            NotificationCounter.__table__.create(db.engine, checkfirst=True)
+
+            repaired = reconcile_notification_counters()
+            print(f"✅ Notification counters backfilled for {repaired} users")
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Migration failed: {str(e)}")
+            raise e
+
+if __name__ == "__main__":
+    migrate_notification_counters()
\ No newline at end of file
@@ -0,0 +1,77 @@
+"""
+Migration for notification listing and retention
+Makes notifications.is_read NOT NULL (NULL rows become unread), adds the
+inbox indexes used by keyset / unread listing and mark-all-read and the
+retention index used by the archiver, and creates the notifications_archive
+cold table.
+
+Usage:
+    python -m Backend.migrations.add_notification_indexes
+"""
+from sqlalchemy import text
+from Backend import db, create_app
+
+NOTIFICATION_INDEXES = [
+    (
+        'idx_notification_user_created',
+        "CREATE INDEX idx_notification_user_created ON notifications (user_id, created_at DESC, notification_id DESC)"
+    ),
+    (
+        'idx_notification_user_unread',
+        "CREATE INDEX idx_notification_user_unread ON notifications (user_id, is_read, created_at DESC, notification_id DESC)"
+    ),
+    (
+        'idx_notification_read_created',
+        "CREATE INDEX idx_notification_read_created ON notifications (created_at, notification_id) WHERE is_read = TRUE"
+    ),
+]
+
+def migrate_notification_indexes():
+    """Tighten is_read, create the missing indexes and the archive table"""
+    app = create_app(start_background_tasks=False)
+
+    with app.app_context():
+        try:
+            from Backend.models.notification_archive import NotificationArchive
+
+            inspector = db.inspect(db.engine)
+            is_sqlite = db.engine.dialect.name == 'sqlite'
+
+            updated = db.session.execute(text(
+                "UPDATE notifications SET is_read = FALSE WHERE is_read IS NULL"
+            )).rowcount
+            print(f"Backfilled is_read on {updated} notifications")
+
+            if not is_sqlite:
+                print("Executing: ALTER TABLE notifications ALTER COLUMN is_read SET DEFAULT FALSE, ALTER COLUMN is_read SET NOT NULL")
+                db.session.execute(text(
+                    "ALTER TABLE notifications ALTER COLUMN is_read SET DEFAULT FALSE, "
+                    "ALTER COLUMN is_read SET NOT NULL"
+                ))
+
+            existing_indexes = {idx['name']: idx['column_names'] for idx in inspector.get_indexes('notifications')}
+            for index_name, statement in NOTIFICATION_INDEXES:
+                if index_name in existing_indexes and 'notification_id' not in existing_indexes[index_name]:
+                    # Earlier shape without the ORDER BY tie-breaker: the planner skips it
+                    print(f"Executing: DROP INDEX {index_name}")
+                    db.session.execute(text(f"DROP INDEX {index_name}"))
+                    del existing_indexes[index_name]
+                if index_name not in existing_indexes:
+                    if is_sqlite:
+                        # SQLite matches a partial index's WHERE against the query's terms as written
+                        statement = statement.replace('is_read = TRUE', 'is_read = 1')
+                    print(f"Executing: {statement}")
+                    db.session.execute(text(statement))
+
+            db.session.commit()
+
+            NotificationArchive.__table__.create(db.engine, checkfirst=True)
+            print("✅ Notification index migration completed successfully")
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Migration failed: {str(e)}")
+            raise e
+
+if __name__ == "__main__":
+    migrate_notification_indexes()
\ No newline at end of file
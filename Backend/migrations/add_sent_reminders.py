@@ -0,0 +1,43 @@
+"""
+Migration to create the sent_reminders ledger
+Creates the table and records the reminders already delivered by the old
+hourly job (event_reminder notifications tied to an event) as '24h'
+reminders, so upcoming events do not get that reminder once more.
+
+Usage:
+    python -m Backend.migrations.add_sent_reminders
+"""
+from sqlalchemy import text
+from Backend import db, create_app
+
+def migrate_sent_reminders():
+    """Create sent_reminders and backfill it from existing reminder notifications"""
+    app = create_app(start_background_tasks=False)
+
+    with app.app_context():
+        try:
+            from Backend.models.sent_reminder import SentReminder
+
+            SentReminder.__table__.create(db.engine, checkfirst=True)
+            print("✅ sent_reminders table ready")
+
+            result = db.session.execute(text("""
+                INSERT INTO sent_reminders (event_id, user_id, reminder_kind, sent_at)
+                SELECT n.related_event_id, n.user_id, '24h', MIN(n.created_at)
+                FROM notifications n
+                JOIN events e ON e.event_id = n.related_event_id
+                WHERE n.notification_type = 'EVENT_REMINDER'
+                  AND e.event_date > NOW()
+                GROUP BY n.related_event_id, n.user_id
+                ON CONFLICT DO NOTHING
+            """))
+            db.session.commit()
+            print(f"✅ Recorded {result.rowcount} reminders already sent for upcoming events")
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Migration failed: {str(e)}")
+            raise e
+
+if __name__ == "__main__":
+    migrate_sent_reminders()
\ No newline at end of file
@@ -0,0 +1,156 @@
+"""
+Migration to compact duplicated notification rows into broadcasts
+Creates broadcast_notifications / notification_receipts, then looks for groups
+of notifications written by one fan-out (same message, type, related ids and
+created_at). A group is replaced by one broadcast when its recipients are
+exactly the audience (admins, members of the related club, or all active
+users) as of created_at, minus at most one excluded user. Read rows become
+read receipts. Groups that match no audience are left untouched.
+
+Usage:
+    python -m Backend.migrations.compact_broadcast_notifications
+"""
+from sqlalchemy import func, or_
+from Backend import db, create_app
+
+MIN_GROUP_SIZE = 2
+
+def audience_members(audience, as_of, club_id=None):
+    """user_ids that would have received a broadcast to audience sent at as_of"""
+    from Backend.models import User, Admin
+    from Backend.models.association_tables import user_club_association, ClubMembershipStatus
+    from Backend.models.broadcast_notification import BROADCAST_ALL_USERS, BROADCAST_CLUB_MEMBERS
+
+    existed = or_(User.created_at.is_(None), User.created_at <= as_of)
+    if audience == BROADCAST_ALL_USERS:
+        query = db.session.query(User.user_id).filter(User.is_active == True, existed)
+    elif audience == BROADCAST_CLUB_MEMBERS:
+        query = db.session.query(User.user_id).join(
+            user_club_association, user_club_association.c.user_id == User.user_id
+        ).filter(
+            user_club_association.c.club_id == club_id,
+            user_club_association.c.status == ClubMembershipStatus.APPROVED.value,
+            or_(user_club_association.c.processed_at.is_(None), user_club_association.c.processed_at <= as_of),
+            existed
+        )
+    else:
+        query = db.session.query(User.user_id).join(Admin, Admin.user_id == User.user_id).filter(existed)
+    return {user_id for (user_id,) in query.all()}
+
+def match_audience(recipients, as_of, related_club_id):
+    """(audience, club_id, exclude_user_id) the recipients correspond to, or None"""
+    from Backend.models.broadcast_notification import BROADCAST_ALL_USERS, BROADCAST_CLUB_MEMBERS, BROADCAST_ADMINS
+
+    candidates = [(BROADCAST_ADMINS, None)]
+    if related_club_id is not None:
+        candidates.append((BROADCAST_CLUB_MEMBERS, related_club_id))
+    candidates.append((BROADCAST_ALL_USERS, None))
+
+    for audience, club_id in candidates:
+        members = audience_members(audience, as_of, club_id)
+        missing = members - recipients
+        if recipients <= members and len(missing) <= 1:
+            return audience, club_id, next(iter(missing), None)
+    return None
+
+def compact_notifications(min_group_size=MIN_GROUP_SIZE):
+    """Replace matching duplicate groups with broadcasts; returns (groups compacted, rows removed)"""
+    from Backend.models import Notification, BroadcastNotification, NotificationReceipt
+
+    group_columns = (
+        Notification.message,
+        Notification.notification_type,
+        Notification.related_club_id,
+        Notification.related_event_id,
+        Notification.related_user_id,
+        Notification.created_at
+    )
+    groups = db.session.query(*group_columns).group_by(*group_columns).having(
+        func.count(Notification.notification_id) >= min_group_size
+    ).all()
+    print(f"Found {len(groups)} duplicated notification groups")
+
+    compacted = removed = 0
+    for group in groups:
+        filters = [
+            column.is_(None) if value is None else column == value
+            for column, value in zip(group_columns, group)
+        ]
+        rows = db.session.query(
+            Notification.notification_id, Notification.user_id, Notification.is_read, Notification.read_at
+        ).filter(*filters).all()
+
+        recipients = {row.user_id for row in rows}
+        if len(recipients) != len(rows):
+            continue
+        matched = match_audience(recipients, group.created_at, group.related_club_id)
+        if matched is None:
+            continue
+        audience, club_id, exclude_user_id = matched
+
+        try:
+            broadcast = BroadcastNotification(
+                audience=audience,
+                audience_club_id=club_id,
+                exclude_user_id=exclude_user_id,
+                message=group.message,
+                notification_type=group.notification_type,
+                related_club_id=group.related_club_id,
+                related_event_id=group.related_event_id,
+                related_user_id=group.related_user_id,
+                created_at=group.created_at
+            )
+            db.session.add(broadcast)
+            db.session.flush()
+
+            db.session.bulk_insert_mappings(NotificationReceipt, [
+                {
+                    'broadcast_id': broadcast.broadcast_id,
+                    'user_id': row.user_id,
+                    'is_read': True,
+                    'read_at': row.read_at,
+                    'is_dismissed': False
+                }
+                for row in rows if row.is_read
+            ])
+            Notification.query.filter(
+                Notification.notification_id.in_([row.notification_id for row in rows])
+            ).delete(synchronize_session=False)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Could not compact group '{group.message[:40]}': {str(e)}")
+            continue
+
+        compacted += 1
+        removed += len(rows)
+        print(f"Compacted {len(rows)} rows into broadcast {broadcast.broadcast_id} ({audience})")
+
+    return compacted, removed
+
+def migrate_broadcast_notifications():
+    """Create the broadcast tables and compact existing duplicates"""
+    app = create_app(start_background_tasks=False)
+
+    with app.app_context():
+        try:
+            from Backend.models import BroadcastNotification, NotificationReceipt
+
+            BroadcastNotification.__table__.create(db.engine, checkfirst=True)
+            NotificationReceipt.__table__.create(db.engine, checkfirst=True)
+
+            compacted, removed = compact_notifications()
+            print(f"✅ Compacted {compacted} groups, removed {removed} duplicated notification rows")
+
+            # Removed unread rows are now unread broadcasts; fix the direct counters
+            if removed and 'notification_counters' in db.inspect(db.engine).get_table_names():
+                from Backend.tasks.notification_counter_reconciler import reconcile_notification_counters
+                print(f"✅ Notification counters repaired for {reconcile_notification_counters()} users")
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Migration failed: {str(e)}")
+            raise e
+
+if __name__ == "__main__":
+    migrate_broadcast_notifications()
\ No newline at end of file
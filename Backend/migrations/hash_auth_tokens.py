@@ -0,0 +1,89 @@
+"""
+Migration to move auth_tokens to hashed token storage
+Adds token_hash (SHA-256 hex), backfills it from the plaintext token column,
+creates the unique hash index and the (user_id, expires_at) index, then drops
+the plaintext column.
+
+Usage:
+    python -m Backend.migrations.hash_auth_tokens
+"""
+from sqlalchemy import text
+from Backend import db, create_app
+
+BATCH_SIZE = 1000
+
+def backfill_token_hashes(batch_size=BATCH_SIZE):
+    """Hash existing plaintext tokens in batches; returns the number of rows updated"""
+    from Backend.models.auth_token import AuthToken
+
+    updated = 0
+    while True:
+        rows = db.session.execute(text(
+            "SELECT token_id, token FROM auth_tokens "
+            "WHERE token_hash IS NULL AND token IS NOT NULL LIMIT :limit"
+        ), {'limit': batch_size}).fetchall()
+        if not rows:
+            break
+
+        db.session.execute(
+            text("UPDATE auth_tokens SET token_hash = :token_hash WHERE token_id = :token_id"),
+            [{'token_hash': AuthToken.hash_token(row.token), 'token_id': row.token_id} for row in rows]
+        )
+        db.session.commit()
+        updated += len(rows)
+        print(f"Backfilled {updated} token hashes...")
+
+    return updated
+
+def migrate_auth_tokens():
+    """Update auth_tokens table to match the hashed-token model"""
+    app = create_app()
+
+    with app.app_context():
+        try:
+            inspector = db.inspect(db.engine)
+            existing_columns = [col['name'] for col in inspector.get_columns('auth_tokens')]
+            existing_indexes = [idx['name'] for idx in inspector.get_indexes('auth_tokens')]
+            is_sqlite = db.engine.dialect.name == 'sqlite'
+
+            if 'token_hash' not in existing_columns:
+                print("Executing: ALTER TABLE auth_tokens ADD COLUMN token_hash VARCHAR(64)")
+                db.session.execute(text("ALTER TABLE auth_tokens ADD COLUMN token_hash VARCHAR(64)"))
+                db.session.commit()
+
+            if 'token' in existing_columns:
+                backfill_token_hashes()
+
+            # Rows that could not be hashed (no plaintext) can never authenticate again
+            db.session.execute(text("DELETE FROM auth_tokens WHERE token_hash IS NULL"))
+            db.session.commit()
+
+            if 'idx_auth_token_hash' not in existing_indexes:
+                print("Executing: CREATE UNIQUE INDEX idx_auth_token_hash")
+                db.session.execute(text(
+                    "CREATE UNIQUE INDEX idx_auth_token_hash ON auth_tokens (token_hash)"
+                ))
+
+            if 'idx_auth_token_user_expiry' not in existing_indexes:
+                print("Executing: CREATE INDEX idx_auth_token_user_expiry")
+                db.session.execute(text(
+                    "CREATE INDEX idx_auth_token_user_expiry ON auth_tokens (user_id, expires_at)"
+                ))
+
+            if not is_sqlite:
+                db.session.execute(text("ALTER TABLE auth_tokens ALTER COLUMN token_hash SET NOT NULL"))
+
+            if 'token' in existing_columns:
+                print("Executing: ALTER TABLE auth_tokens DROP COLUMN token")
+                db.session.execute(text("ALTER TABLE auth_tokens DROP COLUMN token"))
+
+            db.session.commit()
+            print("✅ Auth token migration completed successfully")
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Migration failed: {str(e)}")
+            raise e
+
+if __name__ == "__main__":
+    migrate_auth_tokens()
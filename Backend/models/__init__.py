@@ -6,6 +6,7 @@ from .student import Student
 from .faculty import Faculty
 from .admin import Admin
 from .auth_token import AuthToken
+from .revoked_token import RevokedToken
 
 # ==== Club-related models ====
 from .club import Club
@@ -20,11 +21,17 @@ from .attendance import Attendance
 from .feedback import Feedback
 from .message import Message
 from .notification import Notification
+from .broadcast_notification import BroadcastNotification, NotificationReceipt
+from .notification_counter import NotificationCounter
+from .notification_archive import NotificationArchive
+from .sent_reminder import SentReminder
+from .digest_run import DigestRun
 from .event_document import EventDocument
 from .user_event_association import UserEventAssociation
 from .event_chat import EventChat
 from .event_attendance import EventAttendance
 from .event_feedback import EventFeedback
+from .event_counters import EventCounters
 
 # ==== Finance and budgeting ====
 from .budget_allocation import BudgetAllocation
@@ -33,6 +40,7 @@ from .expense import Expense
 
 # ==== System utilities ====
 from .system_log import SystemLog
+from .job import Job
 
 # ==== Email verification ====
 from .email_verification import EmailVerification
@@ -48,14 +56,15 @@ def init_models():
     This should be called before the first database interaction.
     """
     from . import (
-        user, student, faculty, admin, auth_token,
+        user, student, faculty, admin, auth_token, revoked_token,
         club, club_chat, association_tables,
         event, event_tag, event_registration,
         attendance, feedback, message, notification,
         event_budget, expense, system_log, event_document, 
         UserEventAssociation, EventAttendance, EventChat,
         AdminPosting, VolunteerPosting, EventFeedback, VolunteerApplication,
-        email_verification
+        email_verification, event_counters, job, broadcast_notification,
+        notification_counter, notification_archive, sent_reminder, digest_run
     )
     db.configure_mappers()
 
@@ -71,6 +80,7 @@ __all__ = [
     'Faculty',
     'Admin',
     'AuthToken',
+    'RevokedToken',
 
     # Club
     'Club',
@@ -86,11 +96,18 @@ __all__ = [
     'Feedback',
     'Message',
     'Notification',
+    'BroadcastNotification',
+    'NotificationReceipt',
+    'NotificationCounter',
+    'NotificationArchive',
+    'SentReminder',
+    'DigestRun',
     'EventDocument',
     'UserEventAssociation',
     'EventChat',
     'EventAttendance',
     'EventFeedback',
+    'EventCounters',
 
     # Budget
     'EventBudget',
@@ -99,6 +116,7 @@ __all__ = [
 
     # System
     'SystemLog',
+    'Job',
 
     # Email verification
     'EmailVerification',
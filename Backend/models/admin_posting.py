@@ -9,4 +9,8 @@ class AdminPosting(BaseModel):
     content = db.Column(db.Text)
     is_pinned = db.Column(db.Boolean, default=False)
 
-    admin = db.relationship('Admin', backref='postings')
\ No newline at end of file
+    admin = db.relationship('Admin', backref='postings')
+
+    __table_args__ = (
+        db.Index('idx_admin_posting_feed', 'is_pinned', 'created_at', 'posting_id'),
+    )
\ No newline at end of file
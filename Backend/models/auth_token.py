@@ -1,6 +1,8 @@
 from Backend import db
 from .base import BaseModel
+from Backend.utils.token_cache import token_cache
 from datetime import datetime, timedelta
+import hashlib
 import uuid
 
 class AuthToken(BaseModel):
@@ -8,38 +10,60 @@ class AuthToken(BaseModel):
 
     token_id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.user_id', ondelete='CASCADE'), nullable=False)
-    token = db.Column(db.Text, nullable=False)
+    # Only the SHA-256 of the bearer token is stored; the plain token is handed
+    # to the client once and kept on the instance as a transient `token` attribute
+    token_hash = db.Column(db.String(64), nullable=False)
     issued_at = db.Column(db.DateTime, server_default=db.func.now())
     expires_at = db.Column(db.DateTime)
     token_type = db.Column(db.String(20))
 
+    __table_args__ = (
+        db.Index('idx_auth_token_hash', 'token_hash', unique=True),
+        db.Index('idx_auth_token_user_expiry', 'user_id', 'expires_at'),
+    )
+
     @staticmethod
     def generate_token():
         import secrets
         return secrets.token_hex(32)
 
+    @staticmethod
+    def hash_token(token_string):
+        """Return the fixed-length hex digest used to look a token up"""
+        return hashlib.sha256(token_string.encode('utf-8')).hexdigest()
+
     @classmethod
-    def create_token(cls, user_id, expiration_hours):
-        return cls(
+    def issue(cls, user_id, token_string, expiration_hours, token_type='access'):
+        """Build a token row for token_string; the plain value stays on `.token`"""
+        now = datetime.utcnow()
+        auth_token = cls(
             user_id=user_id,
-            token=cls.generate_token(),
-            expires_at=datetime.utcnow() + timedelta(hours=expiration_hours)
+            token_hash=cls.hash_token(token_string),
+            issued_at=now,
+            expires_at=now + timedelta(hours=expiration_hours),
+            token_type=token_type
         )
+        auth_token.token = token_string
+        return auth_token
+
+    @classmethod
+    def find_by_token(cls, token_string):
+        """Query for the row matching a plain token (uses the unique hash index)"""
+        return cls.query.filter_by(token_hash=cls.hash_token(token_string))
+
+    @classmethod
+    def create_token(cls, user_id, expiration_hours):
+        return cls.issue(user_id, cls.generate_token(), expiration_hours, token_type=None)
 
     @staticmethod
     def generate_auth_token(user, expiration_hours):
         """Generate authentication token for user"""
         # Delete any existing tokens for this user
         AuthToken.query.filter_by(user_id=user.user_id).delete()
+        token_cache.invalidate_user(user.user_id)
         
         # Create new token
-        token = AuthToken(
-            user_id=user.user_id,
-            token=str(uuid.uuid4()),
-            issued_at=datetime.utcnow(),
-            expires_at=datetime.utcnow() + timedelta(hours=expiration_hours),
-            token_type='access'
-        )
+        token = AuthToken.issue(user.user_id, str(uuid.uuid4()), expiration_hours)
         
         db.session.add(token)
         db.session.commit()
@@ -49,16 +73,13 @@ class AuthToken(BaseModel):
     @staticmethod
     def verify_token(token_string):
         """Verify and return user for given token"""
-        token = AuthToken.query.filter_by(token=token_string).first()
+        token = AuthToken.find_by_token(token_string).first()
         
         if not token:
             return None
         
-        # Check if token has expired
-        if token.expires_at and datetime.utcnow() > token.expires_at:
-            # Delete expired token
-            db.session.delete(token)
-            db.session.commit()
+        # Expired rows are removed by the token reaper, not on the read path
+        if token.is_expired():
             return None
         
         # Import User model to avoid circular imports
@@ -0,0 +1,51 @@
+from .base import db, BaseModel
+from .notification import NotificationType
+from datetime import datetime
+
+BROADCAST_ALL_USERS = 'all_users'
+BROADCAST_CLUB_MEMBERS = 'club_members'
+BROADCAST_ADMINS = 'admins'
+BROADCAST_AUDIENCES = (BROADCAST_ALL_USERS, BROADCAST_CLUB_MEMBERS, BROADCAST_ADMINS)
+
+class BroadcastNotification(BaseModel):
+    """
+    One notification addressed to an audience instead of one row per user.
+    A user sees a broadcast if they were in the audience when it was sent
+    (account / approved membership older than the broadcast) and are not
+    exclude_user_id. Per-user read and dismissed state lives in
+    NotificationReceipt, which only has rows for users who acted on it.
+    """
+    __tablename__ = 'broadcast_notifications'
+
+    broadcast_id = db.Column(db.Integer, primary_key=True)
+    audience = db.Column(db.String(20), nullable=False)
+    audience_club_id = db.Column(db.Integer, db.ForeignKey('clubs.club_id', ondelete='CASCADE'))
+    exclude_user_id = db.Column(db.Integer, db.ForeignKey('users.user_id', ondelete='SET NULL'))
+    message = db.Column(db.Text, nullable=False)
+    notification_type = db.Column(db.Enum(NotificationType), nullable=False, default=NotificationType.GENERAL)
+    related_club_id = db.Column(db.Integer, db.ForeignKey('clubs.club_id'))
+    related_user_id = db.Column(db.Integer, db.ForeignKey('users.user_id'))
+    related_event_id = db.Column(db.Integer, db.ForeignKey('events.event_id'))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    receipts = db.relationship('NotificationReceipt', backref='broadcast', lazy='dynamic',
+                               cascade='all, delete-orphan', passive_deletes=True)
+
+    __table_args__ = (
+        db.Index('idx_broadcast_audience', 'audience', 'audience_club_id', 'created_at'),
+    )
+
+class NotificationReceipt(db.Model):
+    """A user's read / dismissed state for one broadcast"""
+    __tablename__ = 'notification_receipts'
+
+    broadcast_id = db.Column(db.Integer, db.ForeignKey('broadcast_notifications.broadcast_id', ondelete='CASCADE'), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.user_id', ondelete='CASCADE'), primary_key=True)
+    is_read = db.Column(db.Boolean, nullable=False, default=False)
+    read_at = db.Column(db.DateTime)
+    is_dismissed = db.Column(db.Boolean, nullable=False, default=False)
+    dismissed_at = db.Column(db.DateTime)
+
+    __table_args__ = (
+        db.Index('idx_notification_receipt_user', 'user_id', 'broadcast_id'),
+    )
\ No newline at end of file
@@ -18,6 +18,11 @@ class ClubChat(BaseModel):
         lazy="joined",
         backref=db.backref("club_chats_sent", lazy="dynamic")
     )
+
+    __table_args__ = (
+        db.Index('idx_club_chat_window', 'club_id', 'sent_at', 'message_id'),
+    )
+
     @property
     def sender_name(self):
         return self.sender.full_name if self.sender else "Unknown"
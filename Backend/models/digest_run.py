@@ -0,0 +1,34 @@
+from .base import db, BaseModel
+from datetime import datetime
+
+DIGEST_RUNNING = 'running'
+DIGEST_COMPLETED = 'completed'
+
+class DigestRun(BaseModel):
+    """
+    Progress of one day's event digest.
+    Users are processed in user_id order; each chunk's notifications and the
+    advanced last_user_id commit together, so a restarted run resumes after
+    the last committed chunk and nobody gets the digest twice.
+    """
+    __tablename__ = 'digest_runs'
+
+    run_date = db.Column(db.Date, primary_key=True)
+    status = db.Column(db.String(20), nullable=False, default=DIGEST_RUNNING)
+    last_user_id = db.Column(db.Integer, nullable=False, default=0)
+    users_processed = db.Column(db.Integer, nullable=False, default=0)
+    notifications_created = db.Column(db.Integer, nullable=False, default=0)
+    started_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime)
+
+    def to_dict(self):
+        return {
+            'run_date': self.run_date.isoformat(),
+            'status': self.status,
+            'last_user_id': self.last_user_id,
+            'users_processed': self.users_processed,
+            'notifications_created': self.notifications_created,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
\ No newline at end of file
@@ -55,20 +55,30 @@ class Event(BaseModel):
     budget_allocations = db.relationship('BudgetAllocation', backref='event', lazy=True, cascade='all, delete-orphan')  # ✅ New
 
     user_associations = db.relationship('UserEventAssociation', back_populates='event')
+    counters = db.relationship('EventCounters', uselist=False, lazy='joined', cascade='all, delete-orphan', passive_deletes=True)
 
     __table_args__ = (
         db.Index('idx_event_status', 'event_status'),
         db.Index('idx_event_approval', 'approval_status'),
         db.Index('idx_event_club', 'club_id'),
         db.Index('idx_event_date', 'event_date'),
+        db.Index('idx_event_feed', 'approval_status', 'event_date', 'event_id'),
     )
 
+    def counter(self, name):
+        """Maintained aggregate (see EventCounters), counted directly if not yet materialized"""
+        if self.counters is not None:
+            return getattr(self.counters, name)
+        from .event_counters import EventCounters
+        return EventCounters.tally([self.event_id]).get(self.event_id, {}).get(name, 0)
+
     @property
     def registration_count(self):
-        print(self.registrations)
-        if self.registrations is None:
-            return 0
-        return len(self.registrations)
+        return self.counter('registration_count')
+
+    @property
+    def approved_count(self):
+        return self.counter('approved_count')
 
 
     @property
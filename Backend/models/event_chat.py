@@ -20,5 +20,9 @@ class EventChat(BaseModel):
     event = db.relationship('Event', backref='event_chats')
     reply_to = db.relationship('EventChat', remote_side=[id], backref='replies')  # Self-referential relationship
 
+    __table_args__ = (
+        db.Index('idx_event_chat_window', 'event_id', 'chat_type', 'timestamp', 'id'),
+    )
+
     def __repr__(self):
         return f"<EventChat id={self.id} event_id={self.event_id} sender_id={self.sender_id} chat_type={self.chat_type} timestamp={self.timestamp}>"
\ No newline at end of file
@@ -0,0 +1,101 @@
+from sqlalchemy.exc import IntegrityError
+from .base import db, BaseModel
+from .event_registration import EventRegistration
+from .attendance import Attendance
+from .event_attendance import EventAttendance
+from .feedback import Feedback
+from .event_chat import EventChat
+from .message import Message
+
+# counter column -> [(model, extra filters)] whose rows it counts
+COUNTER_SOURCES = {
+    'registration_count': [(EventRegistration, ())],
+    'approved_count': [(EventRegistration, (EventRegistration.status == 'approved',))],
+    'attendance_count': [(Attendance, ()), (EventAttendance, ())],
+    'feedback_count': [(Feedback, ())],
+    'message_count': [(EventChat, ()), (Message, ())],
+}
+
+class EventCounters(BaseModel):
+    """
+    Maintained per-event aggregates.
+    Kept in a side table so counter updates do not lock the events row.
+    Write paths adjust them in the same transaction as the row they add or
+    remove (bump / claim_registration); the reconciliation task repairs any
+    drift from cascaded deletes or writes that bypass those paths.
+    """
+    __tablename__ = 'event_counters'
+
+    event_id = db.Column(db.Integer, db.ForeignKey('events.event_id', ondelete='CASCADE'), primary_key=True)
+    registration_count = db.Column(db.Integer, nullable=False, default=0)
+    approved_count = db.Column(db.Integer, nullable=False, default=0)
+    attendance_count = db.Column(db.Integer, nullable=False, default=0)
+    feedback_count = db.Column(db.Integer, nullable=False, default=0)
+    message_count = db.Column(db.Integer, nullable=False, default=0)
+
+    @classmethod
+    def tally(cls, event_ids=None):
+        """Count the source rows per event: {event_id: {counter: n}}"""
+        counts = {}
+        for counter, sources in COUNTER_SOURCES.items():
+            for model, filters in sources:
+                query = db.session.query(model.event_id, db.func.count()).filter(*filters)
+                if event_ids is not None:
+                    query = query.filter(model.event_id.in_(event_ids))
+                for event_id, count in query.group_by(model.event_id).all():
+                    event_counts = counts.setdefault(event_id, dict.fromkeys(COUNTER_SOURCES, 0))
+                    event_counts[counter] += count
+        return counts
+
+    @classmethod
+    def recount(cls, event_id):
+        """Create or overwrite the counters of one event from the source tables"""
+        values = cls.tally([event_id]).get(event_id, dict.fromkeys(COUNTER_SOURCES, 0))
+        try:
+            with db.session.begin_nested():
+                db.session.add(cls(event_id=event_id, **values))
+        except IntegrityError:
+            cls.query.filter_by(event_id=event_id).update(values, synchronize_session=False)
+
+    @classmethod
+    def bump(cls, event_id, **deltas):
+        """
+        Atomically add deltas to the counters of event_id, e.g.
+        EventCounters.bump(event_id, attendance_count=1).
+        Call after adding, changing or deleting the counted row: when the
+        event has no counters yet they are recounted from the flushed rows.
+        Runs in the caller's transaction; the caller commits.
+        """
+        values = {name: getattr(cls, name) + delta for name, delta in deltas.items() if delta}
+        if not values:
+            return
+
+        updated = cls.query.filter_by(event_id=event_id).update(values, synchronize_session=False)
+        if not updated:
+            # No counters yet: count from scratch, which includes the caller's flushed rows
+            db.session.flush()
+            cls.recount(event_id)
+
+    @classmethod
+    def claim_registration(cls, event_id, capacity):
+        """
+        Count one more registration if the event is below capacity.
+        The check and the increment are a single conditional UPDATE, so
+        concurrent registrations cannot overfill the event. Returns False when full.
+        """
+        for _ in range(2):
+            claimed = cls.query.filter(
+                cls.event_id == event_id,
+                cls.registration_count < capacity
+            ).update({'registration_count': cls.registration_count + 1}, synchronize_session=False)
+            if claimed:
+                return True
+            if db.session.query(cls.event_id).filter_by(event_id=event_id).first():
+                return False
+            cls.recount(event_id)
+        return False
+
+    @staticmethod
+    def approval_delta(old_status, new_status):
+        """approved_count change for a registration status transition"""
+        return int(new_status == 'approved') - int(old_status == 'approved')
@@ -0,0 +1,50 @@
+from .base import db, BaseModel
+from datetime import datetime
+
+JOB_PENDING = 'pending'
+JOB_RUNNING = 'running'
+JOB_SUCCEEDED = 'succeeded'
+JOB_DEAD = 'dead'
+
+class Job(BaseModel):
+    """
+    Durable background job.
+    Workers claim pending rows whose run_at has passed with
+    SELECT ... FOR UPDATE SKIP LOCKED, so any number of worker threads or
+    processes can share the table without handing the same job out twice.
+    Failed jobs go back to pending with a later run_at until max_attempts,
+    then stay in the dead state (with last_error) for inspection.
+    """
+    __tablename__ = 'jobs'
+
+    job_id = db.Column(db.Integer, primary_key=True)
+    queue = db.Column(db.String(50), nullable=False, default='default')
+    task = db.Column(db.String(100), nullable=False)
+    payload = db.Column(db.JSON, nullable=False, default=dict)
+    status = db.Column(db.String(20), nullable=False, default=JOB_PENDING)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=5)
+    run_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    locked_by = db.Column(db.String(100))
+    locked_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    last_error = db.Column(db.Text)
+
+    __table_args__ = (
+        db.Index('idx_job_claim', 'status', 'queue', 'run_at'),
+    )
+
+    def to_dict(self):
+        return {
+            'job_id': self.job_id,
+            'queue': self.queue,
+            'task': self.task,
+            'payload': self.payload,
+            'status': self.status,
+            'attempts': self.attempts,
+            'max_attempts': self.max_attempts,
+            'run_at': self.run_at.isoformat() if self.run_at else None,
+            'locked_by': self.locked_by,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'last_error': self.last_error
+        }
\ No newline at end of file
@@ -26,7 +26,7 @@ class Notification(BaseModel):
     related_club_id = db.Column(db.Integer, db.ForeignKey('clubs.club_id'))
     related_user_id = db.Column(db.Integer, db.ForeignKey('users.user_id'))
     related_event_id = db.Column(db.Integer, db.ForeignKey('events.event_id'))
-    is_read = db.Column(db.Boolean, default=False)
+    is_read = db.Column(db.Boolean, nullable=False, default=False)
     read_at = db.Column(db.DateTime)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
@@ -36,6 +36,15 @@ class Notification(BaseModel):
     sender = db.relationship('User', foreign_keys=[related_user_id], backref='sent_notifications')
     event = db.relationship('Event', backref='notifications')
 
+    __table_args__ = (
+        # Inbox listing (newest first) and the unread filter / mark-all-read
+        db.Index('idx_notification_user_created', user_id, created_at.desc(), notification_id.desc()),
+        db.Index('idx_notification_user_unread', user_id, is_read, created_at.desc(), notification_id.desc()),
+        # Retention: read notifications oldest first (notification_archiver)
+        db.Index('idx_notification_read_created', created_at, notification_id,
+                 postgresql_where=is_read == True, sqlite_where=is_read == True),
+    )
+
     @classmethod
     def create_club_join_request_notification(cls, club, requester):
         """Create a notification for club leaders about join request"""
@@ -0,0 +1,27 @@
+from .base import db
+from .notification import NotificationType
+from datetime import datetime
+
+class NotificationArchive(db.Model):
+    """
+    Cold storage for read notifications past the retention window.
+    Same columns as notifications without the foreign keys, so archived rows
+    never block user, club or event deletes.
+    """
+    __tablename__ = 'notifications_archive'
+
+    notification_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    user_id = db.Column(db.Integer, nullable=False)
+    message = db.Column(db.Text, nullable=False)
+    notification_type = db.Column(db.Enum(NotificationType), nullable=False)
+    related_club_id = db.Column(db.Integer)
+    related_user_id = db.Column(db.Integer)
+    related_event_id = db.Column(db.Integer)
+    is_read = db.Column(db.Boolean, nullable=False, default=True)
+    read_at = db.Column(db.DateTime)
+    created_at = db.Column(db.DateTime)
+    archived_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('idx_notification_archive_user', 'user_id', 'created_at'),
+    )
\ No newline at end of file
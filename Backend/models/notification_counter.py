@@ -0,0 +1,86 @@
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from .base import db, BaseModel
+from .notification import Notification
+
+RECOUNT_CHUNK_SIZE = 1000
+
+class NotificationCounter(BaseModel):
+    """
+    Maintained count of a user's unread direct notifications.
+    Write paths adjust it in the same transaction as the notifications they
+    add, read or delete; the reconciliation task repairs any drift. Unread
+    broadcasts are counted from the receipts (see NotificationInbox).
+    """
+    __tablename__ = 'notification_counters'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.user_id', ondelete='CASCADE'), primary_key=True)
+    unread_count = db.Column(db.Integer, nullable=False, default=0)
+
+    @classmethod
+    def tally(cls, user_ids=None):
+        """Count unread direct notifications per user: {user_id: n}"""
+        query = db.session.query(Notification.user_id, db.func.count()).filter(Notification.is_read == False)
+        if user_ids is not None:
+            query = query.filter(Notification.user_id.in_(user_ids))
+        return dict(query.group_by(Notification.user_id).all())
+
+    @classmethod
+    def recount(cls, user_ids):
+        """
+        Create or overwrite the counters of user_ids from the notifications
+        table: one upsert per RECOUNT_CHUNK_SIZE users
+        """
+        counts = cls.tally(user_ids)
+        upsert = pg_insert if db.engine.dialect.name == 'postgresql' else sqlite_insert
+        for start in range(0, len(user_ids), RECOUNT_CHUNK_SIZE):
+            statement = upsert(cls).values([
+                {'user_id': user_id, 'unread_count': counts.get(user_id, 0)}
+                for user_id in user_ids[start:start + RECOUNT_CHUNK_SIZE]
+            ])
+            db.session.execute(statement.on_conflict_do_update(
+                index_elements=[cls.user_id],
+                set_={'unread_count': statement.excluded.unread_count, 'updated_at': db.func.now()}
+            ))
+        return counts
+
+    @classmethod
+    def bump(cls, user_ids, delta=1):
+        """
+        Atomically add delta to the counters of user_ids (an id or a list).
+        Call after adding, reading or deleting the notifications: a missing
+        counter is recounted from the flushed rows instead.
+        Runs in the caller's transaction; the caller commits.
+        """
+        if not isinstance(user_ids, (list, tuple, set)):
+            user_ids = [user_ids]
+        user_ids = list(dict.fromkeys(user_ids))
+        if not user_ids or not delta:
+            return
+
+        updated = db.session.execute(
+            db.update(cls)
+            .where(cls.user_id.in_(user_ids))
+            .values(unread_count=cls.unread_count + delta)
+            .returning(cls.user_id)
+        ).scalars().all()
+
+        missing = set(user_ids) - set(updated)
+        if missing:
+            # No counter yet: count from scratch, which includes the caller's flushed rows
+            db.session.flush()
+            cls.recount(list(missing))
+
+    @classmethod
+    def reset(cls, user_id):
+        """All direct notifications were read"""
+        if not cls.query.filter_by(user_id=user_id).update({'unread_count': 0}, synchronize_session=False):
+            cls.recount([user_id])
+
+    @classmethod
+    def get(cls, user_id):
+        counter = db.session.query(cls.unread_count).filter_by(user_id=user_id).scalar()
+        if counter is None:
+            counter = cls.recount([user_id]).get(user_id, 0)
+            db.session.commit()
+        return max(counter, 0)
\ No newline at end of file
@@ -0,0 +1,21 @@
+from .base import db, BaseModel
+from datetime import datetime
+
+class RevokedToken(BaseModel):
+    """
+    Revocation list for signed (stateless) access tokens.
+    A row with a jti revokes that single token (logout); a row without a jti
+    revokes every token of user_id issued before revoked_at (ban, deletion).
+    Rows are only needed until expires_at, after which the tokens are dead anyway.
+    """
+    __tablename__ = 'revoked_tokens'
+
+    revocation_id = db.Column(db.Integer, primary_key=True)
+    jti = db.Column(db.String(64), unique=True)
+    user_id = db.Column(db.Integer, nullable=False)
+    revoked_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False)
+
+    __table_args__ = (
+        db.Index('idx_revoked_token_expiry', 'expires_at'),
+    )
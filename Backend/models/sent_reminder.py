@@ -0,0 +1,16 @@
+from .base import db
+from datetime import datetime
+
+class SentReminder(db.Model):
+    """
+    Ledger of reminders already sent: one row per (event, user, kind).
+    The reminder job claims rows here with ON CONFLICT DO NOTHING and only
+    notifies the users it claimed, so reruns and overlapping runs never send
+    the same reminder twice.
+    """
+    __tablename__ = 'sent_reminders'
+
+    event_id = db.Column(db.Integer, db.ForeignKey('events.event_id', ondelete='CASCADE'), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.user_id', ondelete='CASCADE'), primary_key=True)
+    reminder_kind = db.Column(db.String(20), primary_key=True)  # e.g. '24h', '1h', '10m'
+    sent_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
\ No newline at end of file
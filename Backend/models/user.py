@@ -1,9 +1,14 @@
 from werkzeug.security import generate_password_hash, check_password_hash
 from flask_login import UserMixin
+from sqlalchemy import inspect
+from sqlalchemy.orm import joinedload
 from .base import db, BaseModel
 from datetime import datetime
 from .association_tables import ClubMembershipStatus, user_club_association
 
+# Role profile relationships, in the order they are probed
+ROLE_RELATIONSHIPS = ('student', 'faculty', 'admin')
+
 class User(BaseModel, UserMixin):
     __tablename__ = 'users'
     
@@ -66,22 +71,53 @@ class User(BaseModel, UserMixin):
             query = query.filter(user_club_association.c.status == ClubMembershipStatus.APPROVED.value)
         return db.session.query(query.exists()).scalar()  # returns True/False
     
+    # Role resolution
+    @classmethod
+    def role_options(cls):
+        """
+        Loader options that fetch the student/faculty/admin profile together with
+        the users, e.g. User.query.options(*User.role_options()) or, through a
+        relationship, joinedload(EventChat.sender).options(*User.role_options()).
+        """
+        return (joinedload(cls.student), joinedload(cls.faculty), joinedload(cls.admin))
+
+    @classmethod
+    def preload_roles(cls, users):
+        """Load the role profiles of already-fetched users in a single query"""
+        user_ids = [
+            user.user_id for user in users
+            if user is not None and inspect(user).unloaded & set(ROLE_RELATIONSHIPS)
+        ]
+        if user_ids:
+            cls.query.options(*cls.role_options()).filter(cls.user_id.in_(set(user_ids))).all()
+        return users
+
+    def _load_role_profiles(self):
+        # One query for all three profiles instead of up to three lazy loads
+        state = inspect(self)
+        if state.persistent and state.unloaded & set(ROLE_RELATIONSHIPS):
+            User.query.options(*User.role_options()).filter(User.user_id == self.user_id).first()
+
+    @property
+    def role_profile(self):
+        """(role, profile) for the user's student/faculty/admin record, or (None, None)"""
+        self._load_role_profiles()
+        for role in ROLE_RELATIONSHIPS:
+            profile = getattr(self, role)
+            if profile:
+                return role, profile
+        return None, None
+
+    @property
+    def role(self):
+        return self.role_profile[0]
+
     @property
     def full_name(self):
-        if self.student:
-            return self.student.full_name
-        elif self.faculty:
-            return self.faculty.full_name
-        elif self.admin:
-            return self.admin.full_name
-        return "Unknown"
+        _, profile = self.role_profile
+        return profile.full_name if profile else "Unknown"
     
     @property
     def profile_picture(self):
-        if self.student:
-            return self.student.profile_picture
-        elif self.faculty:
-            return getattr(self.faculty, "profile_picture", None)
-        elif self.admin:
-            return getattr(self.admin, "profile_picture", None)
-        return None
+        _, profile = self.role_profile
+        return getattr(profile, "profile_picture", None)
\ No newline at end of file
@@ -1,8 +1,11 @@
 from flask import Blueprint, jsonify, request
-from ..models import db, User, Event, EventRegistration, SystemLog, Club, EventTag, EventDocument, EventBudget, BudgetAllocation, Attendance, Feedback, Message
+from ..models import db, User, Event, SystemLog, Club, EventTag, EventDocument, EventBudget, BudgetAllocation, Message, EventCounters
 from ..middlewares.auth_middleware import token_required, admin_required
 from ..utils.log_action import log_action
 from ..utils.response_utils import make_response  # Import the make_response function
+from ..utils.event_serializer import EventBatch
+from ..utils.feed_cache import feed_cache
+from ..tasks.reminder_timer import reminder_timer
 from sqlalchemy.orm import joinedload
 from datetime import datetime
 
@@ -24,7 +27,6 @@ def get_all_events(current_user):
         event_status = request.args.get('event_status', default=None, type=str)
         
         query = Event.query.options(
-            joinedload(Event.event_tags),
             joinedload(Event.documents),
             joinedload(Event.budget),
             joinedload(Event.budget_allocations)
@@ -48,40 +50,27 @@ def get_all_events(current_user):
         
         paginated_events = query.paginate(page=page, per_page=limit, error_out=False)
         
+        # Organizers, clubs, tags and counters for the whole page
+        batch = EventBatch(paginated_events.items)
+        
         events = []
         for event in paginated_events.items:
             # Get organizer details
-            organizer = User.query.get(event.created_by)
+            organizer = batch.creators.get(event.created_by)
             organizer_name = None
             organizer_email = None
             if organizer:
-                if organizer.student:
-                    organizer_name = organizer.student.full_name
-                    organizer_email = organizer.email
-                elif organizer.faculty:
-                    organizer_name = organizer.faculty.full_name
-                    organizer_email = organizer.email
-                elif organizer.admin:
-                    organizer_name = organizer.admin.full_name
+                _, profile = organizer.role_profile
+                if profile:
+                    organizer_name = profile.full_name
                     organizer_email = organizer.email
             
             # Get club details
-            club_name = None
-            if event.club_id:
-                club = Club.query.get(event.club_id)
-                club_name = club.name if club else None
-            
-            # Get registration count
-            registration_count = EventRegistration.query.filter_by(event_id=event.event_id).count()
-            
-            # Get attendance count
-            attendance_count = Attendance.query.filter_by(event_id=event.event_id).count()
-            
-            # Get feedback count
-            feedback_count = Feedback.query.filter_by(event_id=event.event_id).count()
+            club = batch.clubs.get(event.club_id)
+            club_name = club.name if club else None
             
-            # Get message count
-            message_count = Message.query.filter_by(event_id=event.event_id).count()
+            # Registration, attendance, feedback and message counts
+            counts = batch.counters[event.event_id]
             
             event_data = {
                 'event_id': event.event_id,
@@ -117,12 +106,12 @@ def get_all_events(current_user):
                     'name': club_name
                 },
                 'stats': {
-                    'registration_count': registration_count,
-                    'attendance_count': attendance_count,
-                    'feedback_count': feedback_count,
-                    'message_count': message_count
+                    'registration_count': counts['registration_count'],
+                    'attendance_count': counts['attendance_count'],
+                    'feedback_count': counts['feedback_count'],
+                    'message_count': counts['message_count']
                 },
-                'tags': [tag.name for tag in event.event_tags] if event.event_tags else [],
+                'tags': [tag.tag_name for tag in batch.tags.get(event.event_id, [])],
                 'documents_count': len(event.documents) if event.documents else 0,
                 'budget_allocations_count': len(event.budget_allocations) if event.budget_allocations else 0
             }
@@ -341,6 +330,8 @@ def update_event_approval_status(current_user, event_id):
         event.approval_status = approval_status
         
         db.session.commit()
+        feed_cache.invalidate_shared()
+        reminder_timer.reschedule(event_id)
         
         # Log the action
         log_action(
@@ -372,24 +363,20 @@ def get_pending_events(current_user):
         page = request.args.get('page', default=1, type=int)
         limit = request.args.get('limit', default=10, type=int)
         
-        query = Event.query.filter_by(approval_status='pending').options(
-            joinedload(Event.event_tags)
-        ).order_by(Event.created_at.desc())
+        query = Event.query.filter_by(approval_status='pending').order_by(Event.created_at.desc())
         
         paginated_events = query.paginate(page=page, per_page=limit, error_out=False)
         
+        batch = EventBatch(paginated_events.items)
+        
         events = []
         for event in paginated_events.items:
             # Get organizer details
-            organizer = User.query.get(event.created_by)
+            organizer = batch.creators.get(event.created_by)
             organizer_name = None
             if organizer:
-                if organizer.student:
-                    organizer_name = organizer.student.full_name
-                elif organizer.faculty:
-                    organizer_name = organizer.faculty.full_name
-                elif organizer.admin:
-                    organizer_name = organizer.admin.full_name
+                _, profile = organizer.role_profile
+                organizer_name = profile.full_name if profile else None
             
             events.append({
                 'event_id': event.event_id,
@@ -403,7 +390,7 @@ def get_pending_events(current_user):
                     'id': event.created_by,
                     'name': organizer_name
                 },
-                'tags': [tag.name for tag in event.event_tags] if event.event_tags else []
+                'tags': [tag.tag_name for tag in batch.tags.get(event.event_id, [])]
             })
         
         response_data = {
@@ -430,24 +417,20 @@ def get_rejected_events(current_user):
         page = request.args.get('page', default=1, type=int)
         limit = request.args.get('limit', default=10, type=int)
         
-        query = Event.query.filter_by(approval_status='rejected').options(
-            joinedload(Event.event_tags)
-        ).order_by(Event.created_at.desc())
+        query = Event.query.filter_by(approval_status='rejected').order_by(Event.created_at.desc())
         
         paginated_events = query.paginate(page=page, per_page=limit, error_out=False)
         
+        batch = EventBatch(paginated_events.items)
+        
         events = []
         for event in paginated_events.items:
             # Get organizer details
-            organizer = User.query.get(event.created_by)
+            organizer = batch.creators.get(event.created_by)
             organizer_name = None
             if organizer:
-                if organizer.student:
-                    organizer_name = organizer.student.full_name
-                elif organizer.faculty:
-                    organizer_name = organizer.faculty.full_name
-                elif organizer.admin:
-                    organizer_name = organizer.admin.full_name
+                _, profile = organizer.role_profile
+                organizer_name = profile.full_name if profile else None
             
             events.append({
                 'event_id': event.event_id,
@@ -461,7 +444,7 @@ def get_rejected_events(current_user):
                     'id': event.created_by,
                     'name': organizer_name
                 },
-                'tags': [tag.name for tag in event.event_tags] if event.event_tags else []
+                'tags': [tag.tag_name for tag in batch.tags.get(event.event_id, [])]
             })
         
         response_data = {
@@ -488,24 +471,20 @@ def get_approved_events(current_user):
         page = request.args.get('page', default=1, type=int)
         limit = request.args.get('limit', default=10, type=int)
         
-        query = Event.query.filter_by(approval_status='approved').options(
-            joinedload(Event.event_tags)
-        ).order_by(Event.created_at.desc())
+        query = Event.query.filter_by(approval_status='approved').order_by(Event.created_at.desc())
         
         paginated_events = query.paginate(page=page, per_page=limit, error_out=False)
         
+        batch = EventBatch(paginated_events.items)
+        
         events = []
         for event in paginated_events.items:
             # Get organizer details
-            organizer = User.query.get(event.created_by)
+            organizer = batch.creators.get(event.created_by)
             organizer_name = None
             if organizer:
-                if organizer.student:
-                    organizer_name = organizer.student.full_name
-                elif organizer.faculty:
-                    organizer_name = organizer.faculty.full_name
-                elif organizer.admin:
-                    organizer_name = organizer.admin.full_name
+                _, profile = organizer.role_profile
+                organizer_name = profile.full_name if profile else None
             
             events.append({
                 'event_id': event.event_id,
@@ -519,7 +498,7 @@ def get_approved_events(current_user):
                     'id': event.created_by,
                     'name': organizer_name
                 },
-                'tags': [tag.name for tag in event.event_tags] if event.event_tags else []
+                'tags': [tag.tag_name for tag in batch.tags.get(event.event_id, [])]
             })
         
         response_data = {
@@ -621,6 +600,7 @@ def send_event_chat_message(current_user, event_id):
         )
         
         db.session.add(new_message)
+        EventCounters.bump(event_id, message_count=1)
         db.session.commit()
         
         # Get sender details
@@ -36,7 +36,7 @@ def dashboard_stats():
 # @admin_required
 def recent_users():
     limit = request.args.get('limit', default=3, type=int)
-    users = User.query.order_by(User.created_at.desc()).limit(limit).all()
+    users = User.query.options(*User.role_options()).order_by(User.created_at.desc()).limit(limit).all()
     
     result = []
     for user in users:
@@ -48,15 +48,10 @@ def recent_users():
         }
         
         # Add role-specific info
-        if user.student:
-            user_data['full_name'] = user.student.full_name
-            user_data['role'] = 'student'
-        elif user.faculty:
-            user_data['full_name'] = user.faculty.full_name
-            user_data['role'] = 'faculty'
-        elif user.admin:
-            user_data['full_name'] = user.admin.full_name
-            user_data['role'] = 'admin'
+        role, profile = user.role_profile
+        if role:
+            user_data['full_name'] = profile.full_name
+            user_data['role'] = role
             
         result.append(user_data)
     
@@ -90,4 +85,80 @@ def recent_events():
             'registered_count': EventRegistration.query.filter_by(event_id=event.event_id).count()
         })
     
-    return jsonify({'events': result})
\ No newline at end of file
+    return jsonify({'events': result})
+
+@admin_stats_bp.route('/cache/stats', methods=['GET'])
+@token_required
+@admin_required
+def cache_stats(current_user):
+    """Hit/miss counters of the application caches"""
+    from ..utils.token_cache import token_cache
+    from ..utils.feed_cache import feed_cache
+    from ..utils.unread_cache import unread_counts
+    from ..utils.presence_store import presence
+    from ..utils.chat_sessions import chat_sessions
+    from ..tasks.chat_writer import chat_writer
+    from ..utils.typing_presence import typing_presence
+    from ..logger import Logger
+    return jsonify({
+        'token_cache': token_cache.stats(),
+        'feed_cache': feed_cache.stats(),
+        'unread_cache': unread_counts.stats(),
+        'presence': presence.stats(),
+        'chat_sessions': chat_sessions.stats(),
+        'chat_writer': chat_writer.stats(),
+        'typing': typing_presence.stats(),
+        'logger': Logger().stats()
+    })
+
+
+@admin_stats_bp.route('/jobs', methods=['GET'])
+@token_required
+@admin_required
+def list_jobs(current_user):
+    """Job queue counts plus the most recent jobs in one status (dead letters by default)"""
+    from ..models.job import Job
+    from ..tasks.job_queue import queue_stats, job_workers
+    status = request.args.get('status', 'dead')
+    limit = min(request.args.get('limit', default=50, type=int), 200)
+    jobs = Job.query.filter_by(status=status).order_by(Job.job_id.desc()).limit(limit).all()
+    return jsonify({
+        'counts': queue_stats(),
+        'workers': job_workers.stats(),
+        'jobs': [job.to_dict() for job in jobs]
+    })
+
+@admin_stats_bp.route('/jobs/<int:job_id>/retry', methods=['POST'])
+@token_required
+@admin_required
+def retry_dead_job(current_user, job_id):
+    """Requeue a dead job"""
+    from ..tasks.job_queue import retry_job
+    if not retry_job(job_id):
+        return jsonify({'error': 'Job not found or not dead'}), 404
+    return jsonify({'message': 'Job requeued', 'job_id': job_id})
+
+@admin_stats_bp.route('/scheduler', methods=['GET'])
+@token_required
+@admin_required
+def scheduler_stats(current_user):
+    """Periodic jobs with their timing metrics, the reminder timer, and whether this process is the scheduler leader"""
+    from ..tasks.scheduler import scheduler
+    from ..tasks.reminder_timer import reminder_timer
+    stats = scheduler.stats()
+    stats['reminder_timer'] = reminder_timer.stats()
+    from ..models.digest_run import DigestRun
+    latest_digest = DigestRun.query.order_by(DigestRun.run_date.desc()).first()
+    stats['daily_digest'] = latest_digest.to_dict() if latest_digest else None
+    return jsonify(stats)
+
+@admin_stats_bp.route('/scheduler/<job_name>/run', methods=['POST'])
+@token_required
+@admin_required
+def run_scheduled_job(current_user, job_name):
+    """Run a periodic job now, in this process"""
+    from ..tasks.scheduler import scheduler
+    if job_name not in scheduler.jobs:
+        return jsonify({'error': 'Unknown job'}), 404
+    succeeded = scheduler.run_now(job_name)
+    return jsonify({'job': scheduler.jobs[job_name].to_dict(), 'succeeded': succeeded})
\ No newline at end of file
@@ -6,6 +6,9 @@ from ..middlewares.auth_middleware import token_required, admin_required
 import csv
 from io import StringIO
 from ..utils.log_action import log_action
+from ..utils.token_cache import token_cache
+from ..utils.chat_sessions import chat_sessions
+from ..services.auth_service import AuthService
 
 admin_user_bp = Blueprint('admin_user', __name__, url_prefix='/admin')
 
@@ -20,7 +23,7 @@ def get_users(current_user):
     role = request.args.get('role', default=None, type=str)
     status = request.args.get('status', default=None, type=str)
     
-    query = User.query
+    query = User.query.options(*User.role_options())
     
     if search:
         query = query.join(Student).filter(
@@ -53,23 +56,24 @@ def get_users(current_user):
             'is_active': user.is_active
         }
         
-        if user.student:
+        role, profile = user.role_profile
+        if role == 'student':
             user_data.update({
-                'full_name': user.student.full_name,
+                'full_name': profile.full_name,
                 'role': 'student',
-                'user_id': user.student.student_id_number
+                'user_id': profile.student_id_number
             })
-        elif user.faculty:
+        elif role == 'faculty':
             user_data.update({
-                'full_name': user.faculty.full_name,
+                'full_name': profile.full_name,
                 'role': 'faculty',
-                'department': user.faculty.department
+                'department': profile.department
             })
-        elif user.admin:
+        elif role == 'admin':
             user_data.update({
-                'full_name': user.admin.full_name,
+                'full_name': profile.full_name,
                 'role': 'admin',
-                'admin_role': user.admin.admin_role
+                'admin_role': profile.admin_role
             })
             
         users.append(user_data)
@@ -115,6 +119,11 @@ def update_user_status(current_user, user_id):  # Accept current_user first, the
         # Update status
         user.is_active = (status == 'active')
         db.session.commit()
+        if status == 'banned':
+            AuthService.revoke_user_tokens(user_id)
+        else:
+            token_cache.invalidate_user(user_id)
+        chat_sessions.invalidate_user(user_id)
         
         # Log the action
         action = 'ACTIVATED' if status == 'active' else 'BANNED'
@@ -150,6 +159,7 @@ def delete_user(current_user, user_id):
     
     db.session.delete(user)
     db.session.commit()
+    AuthService.revoke_user_tokens(user_id)
     
     log_action(current_user.user_id, 'USER_DELETED', f'Deleted user {user_id}')
     
@@ -159,7 +169,7 @@ def delete_user(current_user, user_id):
 @token_required
 @admin_required
 def export_users():
-    users = User.query.all()
+    users = User.query.options(*User.role_options()).all()
     
     output = StringIO()
     writer = csv.writer(output)
@@ -175,15 +185,10 @@ def export_users():
         full_name = ''
         role = ''
         
-        if user.student:
-            full_name = user.student.full_name
-            role = 'Student'
-        elif user.faculty:
-            full_name = user.faculty.full_name
-            role = 'Faculty'
-        elif user.admin:
-            full_name = user.admin.full_name
-            role = 'Admin'
+        user_role, profile = user.role_profile
+        if user_role:
+            full_name = profile.full_name
+            role = user_role.capitalize()
         
         writer.writerow([
             user.user_id,
@@ -1,5 +1,5 @@
 from flask import Blueprint, request, jsonify
-from ..models import db, Event, EventAttendance, EventRegistration, User
+from ..models import db, Event, EventAttendance, EventRegistration, User, EventCounters
 from ..middlewares.auth_middleware import token_required
 from ..models.user_event_association import UserEventAssociation
 from datetime import datetime
@@ -86,6 +86,7 @@ def mark_attendance(current_user, event_id):
         )
         
         db.session.add(attendance)
+        EventCounters.bump(event_id, attendance_count=1)
         db.session.commit()
         
         return jsonify({'message': 'Attendance marked successfully'})
@@ -118,6 +119,7 @@ def unmark_attendance(current_user, event_id, user_id):
             return jsonify({'error': 'Attendance record not found'}), 404
         
         db.session.delete(attendance)
+        EventCounters.bump(event_id, attendance_count=-1)
         db.session.commit()
         
         return jsonify({'message': 'Attendance unmarked successfully'})
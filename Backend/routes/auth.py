@@ -4,6 +4,7 @@ from ..middlewares.auth_middleware import token_required
 from ..utils.logging_utils import log_login, log_logout, log_registration
 from ..models.email_verification import EmailVerification
 from ..utils.email_service import EmailService
+from ..tasks.job_queue import enqueue, wake_workers
 from ..models import db
 from datetime import datetime, timedelta
 
@@ -117,13 +118,14 @@ def verify_otp():
             # Log registration
             log_registration(user.user_id, user_type, ip_address)
             
-            # Send welcome email
+            # Queue the welcome email; SMTP runs on the job workers
             full_name = verification.user_data.get('student', {}).get('full_name', 'User')
-            EmailService.send_welcome_email(verification.email, full_name)
+            enqueue('email.welcome', {'email': verification.email, 'full_name': full_name}, queue='email', commit=False)
             
             # Clean up verification record
             db.session.delete(verification)
             db.session.commit()
+            wake_workers()
             
             return jsonify({
                 'success': True,
@@ -225,6 +227,10 @@ def logout(current_user):
         ip_address = request.remote_addr
         log_logout(current_user.user_id, ip_address)
         
+        # Revoke the token so it stops authenticating (drops it from the token cache too)
+        from ..services.auth_service import AuthService
+        AuthService.revoke_auth_token(request.auth_token)
+        
         from ..utils.response_utils import make_response
         return make_response(message="Logged out successfully")
         
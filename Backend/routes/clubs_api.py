@@ -11,6 +11,13 @@ from sqlalchemy.orm import joinedload
 
 from ..middlewares.auth_middleware import token_required
 from ..utils.response_utils import make_response
+from ..utils.feed_cache import feed_cache
+from ..utils.chat_sessions import chat_sessions
+from ..tasks.reminder_timer import reminder_timer
+from ..models.notification import NotificationType
+from ..tasks.job_queue import enqueue, wake_workers
+from ..tasks.job_handlers import enqueue_notification_fan_out
+from ..utils.chat_history import club_chat_window, club_message_to_dict, parse_window_args, window_response
 
 my_club_api = Blueprint('my_club_api', __name__)
 
@@ -225,11 +232,46 @@ def create_club_event(current_user, club_id):
         associations.append(association)
         db.session.add(association)
     
+    # Queue the member/admin notifications in the same transaction as the
+    # event; the job workers fan them out after the response is sent
+    enqueue_notification_fan_out(
+        'club_members',
+        f"New event '{event.title}' has been created in {club.name}! 📅",
+        NotificationType.EVENT_CREATED,
+        related_event_id=event.event_id,
+        related_club_id=club.club_id,
+        commit=False,
+        club_id=club.club_id,
+        exclude_user_id=event.created_by
+    )
+    enqueue_notification_fan_out(
+        'admins',
+        f"📅 New event '{event.title}' created by {club.name} requires review",
+        NotificationType.SYSTEM_ALERT,
+        related_event_id=event.event_id,
+        related_club_id=club.club_id,
+        related_user_id=current_user.user_id,
+        commit=False
+    )
+    enqueue('notifications.club_realtime', {
+        'club_id': club.club_id,
+        'data': {
+            'type': 'new_event',
+            'message': f"New event '{event.title}' created!",
+            'event_id': event.event_id,
+            'club_id': club.club_id
+        }
+    }, queue='notifications', commit=False)
+    
     try:
         db.session.commit()
     except Exception as e:
         db.session.rollback()
         return make_response(error=f"Failed to create event: {str(e)}", status_code=500)
+    wake_workers()
+    feed_cache.invalidate_user(*[association.user_id for association in associations])
+    chat_sessions.invalidate_event(event.event_id)
+    reminder_timer.reschedule(event.event_id)
 
     # Log event creation
     try:
@@ -238,33 +280,6 @@ def create_club_event(current_user, club_id):
     except Exception as e:
         print(f"Failed to log event creation: {str(e)}")
 
-    # Create notifications for all club members about the new event
-    try:
-        from ..utils.notification_utils import create_event_notification_for_club_members, create_admin_notification
-        from ..socket_handlers import notify_club_realtime
-        
-        # Notify club members
-        create_event_notification_for_club_members(event, club)
-        
-        # Notify admins about new event
-        create_admin_notification(
-            f"📅 New event '{event.title}' created by {club.name} requires review",
-            related_event_id=event.event_id,
-            related_club_id=club.club_id,
-            related_user_id=current_user.user_id
-        )
-        
-        # Real-time notification to club members
-        notify_club_realtime(club.club_id, {
-            'type': 'new_event',
-            'message': f"New event '{event.title}' created!",
-            'event_id': event.event_id,
-            'club_id': club.club_id
-        })
-        
-    except Exception as e:
-        print(f"Failed to create notifications: {str(e)}")
-
     return make_response(
         data={
             'event_id': event.event_id,
@@ -298,6 +313,7 @@ def get_club_event_detail(current_user, club_id, event_id):
 def get_initial_club_chats(current_user, club_id):
     """
     List club chat messages (ordered ascending). Returns sender info and leader tag.
+    Only the latest window is returned; see get_club_chats for the paging params.
     """
     club = Club.query.get_or_404(club_id)
 
@@ -306,43 +322,53 @@ def get_initial_club_chats(current_user, club_id):
     # if status != ClubMembershipStatus.APPROVED:
     #     return make_response(error="Only members can view chats", status_code=403)
 
-    chats = ClubChat.query.filter_by(club_id=club_id).order_by(ClubChat.sent_at.asc()).all()
+    window = parse_window_args(request.args)
+    chats, has_more = club_chat_window(club_id, after_id=window['after_id'],
+                                       before_id=window['before_id'], limit=window['limit'])
     result = []
     for m in chats:
-        sender = getattr(m, 'sender_id', None)
-        # attempt to fetch user
-        user_obj = User.query.filter_by(user_id=sender).first() if sender else None
-        sender_name = getattr(user_obj, 'email', None) or getattr(user_obj, 'user_id', None)
+        sender = m.sender_id
+        sender_name = getattr(m.sender, 'email', None) or sender
         leader_tag = "(leader)" if club.leader_id == sender else ""
         result.append({
-            'message_id': getattr(m, 'message_id', None),
+            'message_id': m.message_id,
             'sender_id': sender,
             'sender_name': sender_name,
             'leader_tag': leader_tag,
-            'message_text': getattr(m, 'message_text', None) or getattr(m, 'message', None),
-            'sent_at': getattr(m, 'sent_at', None).isoformat() if getattr(m, 'sent_at', None) else None
+            'message_text': m.message_text,
+            'sent_at': m.sent_at.isoformat() if m.sent_at else None
         })
+    if _is_window_request():
+        return make_response(data=window_response(result, has_more, 'message_id'), status_code=200)
     return make_response(data=result, status_code=200)
 
 @my_club_api.route('/clubs/<int:club_id>/chats', methods=['GET'])
 @token_required
 def get_club_chats(current_user, club_id):
-    """Only for initial load - real-time updates come via SocketIO"""
+    """
+    Only for initial load - real-time updates come via SocketIO.
+    Query params: since_message_id (messages after the last one seen),
+    before_id (older history), limit. Without them the latest window is
+    returned as a plain list.
+    """
     club = Club.query.get_or_404(club_id)
-    chats = ClubChat.query.filter_by(club_id=club_id).order_by(ClubChat.sent_at.asc()).all()
-    
+    window = parse_window_args(request.args)
+    chats, has_more = club_chat_window(club_id, after_id=window['after_id'],
+                                       before_id=window['before_id'], limit=window['limit'])
+
     result = []
     for m in chats:
-        result.append({
-            'message_id': m.message_id,
-            'sender_id': m.sender_id,
-            'sender_name': m.sender.full_name if m.sender else "Unknown",
-            'message_text': m.message_text,
-            'sent_at': m.sent_at.isoformat(),
-            'is_leader': club.leader_id == m.sender_id
-        })
+        message = club_message_to_dict(m, club.leader_id)
+        message.pop('club_id')
+        result.append(message)
+    if _is_window_request():
+        return make_response(data=window_response(result, has_more, 'message_id'), status_code=200)
     return make_response(data=result, status_code=200)
 
+def _is_window_request():
+    # Callers that pass any paging param get {messages, has_more, oldest_id, newest_id}
+    return any(arg in request.args for arg in ('since_message_id', 'after_id', 'before_id', 'limit'))
+
 @my_club_api.route('/clubs/<int:club_id>/chats', methods=['POST'])
 @token_required
 def post_club_chat(current_user, club_id):
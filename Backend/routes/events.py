@@ -1,6 +1,6 @@
 from flask import Blueprint, request
 from ..middlewares.auth_middleware import token_required
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import joinedload, selectinload
 from sqlalchemy import and_, or_
 from datetime import datetime, timedelta
 import os
@@ -20,137 +20,22 @@ from ..models.feedback import Feedback
 from ..models.user_event_association import get_user_role_in_event
 from ..models.volunteer_posting import VolunteerPosting
 from ..models.expense import Expense
+from ..models.event_counters import EventCounters
 from ..models.base import db
 from ..utils.response_utils import make_response
 from ..utils.notification_utils import create_notification
+from ..utils.event_serializer import serialize_events
+from ..utils.feed_cache import feed_cache
+from ..utils.chat_sessions import chat_sessions
+from ..tasks.reminder_timer import reminder_timer
+from ..utils.chat_history import keyset_window, parse_window_args, window_response
 
 events_bp = Blueprint('events', __name__)
 
 def event_to_dict(event, include_associations=False):
     if not event:
         return None
-
-    creator = User.query.get(event.created_by)
-
-    event_data = {
-        "event_id": event.event_id,
-        "title": event.title,
-        "description": event.description,
-        "venue": event.venue,
-        "category": event.category,
-        "visibility": event.visibility,
-        "image_url": event.image_url,
-        "date": event.date.isoformat() if event.date else None,
-        "time": event.time.isoformat() if event.time else None,
-        "end_date": event.end_date.isoformat() if event.end_date else None,
-        "event_date": event.event_date.isoformat() if event.event_date else None,
-        "duration_minutes": event.duration_minutes,
-        "registration_end_date": event.registration_end_date.isoformat() if event.registration_end_date else None,
-        "created_at": event.created_at.isoformat() if event.created_at else None,
-
-        # Status
-        "event_status": event.event_status,
-        "approval_status": event.approval_status,
-        "is_recurring": event.is_recurring,
-        "is_certified": event.is_certified,
-        "qr_check_in_enabled": event.qr_check_in_enabled,
-
-        # Target
-        "target_audience": event.target_audience,
-        "capacity": event.capacity,
-
-        # Budget - Convert to float instead of string for frontend compatibility
-        "estimated_budget": float(event.estimated_budget) if event.estimated_budget else 0,
-        "actual_spent": float(event.actual_spent) if event.actual_spent else 0,
-
-        # Creator
-        "created_by": event.created_by,
-        "created_by_name": creator.full_name if creator else None,
-
-        # Meta
-        "registration_count": event.registration_count if hasattr(event, 'registration_count') else len(event.registrations),
-        
-        # Club reference
-        "club_id": event.club_id,
-        "club_ref": {
-            "club_id": event.club_ref.club_id,
-            "name": event.club_ref.name,
-            "description": event.club_ref.description,
-            "leader_id": event.club_ref.leader_id
-        } if event.club_ref else None,
-    }
-
-    # Event tags
-    event_data["event_tags"] = [
-        {
-            "tag_id": tag.tag_id,
-            "tag_name": tag.tag_name
-        } for tag in event.event_tags
-    ] if hasattr(event, 'event_tags') else []
-
-    # User associations (organizers, volunteers, attendees)
-    if hasattr(event, 'user_associations'):
-        event_data["user_associations"] = [
-            {
-                "user_id": ua.user_id,
-                "role": ua.role,
-                "user": {
-                    "user_id": ua.user.user_id,
-                    "full_name": ua.user.full_name,
-                    "email": ua.user.email
-                }
-            } for ua in event.user_associations
-        ]
-        
-        # Add user_role for the current user (this would be set separately)
-        if hasattr(event, 'user_role'):
-            event_data["user_role"] = event.user_role
-
-    if include_associations:
-        # Organizers/Admins
-        organizers = UserEventAssociation.query.filter_by(event_id=event.event_id).all()
-        event_data["organizers"] = [
-            {
-                "user_id": assoc.user_id,
-                "role": assoc.role,
-                "user_name": assoc.user.full_name if assoc.user else None
-            }
-            for assoc in organizers
-        ]
-
-        # Registered attendees
-        registrations = EventRegistration.query.filter_by(event_id=event.event_id).all()
-        event_data["attendees"] = [
-            {
-                "user_id": reg.user_id,
-                "user_name": reg.user.full_name if reg.user else None,
-                "status": reg.status
-            }
-            for reg in registrations
-        ]
-
-        # Budget details
-        if hasattr(event, 'budget') and event.budget:
-            event_data["budget"] = {
-                "budget_id": event.budget.budget_id,
-                "allocated_amount": float(event.budget.allocated_amount) if event.budget.allocated_amount else 0,
-                "total_spent": float(event.budget.total_spent) if event.budget.total_spent else 0,
-                "remaining_budget": float(event.budget.remaining_budget) if hasattr(event.budget, 'remaining_budget') else 0
-            }
-
-        # Documents
-        if hasattr(event, 'documents'):
-            event_data["documents"] = [
-                {
-                    "document_id": doc.document_id,
-                    "file_name": doc.file_name,
-                    "file_path": doc.file_path,
-                    "uploaded_by": doc.uploaded_by,
-                    "uploaded_at": doc.uploaded_at.isoformat() if doc.uploaded_at else None
-                } for doc in event.documents
-            ]
-
-    return event_data
+    return serialize_events([event], include_associations=include_associations)[0]
 
 # Get event details with all associations
 @events_bp.route('/<int:event_id>', methods=['GET'])
@@ -207,7 +92,7 @@ def get_event_details(current_user, event_id):
             'capacity': event.capacity,
             'estimated_budget': float(event.estimated_budget) if event.estimated_budget else 0,
             'actual_spent': float(event.actual_spent) if event.actual_spent else 0,
-            'registration_count': len(event.registrations),
+            'registration_count': event.registration_count,
             'user_role': user_role,
             'club_id': event.club_id,
             'created_by': event.created_by,
@@ -270,21 +155,16 @@ def handle_event_chat_messages(current_user, event_id, chat_type):
             return make_response(message="Access denied to this chat", error="Access denied to this chat", status_code=403)
         
         if request.method == 'GET':
-            # Get messages with pagination
-            page = request.args.get('page', 1, type=int)
-            per_page = request.args.get('per_page', 50, type=int)
-            
-            chats = EventChat.query.filter_by(
+            # Senders, reply parents and their senders are loaded for the whole page
+            query = EventChat.query.options(
+                joinedload(EventChat.sender).options(*User.role_options()),
+                selectinload(EventChat.reply_to).joinedload(EventChat.sender).options(*User.role_options())
+            ).filter_by(
                 event_id=event_id,
                 chat_type=chat_type
-            ).order_by(EventChat.timestamp.desc()).paginate(
-                page=page,
-                per_page=per_page,
-                error_out=False
             )
             
-            messages = []
-            for chat in chats.items:
+            def message_to_dict(chat):
                 message_data = {
                     'id': chat.id,
                     'sender_id': chat.sender_id,
@@ -296,23 +176,43 @@ def handle_event_chat_messages(current_user, event_id, chat_type):
                 }
                 
                 # Add reply context if available
-                if chat.reply_to_id:
-                    reply_message = EventChat.query.get(chat.reply_to_id)
-                    if reply_message:
-                        reply_sender = User.query.get(reply_message.sender_id)
-                        message_data['reply_to_message'] = {
-                            'sender_name': reply_sender.full_name if reply_sender else "Unknown",
-                            'message': reply_message.message
-                        }
+                reply_message = chat.reply_to if chat.reply_to_id else None
+                if reply_message:
+                    message_data['reply_to_message'] = {
+                        'sender_name': reply_message.sender.full_name if reply_message.sender else "Unknown",
+                        'message': reply_message.message
+                    }
+                return message_data
+            
+            if 'page' in request.args:
+                # Legacy offset pagination (newest first, always counted)
+                page = request.args.get('page', 1, type=int)
+                per_page = request.args.get('per_page', 50, type=int)
+                
+                chats = query.order_by(EventChat.timestamp.desc(), EventChat.id.desc()).paginate(
+                    page=page,
+                    per_page=per_page,
+                    error_out=False
+                )
                 
-                messages.append(message_data)
+                return make_response(data={
+                    'messages': [message_to_dict(chat) for chat in chats.items],
+                    'total': chats.total,
+                    'pages': chats.pages,
+                    'current_page': page
+                })
             
-            return make_response(data={
-                'messages': messages,
-                'total': chats.total,
-                'pages': chats.pages,
-                'current_page': page
-            })
+            # Keyset window: before_id for scrollback, after_id for the delta since the last seen message
+            window = parse_window_args(request.args)
+            chats, has_more = keyset_window(
+                query, EventChat.timestamp, EventChat.id,
+                before_id=window['before_id'], after_id=window['after_id'], limit=window['limit']
+            )
+            total = EventChat.query.filter_by(event_id=event_id, chat_type=chat_type).count() if window['include_total'] else None
+            
+            return make_response(data=window_response(
+                [message_to_dict(chat) for chat in chats], has_more, 'id', total
+            ))
             
         elif request.method == 'POST':
             # Handle message creation
@@ -334,6 +234,7 @@ def handle_event_chat_messages(current_user, event_id, chat_type):
             )
             
             db.session.add(chat_message)
+            EventCounters.bump(event_id, message_count=1)
             db.session.commit()
             
             # Prepare response
@@ -403,6 +304,7 @@ def send_event_message(current_user, event_id, chat_type):
         )
         
         db.session.add(new_message)
+        EventCounters.bump(event_id, message_count=1)
         db.session.commit()
         
         return make_response(data={
@@ -442,23 +344,15 @@ def get_event_messages(current_user, event_id, chat_type):
                     status_code=403
                 )
 
-        # Pagination
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 50, type=int)
-
-        messages = EventChat.query.filter_by(
+        query = EventChat.query.options(
+            joinedload(EventChat.sender).options(*User.role_options())
+        ).filter_by(
             event_id=event_id,
             chat_type=chat_type
-        ).order_by(EventChat.timestamp.asc()).paginate(
-            page=page,
-            per_page=per_page,
-            error_out=False
         )
 
-        # Format messages
-        messages_data = []
-        for message in messages.items:
-            messages_data.append({
+        def message_to_dict(message):
+            return {
                 'id': message.id,
                 'event_id': message.event_id,
                 'sender_id': message.sender_id,
@@ -468,16 +362,41 @@ def get_event_messages(current_user, event_id, chat_type):
                 'chat_type': message.chat_type,
                 'timestamp': message.timestamp.isoformat() if message.timestamp else None,
                 'is_own_message': message.sender_id == current_user_id
-            })
+            }
+
+        if 'page' in request.args:
+            # Legacy offset pagination (oldest first, always counted)
+            page = request.args.get('page', 1, type=int)
+            per_page = request.args.get('per_page', 50, type=int)
+
+            messages = query.order_by(EventChat.timestamp.asc(), EventChat.id.asc()).paginate(
+                page=page,
+                per_page=per_page,
+                error_out=False
+            )
+
+            return make_response(
+                data={
+                    'messages': [message_to_dict(message) for message in messages.items],
+                    'total': messages.total,
+                    'pages': messages.pages,
+                    'current_page': page,
+                    'per_page': per_page
+                },
+                message="Messages fetched successfully",
+                status_code=200
+            )
+
+        # Keyset window: before_id for scrollback, after_id for the delta since the last seen message
+        window = parse_window_args(request.args)
+        messages, has_more = keyset_window(
+            query, EventChat.timestamp, EventChat.id,
+            before_id=window['before_id'], after_id=window['after_id'], limit=window['limit']
+        )
+        total = EventChat.query.filter_by(event_id=event_id, chat_type=chat_type).count() if window['include_total'] else None
 
         return make_response(
-            data={
-                'messages': messages_data,
-                'total': messages.total,
-                'pages': messages.pages,
-                'current_page': page,
-                'per_page': per_page
-            },
+            data=window_response([message_to_dict(message) for message in messages], has_more, 'id', total),
             message="Messages fetched successfully",
             status_code=200
         )
@@ -606,6 +525,7 @@ def mark_attendance(current_user, event_id):
         )
         
         db.session.add(attendance)
+        EventCounters.bump(event_id, attendance_count=1)
         db.session.commit()
         
         return make_response(data={'message': 'Attendance marked successfully'})
@@ -648,6 +568,7 @@ def submit_feedback(current_user, event_id):
         )
         
         db.session.add(feedback)
+        EventCounters.bump(event_id, feedback_count=1)
         db.session.commit()
         
         return make_response(data={'message': 'Feedback submitted successfully'})
@@ -710,8 +631,9 @@ def get_event_registrations(current_user, event_id):
         if not user_association:
             return make_response(message="Only organizers can view registrations", error="Only organizers can view registrations", status_code=403)
         
-        registrations = EventRegistration.query.filter_by(event_id=event_id).all()
-        # print("andnkknda",registrations.user_id)
+        registrations = EventRegistration.query.options(
+            joinedload(EventRegistration.user).options(*User.role_options())
+        ).filter_by(event_id=event_id).all()
         registration_data = [{
             'registration_id': reg.registration_id,
             'user_id': reg.user_id,
@@ -748,8 +670,12 @@ def update_registration_status(current_user, event_id, registration_id):
         if not registration or registration.event_id != event_id:
             return make_response(message="Registration not found", error="Registration not found", status_code=404)
         
-        registration.status = data.get('status')
+        new_status = data.get('status')
+        approved_delta = EventCounters.approval_delta(registration.status, new_status)
+        registration.status = new_status
+        EventCounters.bump(event_id, approved_count=approved_delta)
         db.session.commit()
+        feed_cache.invalidate_user(registration.user_id)
         
         return make_response(data={'message': 'Registration status updated'})
         
@@ -809,7 +735,7 @@ def get_all_events_admin(current_user):
             'event_date': event.event_date.isoformat() if event.event_date else None,
             'event_status': event.event_status,
             'approval_status': event.approval_status,
-            'registration_count': len(event.registrations),
+            'registration_count': event.registration_count,
             'organizers_count': len([ua for ua in event.user_associations if ua.role == 'organizer']),
             'volunteers_count': len([ua for ua in event.user_associations if ua.role == 'volunteer']),
             'attendees_count': len([ua for ua in event.user_associations if ua.role == 'attendee']),
@@ -843,6 +769,8 @@ def update_event_approval(current_user,event_id):
         
         event.approval_status = data.get('approval_status')
         db.session.commit()
+        feed_cache.invalidate_shared()
+        reminder_timer.reschedule(event_id)
         
         # Send notification to event creator
         create_notification(
@@ -944,17 +872,15 @@ def update_event(current_user, event_id):
                 event.image_url = file_path
 
         db.session.commit()
+        feed_cache.invalidate_shared()
+        if 'event_status' in data:
+            chat_sessions.invalidate_event(event_id)
+        if 'event_status' in data or 'event_date' in data:
+            reminder_timer.reschedule(event_id)
         
         # Return complete event data
-        event_with_details = Event.query.options(
-            joinedload(Event.user_associations).joinedload(UserEventAssociation.user),
-            joinedload(Event.budget),
-            joinedload(Event.documents),
-            joinedload(Event.event_tags),
-            joinedload(Event.registrations),
-            joinedload(Event.feedbacks),
-            joinedload(Event.club_ref)
-        ).filter_by(event_id=event_id).first()
+        # Related rows are prefetched in bulk by the event serializer
+        event_with_details = Event.query.get(event_id)
         
         # Add user role information
         event_with_details.user_role = get_user_role_in_event(current_user_id, event_id)
@@ -983,6 +909,9 @@ def delete_event(current_user, event_id):
 
         db.session.delete(event)
         db.session.commit()
+        feed_cache.invalidate_shared()
+        chat_sessions.invalidate_event(event_id)
+        reminder_timer.cancel(event_id)
         return make_response(data={'message': 'Event deleted successfully'})
         
     except Exception as e:
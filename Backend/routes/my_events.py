@@ -1,6 +1,7 @@
 from flask import Blueprint, jsonify
 from ..models import db, Event, UserEventAssociation, EventRegistration
 from ..middlewares.auth_middleware import token_required
+from ..utils.event_serializer import EventBatch
 from datetime import datetime
 
 my_events_bp = Blueprint('my_events', __name__)
@@ -156,12 +157,11 @@ def get_my_events(current_user):
         events = Event.query.filter(Event.event_id.in_(event_roles.keys())).all()
         
         # Format response to match frontend expectations
+        registration_counts = EventBatch(events).registration_counts
+        
         events_data = []
         for event in events:
-            # Get registration count for this event
-            registration_count = EventRegistration.query.filter_by(
-                event_id=event.event_id
-            ).count()
+            registration_count = registration_counts.get(event.event_id, 0)
             
             event_data = {
                 'event_id': event.event_id,
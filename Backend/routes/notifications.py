@@ -1,76 +1,48 @@
 from flask import Blueprint, request, jsonify
 from ..middlewares.auth_middleware import token_required
 from ..models.notification import Notification, NotificationType
+from ..models.notification_counter import NotificationCounter
 from ..models.user import User
 from ..utils.response_utils import make_response
+from ..services.notification_inbox import NotificationInbox, InvalidCursor
 from .. import db
-from datetime import datetime
 
 notifications_bp = Blueprint('notifications', __name__)
 
 @notifications_bp.route('/notifications', methods=['GET'])
 @token_required
 def get_notifications(current_user):
-    """Get all notifications for the current user"""
+    """
+    Get notifications for the current user (direct and broadcast), newest first.
+    ?cursor=&limit= pages by keyset (next_cursor); ?page=&per_page= keeps the
+    legacy offset pagination with totals.
+    """
     try:
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 20, type=int)
         unread_only = request.args.get('unread_only', 'false').lower() == 'true'
         
-        query = Notification.query.filter_by(user_id=current_user.user_id)
-        
-        if unread_only:
-            query = query.filter_by(is_read=False)
-        
-        notifications = query.order_by(Notification.created_at.desc()).paginate(
-            page=page, per_page=per_page, error_out=False
-        )
-        
-        result = []
-        for notification in notifications.items:
-            # Format time in a more user-friendly way
-            import time
-            from datetime import datetime, timedelta
-            
-            now = datetime.utcnow()
-            created_at = notification.created_at
-            time_diff = now - created_at
-            
-            if time_diff.days > 0:
-                time_str = f"{time_diff.days} day{'s' if time_diff.days > 1 else ''} ago"
-            elif time_diff.seconds > 3600:
-                hours = time_diff.seconds // 3600
-                time_str = f"{hours} hour{'s' if hours > 1 else ''} ago"
-            elif time_diff.seconds > 60:
-                minutes = time_diff.seconds // 60
-                time_str = f"{minutes} minute{'s' if minutes > 1 else ''} ago"
-            else:
-                time_str = "Just now"
-            
-            result.append({
-                'id': notification.notification_id,
-                'message': notification.message,
-                'type': notification.notification_type.value if notification.notification_type else 'general',
-                'read': notification.is_read,
-                'time': time_str,
-                'created_at': notification.created_at.isoformat(),
-                'related_club_id': notification.related_club_id,
-                'related_event_id': notification.related_event_id,
-                'related_user_id': notification.related_user_id
-            })
+        if 'page' in request.args:
+            data = NotificationInbox.get_page(
+                current_user.user_id,
+                page=request.args.get('page', 1, type=int),
+                per_page=request.args.get('per_page', 20, type=int),
+                unread_only=unread_only
+            )
+        else:
+            limit = request.args.get('limit', default=None, type=int) or request.args.get('per_page', 20, type=int)
+            data = NotificationInbox.get_window(
+                current_user.user_id,
+                cursor=request.args.get('cursor'),
+                limit=limit,
+                unread_only=unread_only
+            )
         
         return make_response(
-            data={
-                'notifications': result,
-                'total': notifications.total,
-                'pages': notifications.pages,
-                'current_page': notifications.page,
-                'has_next': notifications.has_next,
-                'has_prev': notifications.has_prev
-            },
+            data=data,
             message="Notifications retrieved successfully"
         )
         
+    except InvalidCursor as e:
+        return make_response(error=str(e), status_code=400)
     except Exception as e:
         return make_response(error=str(e), status_code=500)
 
@@ -79,10 +51,7 @@ def get_notifications(current_user):
 def get_unread_count(current_user):
     """Get count of unread notifications"""
     try:
-        count = Notification.query.filter_by(
-            user_id=current_user.user_id,
-            is_read=False
-        ).count()
+        count = NotificationInbox.unread_count(current_user.user_id)
         
         return make_response(
             data={'unread_count': count},
@@ -92,23 +61,15 @@ def get_unread_count(current_user):
     except Exception as e:
         return make_response(error=str(e), status_code=500)
 
-@notifications_bp.route('/notifications/<int:notification_id>/mark-read', methods=['PUT'])
+# Broadcast notifications are listed with negative ids
+@notifications_bp.route('/notifications/<int(signed=True):notification_id>/mark-read', methods=['PUT'])
 @token_required
 def mark_notification_read(current_user, notification_id):
     """Mark a specific notification as read"""
     try:
-        notification = Notification.query.filter_by(
-            notification_id=notification_id,
-            user_id=current_user.user_id
-        ).first()
-        
-        if not notification:
+        if not NotificationInbox.mark_read(current_user.user_id, notification_id):
             return make_response(error="Notification not found", status_code=404)
         
-        notification.is_read = True
-        notification.read_at = datetime.utcnow()
-        db.session.commit()
-        
         return make_response(message="Notification marked as read")
         
     except Exception as e:
@@ -120,41 +81,24 @@ def mark_notification_read(current_user, notification_id):
 def mark_all_notifications_read(current_user):
     """Mark all notifications as read for the current user"""
     try:
-        notifications = Notification.query.filter_by(
-            user_id=current_user.user_id,
-            is_read=False
-        ).all()
-        
-        for notification in notifications:
-            notification.is_read = True
-            notification.read_at = datetime.utcnow()
-        
-        db.session.commit()
+        count = NotificationInbox.mark_all_read(current_user.user_id)
         
         return make_response(
-            message=f"Marked {len(notifications)} notifications as read"
+            message=f"Marked {count} notifications as read"
         )
         
     except Exception as e:
         db.session.rollback()
         return make_response(error=str(e), status_code=500)
 
-@notifications_bp.route('/notifications/<int:notification_id>', methods=['DELETE'])
+@notifications_bp.route('/notifications/<int(signed=True):notification_id>', methods=['DELETE'])
 @token_required
 def delete_notification(current_user, notification_id):
-    """Delete a specific notification"""
+    """Delete a direct notification or dismiss a broadcast"""
     try:
-        notification = Notification.query.filter_by(
-            notification_id=notification_id,
-            user_id=current_user.user_id
-        ).first()
-        
-        if not notification:
+        if not NotificationInbox.dismiss(current_user.user_id, notification_id):
             return make_response(error="Notification not found", status_code=404)
         
-        db.session.delete(notification)
-        db.session.commit()
-        
         return make_response(message="Notification deleted successfully")
         
     except Exception as e:
@@ -178,7 +122,9 @@ def create_notification_endpoint(current_user):
         )
         
         db.session.add(notification)
+        NotificationCounter.bump(notification.user_id, 1)
         db.session.commit()
+        NotificationInbox.publish_unread_count(notification.user_id)
         
         return make_response(
             data={'notification_id': notification.notification_id},
@@ -228,7 +174,9 @@ def create_sample_notifications(current_user):
             db.session.add(notification)
             created_count += 1
         
+        NotificationCounter.bump(current_user.user_id, created_count)
         db.session.commit()
+        NotificationInbox.publish_unread_count(current_user.user_id)
         
         return make_response(
             data={'created_count': created_count},
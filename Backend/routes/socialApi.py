@@ -1,11 +1,15 @@
 from flask import Blueprint, request, jsonify
 from flask_login import current_user
 from ..middlewares.auth_middleware import token_required
+from ..services.feed_service import FeedService, InvalidCursor, FEED_PAGE_SIZE, MAX_FEED_PAGE_SIZE
+from ..utils.feed_cache import feed_cache
 from Backend import db
 from Backend.models import (
-    Event, AdminPosting, VolunteerPosting, VolunteerApplication,
-    EventRegistration, Notification, SystemLog, User, UserEventAssociation
+    Event, VolunteerPosting, VolunteerApplication,
+    EventRegistration, Notification, SystemLog, User, UserEventAssociation,
+    EventCounters, NotificationCounter
 )
+from ..services.notification_inbox import NotificationInbox
 from datetime import datetime
 
 social_bp = Blueprint('social', __name__)
@@ -15,69 +19,13 @@ social_bp = Blueprint('social', __name__)
 def get_social_posts(current_user):
     """Get all events, admin postings, and volunteer postings"""
     try:
-        # Get events
-        events = Event.query.filter(
-            Event.approval_status == 'approved'
-        ).all()
-        
-        # Get admin postings
-        admin_postings = AdminPosting.query.filter(
-            AdminPosting.is_pinned == True
-        ).all()
+        # Newest page of approved events and pinned admin postings, with the
+        # user's role and registration status batched; older pages via /social/feed
+        posts = FeedService.get_page(current_user.user_id, limit=MAX_FEED_PAGE_SIZE)['posts']
         
         # Get volunteer postings - temporarily disabled due to schema mismatch
         volunteer_postings = []
         
-        # Combine all posts
-        posts = []
-        
-        # Add events
-        for event in events:
-            # Check user's role in the event
-            user_role = get_user_role_in_event(current_user.user_id, event.event_id)
-            
-            # Check if user is already registered
-            registration = EventRegistration.query.filter_by(
-                user_id=current_user.user_id,
-                event_id=event.event_id
-            ).first()
-            
-            # Determine registration status based on user role
-            if user_role == 'organizer':
-                registration_status = 'organizer'
-            elif user_role == 'volunteer':
-                registration_status = 'volunteer'
-            elif registration:
-                registration_status = registration.status
-            else:
-                registration_status = 'not_registered'
-            
-            posts.append({
-                'type': 'event',
-                'id': event.event_id,
-                'title': event.title,
-                'description': event.description,
-                'event_date': event.event_date.isoformat() if event.event_date else None,
-                'venue': event.venue,
-                'image_url': event.image_url,
-                'registration_status': registration_status,
-                'user_role': user_role,  # Add user's role for frontend
-                'capacity': event.capacity,
-                'current_registrations': event.registration_count
-            })
-        
-        # Add admin postings
-        for posting in admin_postings:
-            posts.append({
-                'type': 'admin',
-                'id': posting.posting_id,
-                'title': posting.title,
-                'content': posting.content,
-                'created_at': posting.created_at.isoformat() if posting.created_at else None,
-                'is_pinned': posting.is_pinned,
-                'admin_name': posting.admin.full_name if posting.admin else 'Admin'
-            })
-        
         # Add volunteer postings
         for posting in volunteer_postings:
             # Check user's role in the event
@@ -127,6 +75,25 @@ def get_social_posts(current_user):
         
         return jsonify({'error': str(e)}), 500
 
+@social_bp.route('/social/feed', methods=['GET'])
+@token_required
+def get_social_feed(current_user):
+    """
+    Cursor-paginated feed of approved events and pinned admin postings.
+    Query params: cursor (next_cursor from the previous page), limit.
+    """
+    try:
+        cursor = request.args.get('cursor') or None
+        limit = request.args.get('limit', default=FEED_PAGE_SIZE, type=int)
+        
+        return jsonify(FeedService.get_page(current_user.user_id, cursor=cursor, limit=limit))
+    
+    except InvalidCursor as e:
+        return jsonify({'error': str(e)}), 400
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @social_bp.route('/events/<int:event_id>/register', methods=['POST'])
 @token_required
 def register_for_event(current_user, event_id):
@@ -155,11 +122,14 @@ def register_for_event(current_user, event_id):
                 'status': existing_registration.status
             }), 400
         
-        # Check if event is at capacity
-        if event.capacity and event.registration_count >= event.capacity:
-            return jsonify({
-                'error': 'Event is at full capacity'
-            }), 400
+        # Claim a seat before adding the row; the counter check and increment
+        # are one atomic update (a missing counters row is counted without it)
+        if event.capacity:
+            if not EventCounters.claim_registration(event_id, event.capacity):
+                db.session.rollback()
+                return jsonify({
+                    'error': 'Event is at full capacity'
+                }), 400
         
         # Create new registration with pending status
         registration = EventRegistration(
@@ -170,6 +140,8 @@ def register_for_event(current_user, event_id):
         )
         
         db.session.add(registration)
+        if not event.capacity:
+            EventCounters.bump(event_id, registration_count=1)
         
         # Create system log
         log = SystemLog(
@@ -190,8 +162,11 @@ def register_for_event(current_user, event_id):
             related_user_id=current_user.user_id
         )
         db.session.add(notification)
+        NotificationCounter.bump(event.created_by, 1)
         
         db.session.commit()
+        feed_cache.invalidate_user(current_user.user_id)
+        NotificationInbox.publish_unread_count(event.created_by)
         
         return jsonify({
             'message': 'Registration request sent successfully',
@@ -283,8 +258,12 @@ def apply_for_volunteer(current_user, posting_id):
                 related_user_id=current_user.user_id
             )
             db.session.add(notification)
+            NotificationCounter.bump(posting.event.created_by, 1)
         
         db.session.commit()
+        feed_cache.invalidate_user(current_user.user_id)
+        if posting.event and posting.event.created_by:
+            NotificationInbox.publish_unread_count(posting.event.created_by)
         
         return jsonify({
             'message': 'Volunteer application submitted successfully',
@@ -0,0 +1,51 @@
+"""
+Production server entry point
+Serves the same app as app.py without the debug reloader or the unsafe
+Werkzeug server. SOCKETIO_ASYNC_MODE selects the server:
+
+    eventlet   green threads, eventlet WSGI server (recommended)
+    gevent     green threads, gevent WSGI server (needs gevent-websocket
+               for WebSocket transport)
+    threading  Werkzeug with OS threads; development only
+
+In the green modes the Backend package monkey-patches the standard library
+before importing anything else, and psycopg2 is made cooperative through
+psycogreen, so a slow query parks one green thread instead of blocking the
+whole server.
+
+Usage:
+    SOCKETIO_ASYNC_MODE=eventlet python -m Backend.server
+    gunicorn -k eventlet -w 1 -b 0.0.0.0:7000 Backend.server:app
+
+Scale out with several processes behind a sticky load balancer and set
+SOCKETIO_MESSAGE_QUEUE so they share rooms.
+"""
+import os
+import signal
+import sys
+# Importing the package patches the standard library for the green modes
+from Backend import socketio
+from Backend.app import app, check_db_connection, graceful_shutdown, logger
+
+ASYNC_MODE = os.getenv('SOCKETIO_ASYNC_MODE', 'threading')
+
+def main():
+    signal.signal(signal.SIGINT, graceful_shutdown)
+    signal.signal(signal.SIGTERM, graceful_shutdown)
+
+    if not check_db_connection():
+        logger.error("Exiting due to database connection failure")
+        sys.exit(1)
+
+    port = int(os.getenv('PORT', 7000))
+    host = os.getenv('HOST', '0.0.0.0')
+    logger.info(f"Starting {ASYNC_MODE} server at {host}:{port}")
+
+    options = {'host': host, 'port': port, 'debug': False, 'use_reloader': False}
+    if ASYNC_MODE == 'threading':
+        logger.warn("SOCKETIO_ASYNC_MODE=threading runs the Werkzeug development server")
+        options['allow_unsafe_werkzeug'] = True
+    socketio.run(app, **options)
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
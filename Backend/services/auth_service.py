@@ -4,6 +4,8 @@ from Backend.models.faculty import Faculty
 from Backend.models.admin import Admin
 from Backend.models.auth_token import AuthToken
 from Backend.models import db
+from Backend.services.signed_token_service import SignedTokenService
+from Backend.utils.token_cache import token_cache
 from datetime import datetime, timedelta
 import uuid
 
@@ -84,60 +86,75 @@ class AuthService:
 
         # Get role-specific data
         role_data = {}
-        if user.student:
-            role_data['student'] = user.student
-        elif user.faculty:
-            role_data['faculty'] = user.faculty
-        elif user.admin:
-            role_data['admin'] = user.admin
+        role, profile = user.role_profile
+        if role:
+            role_data[role] = profile
 
         return user, role_data, None
 
     @staticmethod
     def generate_auth_token(user, expiration_hours):
+        # Stateless mode: signed token, nothing is written to auth_tokens
+        if SignedTokenService.is_enabled():
+            return SignedTokenService.issue(user, user.role, expiration_hours)
+
         # Delete any existing tokens for this user
         AuthToken.query.filter_by(user_id=user.user_id).delete()
+        token_cache.invalidate_user(user.user_id)
         
-        # Create new token
-        token = AuthToken(
-            user_id=user.user_id,
-            token=str(uuid.uuid4()),
-            issued_at=datetime.utcnow(),
-            expires_at=datetime.utcnow() + timedelta(hours=expiration_hours),
-            token_type='access'
-        )
+        # Create new token (only its hash is persisted)
+        token = AuthToken.issue(user.user_id, str(uuid.uuid4()), expiration_hours)
         
         db.session.add(token)
         db.session.commit()
         return token
 
+    @staticmethod
+    def revoke_auth_token(token_string):
+        """Revoke a token (logout) and drop it from the token cache"""
+        if SignedTokenService.is_enabled() and SignedTokenService.looks_signed(token_string):
+            SignedTokenService.revoke(token_string)
+        else:
+            AuthToken.find_by_token(token_string).delete()
+            db.session.commit()
+        token_cache.invalidate(token_string)
+
+    @staticmethod
+    def revoke_user_tokens(user_id):
+        """Stop every token of a user from authenticating (ban, deletion)"""
+        AuthToken.query.filter_by(user_id=user_id).delete()
+        db.session.commit()
+        token_cache.invalidate_user(user_id)
+        SignedTokenService.revoke_user(user_id)
+
     @staticmethod
     def get_role_data(user):
         """Fetch role-specific data for a user"""
         role_data = {}
-        if user.student:
+        role, profile = user.role_profile
+        if role == 'student':
             role_data['student'] = {
-                'user_id': user.student.user_id,
-                'full_name': user.student.full_name,
-                'student_id_number': user.student.student_id_number,
-                'year_of_study': user.student.year_of_study,
-                'major': user.student.major,
-                'profile_picture': user.student.profile_picture
+                'user_id': profile.user_id,
+                'full_name': profile.full_name,
+                'student_id_number': profile.student_id_number,
+                'year_of_study': profile.year_of_study,
+                'major': profile.major,
+                'profile_picture': profile.profile_picture
             }
-        elif user.faculty:
+        elif role == 'faculty':
             role_data['faculty'] = {
-                'faculty_id': user.faculty.faculty_id,
-                'full_name': user.faculty.full_name,
-                'faculty_id_number': user.faculty.faculty_id_number,
-                'department': user.faculty.department,
-                'position': user.faculty.position,
-                'profile_picture': user.faculty.profile_picture
+                'faculty_id': profile.faculty_id,
+                'full_name': profile.full_name,
+                'faculty_id_number': profile.faculty_id_number,
+                'department': profile.department,
+                'position': profile.position,
+                'profile_picture': profile.profile_picture
             }
-        elif user.admin:
+        elif role == 'admin':
             role_data['admin'] = {
-                'user_id': user.admin.user_id,
-                'full_name': user.admin.full_name,
-                'admin_role': user.admin.admin_role,
-                'permissions_level': user.admin.permissions_level
+                'user_id': profile.user_id,
+                'full_name': profile.full_name,
+                'admin_role': profile.admin_role,
+                'permissions_level': profile.permissions_level
             }
         return role_data
\ No newline at end of file
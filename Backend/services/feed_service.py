@@ -0,0 +1,231 @@
+"""
+Social feed
+Approved events and pinned admin postings, newest first, merged from two
+index-ordered keyset queries so each page costs a bounded number of queries
+no matter how many events have ever been approved. Pages are cached
+user-agnostically and personalized with a cached per-user overlay;
+registration counts change on every registration, so they are never cached
+and are read from the maintained counters for each page served.
+"""
+
+import base64
+import heapq
+import json
+from collections import namedtuple
+from datetime import datetime
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import joinedload
+from Backend.models import db, Event, AdminPosting, EventRegistration, UserEventAssociation, EventCounters
+from Backend.utils.feed_cache import feed_cache
+
+FEED_PAGE_SIZE = 20
+MAX_FEED_PAGE_SIZE = 100
+
+# Feed order is (sort_at, kind, item_id) descending
+FeedItem = namedtuple('FeedItem', ['sort_at', 'kind', 'item_id', 'obj'])
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class FeedService:
+    @staticmethod
+    def encode_cursor(item):
+        raw = json.dumps([item.sort_at.isoformat(), item.kind, item.item_id], separators=(',', ':'))
+        return base64.urlsafe_b64encode(raw.encode('utf-8')).rstrip(b'=').decode('ascii')
+
+    @staticmethod
+    def decode_cursor(cursor):
+        """Return (sort_at, kind, item_id) or raise InvalidCursor"""
+        try:
+            padding = '=' * (-len(cursor) % 4)
+            sort_at, kind, item_id = json.loads(base64.urlsafe_b64decode(cursor + padding))
+            return datetime.fromisoformat(sort_at), str(kind), int(item_id)
+        except (ValueError, TypeError):
+            raise InvalidCursor('Invalid cursor')
+
+    @staticmethod
+    def _sources():
+        """(kind, query, sort column, id column) for every kind of feed item"""
+        return [
+            (
+                'event',
+                Event.query.filter(Event.approval_status == 'approved'),
+                Event.event_date,
+                Event.event_id
+            ),
+            (
+                'admin',
+                AdminPosting.query.options(joinedload(AdminPosting.admin)).filter(
+                    AdminPosting.is_pinned == True,
+                    AdminPosting.created_at.isnot(None)
+                ),
+                AdminPosting.created_at,
+                AdminPosting.posting_id
+            ),
+        ]
+
+    @staticmethod
+    def _after_cursor(kind, sort_col, id_col, cursor):
+        # Rows strictly after the cursor in (sort_at, kind, id) descending order;
+        # kind is constant per source, so the tuple comparison folds to this
+        sort_at, cursor_kind, cursor_id = cursor
+        if kind < cursor_kind:
+            return sort_col <= sort_at
+        if kind > cursor_kind:
+            return sort_col < sort_at
+        return or_(sort_col < sort_at, and_(sort_col == sort_at, id_col < cursor_id))
+
+    @staticmethod
+    def fetch_items(cursor=None, limit=FEED_PAGE_SIZE):
+        """
+        Return (items, next_cursor) for the page after cursor.
+        Each source is read with its own keyset query (at most limit + 1
+        rows) and the sorted streams are k-way merged. limit=None returns
+        the whole feed without a cursor.
+        """
+        decoded = FeedService.decode_cursor(cursor) if cursor else None
+
+        streams = []
+        for kind, query, sort_col, id_col in FeedService._sources():
+            if decoded:
+                query = query.filter(FeedService._after_cursor(kind, sort_col, id_col, decoded))
+            query = query.order_by(sort_col.desc(), id_col.desc())
+            if limit is not None:
+                query = query.limit(limit + 1)
+            streams.append([
+                FeedItem(getattr(obj, sort_col.key), kind, getattr(obj, id_col.key), obj)
+                for obj in query.all()
+            ])
+
+        merged = heapq.merge(*streams, key=lambda item: (item.sort_at, item.kind, item.item_id), reverse=True)
+        items = list(merged)
+        if limit is None or len(items) <= limit:
+            return items, None
+
+        items = items[:limit]
+        return items, FeedService.encode_cursor(items[-1])
+
+    @staticmethod
+    def user_overlay(user_id):
+        """
+        [[event_id, user_role, registration_status], ...] for every event the
+        user is associated with or registered for (one query each).
+        Kept as a JSON-friendly list so any cache backend can store it.
+        """
+        roles = dict(db.session.query(UserEventAssociation.event_id, UserEventAssociation.role).filter(
+            UserEventAssociation.user_id == user_id
+        ).all())
+        statuses = dict(db.session.query(EventRegistration.event_id, EventRegistration.status).filter(
+            EventRegistration.user_id == user_id
+        ).all())
+
+        overlay = []
+        for event_id in set(roles) | set(statuses):
+            user_role = roles.get(event_id)
+            if user_role in ('organizer', 'volunteer'):
+                registration_status = user_role
+            else:
+                registration_status = statuses.get(event_id, 'not_registered')
+            overlay.append([event_id, user_role, registration_status])
+        return overlay
+
+    @staticmethod
+    def registration_counts(event_ids):
+        """{event_id: registrations} from EventCounters, counted for events that have none yet"""
+        if not event_ids:
+            return {}
+        counts = dict(db.session.query(EventCounters.event_id, EventCounters.registration_count).filter(
+            EventCounters.event_id.in_(event_ids)
+        ).all())
+        missing = [event_id for event_id in event_ids if event_id not in counts]
+        if missing:
+            counts.update(dict.fromkeys(missing, 0))
+            counts.update(db.session.query(EventRegistration.event_id, db.func.count()).filter(
+                EventRegistration.event_id.in_(missing)
+            ).group_by(EventRegistration.event_id).all())
+        return counts
+
+    @staticmethod
+    def serialize_items(items):
+        """
+        Feed items -> user-agnostic post dicts. User fields and
+        current_registrations are filled by apply_overlay.
+        """
+        posts = []
+        for item in items:
+            if item.kind == 'event':
+                event = item.obj
+                posts.append({
+                    'type': 'event',
+                    'id': event.event_id,
+                    'title': event.title,
+                    'description': event.description,
+                    'event_date': event.event_date.isoformat() if event.event_date else None,
+                    'venue': event.venue,
+                    'image_url': event.image_url,
+                    'registration_status': 'not_registered',
+                    'user_role': None,
+                    'capacity': event.capacity,
+                    'current_registrations': 0
+                })
+            else:
+                posting = item.obj
+                posts.append({
+                    'type': 'admin',
+                    'id': posting.posting_id,
+                    'title': posting.title,
+                    'content': posting.content,
+                    'created_at': posting.created_at.isoformat() if posting.created_at else None,
+                    'is_pinned': posting.is_pinned,
+                    'admin_name': posting.admin.full_name if posting.admin else 'Admin'
+                })
+        return posts
+
+    @staticmethod
+    def apply_overlay(posts, overlay, registration_counts=None):
+        """Copy shared posts with the user's role, registration status and current counts filled in"""
+        by_event = {event_id: (user_role, status) for event_id, user_role, status in overlay}
+        registration_counts = registration_counts or {}
+        personalized = []
+        for post in posts:
+            if post['type'] == 'event':
+                post = dict(post, current_registrations=registration_counts.get(post['id'], 0))
+                if post['id'] in by_event:
+                    user_role, status = by_event[post['id']]
+                    post.update(user_role=user_role, registration_status=status)
+            personalized.append(post)
+        return personalized
+
+    @staticmethod
+    def get_page(user_id, cursor=None, limit=FEED_PAGE_SIZE):
+        """One feed page for user_id: {'posts': [...], 'next_cursor': str or None}"""
+        if limit is not None:
+            limit = max(1, min(limit, MAX_FEED_PAGE_SIZE))
+
+        # Generations are read before the queries so a concurrent
+        # invalidation can never be overwritten by what we are computing
+        generation = feed_cache.shared_generation()
+        page = feed_cache.get_shared(generation, cursor, limit)
+        if page is None:
+            items, next_cursor = FeedService.fetch_items(cursor, limit)
+            page = {'posts': FeedService.serialize_items(items), 'next_cursor': next_cursor}
+            feed_cache.set_shared(generation, cursor, limit, page)
+
+        overlay_generation = feed_cache.overlay_generation(user_id)
+        overlay = feed_cache.get_overlay(user_id, overlay_generation)
+        if overlay is None:
+            overlay = FeedService.user_overlay(user_id)
+            feed_cache.set_overlay(user_id, overlay_generation, overlay)
+
+        # One primary-key lookup per page, so counts are current after every
+        # registration without invalidating the shared pages
+        registration_counts = FeedService.registration_counts(
+            [post['id'] for post in page['posts'] if post['type'] == 'event']
+        )
+
+        return {
+            'posts': FeedService.apply_overlay(page['posts'], overlay, registration_counts),
+            'next_cursor': page['next_cursor']
+        }
@@ -0,0 +1,372 @@
+"""
+Notification inbox
+Merges a user's direct notifications with the broadcasts they were in the
+audience of. Broadcasts are listed under id -broadcast_id, and their read /
+dismissed state is kept in sparse NotificationReceipt rows. Unread totals come
+from the maintained NotificationCounter plus the unread broadcasts, cached in
+process and pushed to the user's sockets whenever they change.
+"""
+
+import base64
+import json
+import math
+from datetime import datetime
+from sqlalchemy import and_, or_, select, union_all, literal, exists, func, insert
+from sqlalchemy.exc import IntegrityError
+from Backend.models import (
+    db, User, Admin, Notification, NotificationCounter, BroadcastNotification, NotificationReceipt
+)
+from Backend.models.association_tables import user_club_association, ClubMembershipStatus
+from Backend.models.broadcast_notification import BROADCAST_ALL_USERS, BROADCAST_CLUB_MEMBERS, BROADCAST_ADMINS
+from Backend.utils.unread_cache import unread_counts
+
+MAX_NOTIFICATION_PAGE_SIZE = 100
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def format_time_ago(created_at):
+    time_diff = datetime.utcnow() - created_at
+    if time_diff.days > 0:
+        return f"{time_diff.days} day{'s' if time_diff.days > 1 else ''} ago"
+    if time_diff.seconds > 3600:
+        hours = time_diff.seconds // 3600
+        return f"{hours} hour{'s' if hours > 1 else ''} ago"
+    if time_diff.seconds > 60:
+        minutes = time_diff.seconds // 60
+        return f"{minutes} minute{'s' if minutes > 1 else ''} ago"
+    return "Just now"
+
+
+class NotificationInbox:
+    @staticmethod
+    def audience_filter(user_id):
+        """
+        Predicate on BroadcastNotification for the broadcasts user_id received:
+        sent to an audience they belonged to at the time and not excluding them.
+        """
+        created_at = db.session.query(User.created_at).filter(User.user_id == user_id).scalar()
+        is_admin = db.session.query(Admin.user_id).filter(Admin.user_id == user_id).first() is not None
+        memberships = db.session.query(
+            user_club_association.c.club_id,
+            user_club_association.c.processed_at
+        ).filter(
+            user_club_association.c.user_id == user_id,
+            user_club_association.c.status == ClubMembershipStatus.APPROVED.value
+        ).all()
+
+        audiences = [BroadcastNotification.audience == BROADCAST_ALL_USERS]
+        if is_admin:
+            audiences.append(BroadcastNotification.audience == BROADCAST_ADMINS)
+        for club_id, approved_at in memberships:
+            membership = [
+                BroadcastNotification.audience == BROADCAST_CLUB_MEMBERS,
+                BroadcastNotification.audience_club_id == club_id
+            ]
+            if approved_at is not None:
+                membership.append(BroadcastNotification.created_at >= approved_at)
+            audiences.append(and_(*membership))
+
+        conditions = [
+            or_(*audiences),
+            or_(BroadcastNotification.exclude_user_id.is_(None), BroadcastNotification.exclude_user_id != user_id)
+        ]
+        if created_at is not None:
+            conditions.append(BroadcastNotification.created_at >= created_at)
+        return and_(*conditions)
+
+    @staticmethod
+    def _branches(user_id, unread_only=False, before=None, limit=None, audience=None):
+        """
+        Direct and broadcast selects in one column layout, each ordered newest
+        first by (created_at, id) and cut at `before` / `limit` so the direct
+        side is served by idx_notification_user_created (or
+        idx_notification_user_unread when unread_only).
+        """
+        direct = select(
+            Notification.notification_id.label('id'),
+            Notification.message,
+            Notification.notification_type,
+            Notification.is_read,
+            Notification.created_at,
+            Notification.related_club_id,
+            Notification.related_event_id,
+            Notification.related_user_id
+        ).where(Notification.user_id == user_id)
+
+        broadcast_read = func.coalesce(NotificationReceipt.is_read, False)
+        broadcasts = select(
+            (-BroadcastNotification.broadcast_id).label('id'),
+            BroadcastNotification.message,
+            BroadcastNotification.notification_type,
+            broadcast_read.label('is_read'),
+            BroadcastNotification.created_at,
+            BroadcastNotification.related_club_id,
+            BroadcastNotification.related_event_id,
+            BroadcastNotification.related_user_id
+        ).select_from(BroadcastNotification).outerjoin(
+            NotificationReceipt,
+            and_(
+                NotificationReceipt.broadcast_id == BroadcastNotification.broadcast_id,
+                NotificationReceipt.user_id == user_id
+            )
+        ).where(
+            audience if audience is not None else NotificationInbox.audience_filter(user_id),
+            func.coalesce(NotificationReceipt.is_dismissed, False) == False
+        )
+
+        if unread_only:
+            direct = direct.where(Notification.is_read == False)
+            broadcasts = broadcasts.where(broadcast_read == False)
+
+        if before is not None:
+            created_at, row_id = before
+            direct = direct.where(or_(
+                Notification.created_at < created_at,
+                and_(Notification.created_at == created_at, Notification.notification_id < row_id)
+            ))
+            broadcasts = broadcasts.where(or_(
+                BroadcastNotification.created_at < created_at,
+                and_(BroadcastNotification.created_at == created_at, -BroadcastNotification.broadcast_id < row_id)
+            ))
+
+        # Broadcast ids are negated, so "id descending" is broadcast_id ascending
+        direct = direct.order_by(Notification.created_at.desc(), Notification.notification_id.desc())
+        broadcasts = broadcasts.order_by(BroadcastNotification.created_at.desc(), BroadcastNotification.broadcast_id.asc())
+        if limit is not None:
+            direct = direct.limit(limit)
+            broadcasts = broadcasts.limit(limit)
+        return direct, broadcasts
+
+    @staticmethod
+    def _merged(user_id, unread_only=False, before=None, limit=None, audience=None):
+        """UNION ALL of both branches; each is wrapped so its ORDER BY / LIMIT stays local"""
+        direct, broadcasts = NotificationInbox._branches(user_id, unread_only, before, limit, audience)
+        return union_all(
+            select(direct.subquery('direct').c),
+            select(broadcasts.subquery('broadcasts').c)
+        ).subquery('inbox')
+
+    @staticmethod
+    def _to_dict(row):
+        return {
+            'id': row.id,
+            'message': row.message,
+            'type': row.notification_type.value if row.notification_type else 'general',
+            'read': bool(row.is_read),
+            'time': format_time_ago(row.created_at),
+            'created_at': row.created_at.isoformat(),
+            'related_club_id': row.related_club_id,
+            'related_event_id': row.related_event_id,
+            'related_user_id': row.related_user_id
+        }
+
+    @staticmethod
+    def encode_cursor(row):
+        raw = json.dumps([row.created_at.isoformat(), row.id], separators=(',', ':'))
+        return base64.urlsafe_b64encode(raw.encode('utf-8')).rstrip(b'=').decode('ascii')
+
+    @staticmethod
+    def decode_cursor(cursor):
+        """Return (created_at, id) or raise InvalidCursor"""
+        try:
+            padding = '=' * (-len(cursor) % 4)
+            created_at, row_id = json.loads(base64.urlsafe_b64decode(cursor + padding))
+            return datetime.fromisoformat(created_at), int(row_id)
+        except (ValueError, TypeError):
+            raise InvalidCursor('Invalid cursor')
+
+    @staticmethod
+    def get_window(user_id, cursor=None, limit=20, unread_only=False):
+        """
+        Keyset page of the merged inbox, newest first:
+        {'notifications', 'next_cursor', 'has_more'}. Each branch reads at most
+        limit + 1 rows from its index, however deep the cursor is.
+        """
+        limit = max(1, min(limit, MAX_NOTIFICATION_PAGE_SIZE))
+        before = NotificationInbox.decode_cursor(cursor) if cursor else None
+        inbox = NotificationInbox._merged(user_id, unread_only, before, limit + 1)
+
+        rows = db.session.execute(
+            select(inbox).order_by(inbox.c.created_at.desc(), inbox.c.id.desc()).limit(limit + 1)
+        ).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        return {
+            'notifications': [NotificationInbox._to_dict(row) for row in rows],
+            'next_cursor': NotificationInbox.encode_cursor(rows[-1]) if has_more else None,
+            'has_more': has_more
+        }
+
+    @staticmethod
+    def get_page(user_id, page=1, per_page=20, unread_only=False):
+        """One OFFSET page of the merged inbox, newest first, in the paginate() response shape"""
+        page = max(page, 1)
+        per_page = max(per_page, 1)
+        audience = NotificationInbox.audience_filter(user_id)
+
+        # Neither branch can contribute more than page * per_page rows to this page
+        inbox = NotificationInbox._merged(user_id, unread_only, limit=page * per_page, audience=audience)
+        rows = db.session.execute(
+            select(inbox)
+            .order_by(inbox.c.created_at.desc(), inbox.c.id.desc())
+            .limit(per_page)
+            .offset((page - 1) * per_page)
+        ).all()
+
+        direct, broadcasts = NotificationInbox._branches(user_id, unread_only, audience=audience)
+        total = sum(
+            db.session.execute(select(func.count()).select_from(branch.order_by(None).subquery())).scalar()
+            for branch in (direct, broadcasts)
+        )
+
+        pages = int(math.ceil(total / float(per_page))) if total else 0
+        return {
+            'notifications': [NotificationInbox._to_dict(row) for row in rows],
+            'total': total,
+            'pages': pages,
+            'current_page': page,
+            'has_next': page < pages,
+            'has_prev': page > 1
+        }
+
+    @staticmethod
+    def unread_count(user_id):
+        """Unread direct + broadcast notifications, served from the cache when possible"""
+        count = unread_counts.get(user_id)
+        if count is not None:
+            return count
+
+        version = unread_counts.version(user_id)
+        count = NotificationCounter.get(user_id) + NotificationInbox.unread_broadcasts(user_id)
+        unread_counts.set(user_id, version, count)
+        return count
+
+    @staticmethod
+    def publish_unread_count(*user_ids):
+        """Drop the cached counts and push fresh ones to the users' sockets"""
+        from Backend import socketio
+
+        unread_counts.invalidate(*user_ids)
+        for user_id in user_ids:
+            try:
+                socketio.emit('unread_count_update', {'count': NotificationInbox.unread_count(user_id)},
+                              room=f'user_{user_id}')
+            except Exception as e:
+                print(f"Failed to push unread count to user {user_id}: {str(e)}")
+
+    @staticmethod
+    def unread_broadcasts(user_id):
+        return db.session.query(func.count(BroadcastNotification.broadcast_id)).outerjoin(
+            NotificationReceipt,
+            and_(
+                NotificationReceipt.broadcast_id == BroadcastNotification.broadcast_id,
+                NotificationReceipt.user_id == user_id
+            )
+        ).filter(
+            NotificationInbox.audience_filter(user_id),
+            func.coalesce(NotificationReceipt.is_read, False) == False,
+            func.coalesce(NotificationReceipt.is_dismissed, False) == False
+        ).scalar()
+
+    @staticmethod
+    def _visible_broadcast(user_id, broadcast_id):
+        return BroadcastNotification.query.filter(
+            BroadcastNotification.broadcast_id == broadcast_id,
+            NotificationInbox.audience_filter(user_id)
+        ).first()
+
+    @staticmethod
+    def _set_receipt(broadcast_id, user_id, **values):
+        """Create or update the user's receipt for a broadcast (caller commits)"""
+        updated = NotificationReceipt.query.filter_by(
+            broadcast_id=broadcast_id, user_id=user_id
+        ).update(values, synchronize_session=False)
+        if updated:
+            return
+        try:
+            with db.session.begin_nested():
+                db.session.add(NotificationReceipt(broadcast_id=broadcast_id, user_id=user_id, **values))
+        except IntegrityError:
+            # A concurrent request created it first
+            NotificationReceipt.query.filter_by(
+                broadcast_id=broadcast_id, user_id=user_id
+            ).update(values, synchronize_session=False)
+
+    @staticmethod
+    def mark_read(user_id, notification_id):
+        """Mark a direct (id > 0) or broadcast (id < 0) notification read; False if not found"""
+        now = datetime.utcnow()
+        if notification_id < 0:
+            if not NotificationInbox._visible_broadcast(user_id, -notification_id):
+                return False
+            NotificationInbox._set_receipt(-notification_id, user_id, is_read=True, read_at=now)
+        else:
+            notification = Notification.query.filter_by(notification_id=notification_id, user_id=user_id).first()
+            if not notification:
+                return False
+            was_unread = not notification.is_read
+            notification.is_read = True
+            notification.read_at = now
+            if was_unread:
+                NotificationCounter.bump(user_id, -1)
+        db.session.commit()
+        NotificationInbox.publish_unread_count(user_id)
+        return True
+
+    @staticmethod
+    def mark_all_read(user_id):
+        """Mark every direct and broadcast notification read; returns how many changed"""
+        now = datetime.utcnow()
+        direct = Notification.query.filter_by(user_id=user_id, is_read=False).update(
+            {'is_read': True, 'read_at': now}, synchronize_session=False
+        )
+        NotificationCounter.reset(user_id)
+        receipts = NotificationReceipt.query.filter_by(user_id=user_id, is_read=False, is_dismissed=False).update(
+            {'is_read': True, 'read_at': now}, synchronize_session=False
+        )
+
+        # Broadcasts the user never touched get a read receipt in one INSERT ... SELECT
+        unseen = select(
+            BroadcastNotification.broadcast_id,
+            literal(user_id),
+            literal(True),
+            literal(now),
+            literal(False)
+        ).where(
+            NotificationInbox.audience_filter(user_id),
+            ~exists().where(
+                NotificationReceipt.broadcast_id == BroadcastNotification.broadcast_id,
+                NotificationReceipt.user_id == user_id
+            )
+        )
+        inserted = db.session.execute(
+            insert(NotificationReceipt).from_select(
+                ['broadcast_id', 'user_id', 'is_read', 'read_at', 'is_dismissed'], unseen
+            )
+        ).rowcount
+
+        db.session.commit()
+        NotificationInbox.publish_unread_count(user_id)
+        return direct + receipts + max(inserted or 0, 0)
+
+    @staticmethod
+    def dismiss(user_id, notification_id):
+        """Delete a direct notification or hide a broadcast for this user; False if not found"""
+        if notification_id < 0:
+            if not NotificationInbox._visible_broadcast(user_id, -notification_id):
+                return False
+            NotificationInbox._set_receipt(-notification_id, user_id, is_dismissed=True, dismissed_at=datetime.utcnow())
+        else:
+            notification = Notification.query.filter_by(notification_id=notification_id, user_id=user_id).first()
+            if not notification:
+                return False
+            was_unread = not notification.is_read
+            db.session.delete(notification)
+            if was_unread:
+                NotificationCounter.bump(user_id, -1)
+        db.session.commit()
+        NotificationInbox.publish_unread_count(user_id)
+        return True
\ No newline at end of file
@@ -0,0 +1,193 @@
+"""
+Stateless signed access tokens
+Tokens carry user_id, role and expiry and are signed with HMAC-SHA256 over
+SECRET_KEY, so verifying them needs no database round-trip. Logout and bans
+are handled by a small in-memory revocation list that is loaded from
+revoked_tokens at startup and refreshed incrementally.
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import threading
+import time
+import uuid
+from collections import namedtuple
+from datetime import datetime, timedelta
+from flask import current_app
+from Backend.models import db
+from Backend.models.revoked_token import RevokedToken
+
+SignedToken = namedtuple('SignedToken', ['token', 'expires_at', 'jti'])
+
+
+def _b64encode(raw):
+    return base64.urlsafe_b64encode(raw).rstrip(b'=').decode('ascii')
+
+
+def _b64decode(value):
+    padding = '=' * (-len(value) % 4)
+    return base64.urlsafe_b64decode(value + padding)
+
+
+class RevocationList:
+    """In-process copy of revoked_tokens, refreshed by revocation_id watermark"""
+
+    def __init__(self, refresh_seconds=30):
+        self.refresh_seconds = refresh_seconds
+        self._revoked_jtis = {}
+        self._revoked_users = {}
+        self._last_revocation_id = 0
+        self._last_refresh = 0.0
+        self._lock = threading.Lock()
+
+    def load(self):
+        """Load the full list (startup)"""
+        with self._lock:
+            self._revoked_jtis.clear()
+            self._revoked_users.clear()
+            self._last_revocation_id = 0
+        self.refresh()
+
+    def refresh(self):
+        """Pull revocations newer than the last one seen and prune expired entries"""
+        rows = RevokedToken.query.filter(
+            RevokedToken.revocation_id > self._last_revocation_id,
+            RevokedToken.expires_at >= datetime.utcnow()
+        ).order_by(RevokedToken.revocation_id.asc()).all()
+
+        with self._lock:
+            for row in rows:
+                self._add(row.jti, row.user_id, row.revoked_at, row.expires_at)
+                self._last_revocation_id = max(self._last_revocation_id, row.revocation_id)
+            self._prune()
+            self._last_refresh = time.monotonic()
+
+    def maybe_refresh(self):
+        if time.monotonic() - self._last_refresh >= self.refresh_seconds:
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Failed to refresh token revocation list: {str(e)}")
+
+    def add(self, jti, user_id, revoked_at, expires_at):
+        """Record a revocation made by this process without waiting for a refresh"""
+        with self._lock:
+            self._add(jti, user_id, revoked_at, expires_at)
+
+    def is_revoked(self, jti, user_id, issued_at):
+        with self._lock:
+            if jti in self._revoked_jtis:
+                return True
+            revoked_before = self._revoked_users.get(user_id)
+            return revoked_before is not None and issued_at <= revoked_before[0]
+
+    def _add(self, jti, user_id, revoked_at, expires_at):
+        if jti:
+            self._revoked_jtis[jti] = expires_at
+        else:
+            current = self._revoked_users.get(user_id)
+            if current is None or revoked_at > current[0]:
+                self._revoked_users[user_id] = (revoked_at, expires_at)
+
+    def _prune(self):
+        now = datetime.utcnow()
+        for jti, expires_at in list(self._revoked_jtis.items()):
+            if expires_at < now:
+                del self._revoked_jtis[jti]
+        for user_id, (_, expires_at) in list(self._revoked_users.items()):
+            if expires_at < now:
+                del self._revoked_users[user_id]
+
+
+revocation_list = RevocationList()
+
+
+class SignedTokenService:
+    @staticmethod
+    def is_enabled():
+        return current_app.config.get('AUTH_TOKEN_MODE', 'opaque') == 'signed'
+
+    @staticmethod
+    def looks_signed(token_string):
+        return token_string.count('.') == 1
+
+    @staticmethod
+    def _sign(payload_segment):
+        secret = current_app.config.get('SECRET_KEY')
+        if not secret:
+            raise RuntimeError("AUTH_TOKEN_MODE=signed requires SECRET_KEY to be set")
+        secret = secret.encode('utf-8')
+        return _b64encode(hmac.new(secret, payload_segment.encode('ascii'), hashlib.sha256).digest())
+
+    @staticmethod
+    def issue(user, role, expiration_hours):
+        """Issue a signed token for user; returns SignedToken(token, expires_at, jti)"""
+        now = datetime.utcnow()
+        expires_at = now + timedelta(hours=expiration_hours)
+        jti = uuid.uuid4().hex
+        payload = {
+            'uid': user.user_id,
+            'role': role,
+            'adm': user.admin is not None,
+            'iat': (now - datetime(1970, 1, 1)).total_seconds(),
+            'exp': int((expires_at - datetime(1970, 1, 1)).total_seconds()),
+            'jti': jti
+        }
+        payload_segment = _b64encode(json.dumps(payload, separators=(',', ':')).encode('utf-8'))
+        token = f"{payload_segment}.{SignedTokenService._sign(payload_segment)}"
+        return SignedToken(token=token, expires_at=expires_at, jti=jti)
+
+    @staticmethod
+    def decode(token_string):
+        """
+        Verify the signature and revocation status of a signed token.
+        Returns the payload dict (with naive-UTC issued_at/expires_at added)
+        or None if the token is malformed, forged or revoked.
+        """
+        try:
+            payload_segment, signature = token_string.split('.')
+            expected = SignedTokenService._sign(payload_segment)
+            if not hmac.compare_digest(signature, expected):
+                return None
+            payload = json.loads(_b64decode(payload_segment))
+        except (ValueError, TypeError):
+            return None
+
+        payload['issued_at'] = datetime(1970, 1, 1) + timedelta(seconds=payload['iat'])
+        payload['expires_at'] = datetime(1970, 1, 1) + timedelta(seconds=payload['exp'])
+
+        revocation_list.maybe_refresh()
+        if revocation_list.is_revoked(payload['jti'], payload['uid'], payload['issued_at']):
+            return None
+        return payload
+
+    @staticmethod
+    def revoke(token_string):
+        """Revoke a single signed token (logout)"""
+        payload = SignedTokenService.decode(token_string)
+        if not payload:
+            return
+        revocation = RevokedToken(
+            jti=payload['jti'],
+            user_id=payload['uid'],
+            revoked_at=datetime.utcnow(),
+            expires_at=payload['expires_at']
+        )
+        db.session.add(revocation)
+        db.session.commit()
+        revocation_list.add(revocation.jti, revocation.user_id, revocation.revoked_at, revocation.expires_at)
+
+    @staticmethod
+    def revoke_user(user_id):
+        """Revoke every signed token issued to user_id so far (ban, deletion)"""
+        now = datetime.utcnow()
+        revocation = RevokedToken(
+            user_id=user_id,
+            revoked_at=now,
+            expires_at=now + timedelta(hours=current_app.config['TOKEN_EXPIRATION_HOURS'])
+        )
+        db.session.add(revocation)
+        db.session.commit()
+        revocation_list.add(None, user_id, revocation.revoked_at, revocation.expires_at)
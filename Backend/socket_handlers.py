@@ -5,20 +5,22 @@ Socket.IO event handlers for real-time notifications with admin authentication b
 from flask_socketio import emit, join_room, leave_room, disconnect
 from flask import request
 from . import socketio
-from .middlewares.auth_middleware import verify_token
-from .models import db, User, EventChat
-from .models.user_event_association import UserEventAssociation
+from .middlewares.auth_middleware import resolve_token
+from .models import db, EventChat, EventCounters
 from datetime import datetime
 import traceback
+from types import SimpleNamespace
 import sys
 from .logger import Logger
+from .utils.presence_store import presence
+from .utils.chat_sessions import chat_sessions
+from .utils.typing_presence import typing_presence
+from .tasks.chat_writer import chat_writer
 
 logger = Logger()
 
-# Store active user sessions
-active_users = {}
-admin_sessions = {}  # Track admin sessions separately
-typing_status = {}
+# Sessions and typing state live in the presence store so every server
+# process behind the message queue sees the same state
 print("🔧 Debug Socket.IO handlers initialized")
 
 def log_error(error_msg, exception=None):
@@ -36,15 +38,11 @@ def log_info(info_msg):
 
 def is_admin_session(sid):
     """Check if session belongs to an admin user"""
-    return sid in admin_sessions
+    return presence.is_admin(sid)
 
 def get_user_from_session(sid):
     """Get user ID from session (admin or regular)"""
-    if sid in admin_sessions:
-        return admin_sessions[sid]
-    elif sid in active_users:
-        return active_users[sid]
-    return None
+    return presence.user_id(sid)
 
 @socketio.on('connect')
 def handle_connect():
@@ -61,14 +59,11 @@ def handle_disconnect():
     try:
         log_info(f"Client disconnected: {request.sid}")
         
-        # Remove user from active users if they were authenticated
-        user_id = None
-        if request.sid in active_users:
-            user_id = active_users[request.sid]
-            del active_users[request.sid]
-        elif request.sid in admin_sessions:
-            user_id = admin_sessions[request.sid]
-            del admin_sessions[request.sid]
+        # Remove the session if it was authenticated
+        session = presence.remove_session(request.sid)
+        chat_sessions.close(request.sid)
+        typing_presence.disconnect(request.sid)
+        user_id = session[0] if session else None
         
         if user_id:
             leave_room(f'user_{user_id}')
@@ -95,33 +90,34 @@ def handle_admin_authentication(data):
             return
         
         log_info(f"Verifying admin token: {token[:20]}...")
-        user_data = verify_token(token)
-        if not user_data:
+        token_entry = resolve_token(token)
+        if not token_entry or token_entry['expires_at'] < datetime.utcnow():
             log_error("Invalid admin token verification")
             emit('auth_error', {'message': 'Invalid token'})
             return
         
-        # Verify admin status
-        user_obj = User.query.get(user_data.user_id)
-        if not user_obj or not (hasattr(user_obj, 'admin') and user_obj.admin):
-            log_error(f"User {user_data.user_id} is not an admin")
+        user_id = token_entry['user_id']
+        
+        # Verify admin status (role flags come from the token cache)
+        if not token_entry['is_admin']:
+            log_error(f"User {user_id} is not an admin")
             emit('auth_error', {'message': 'Admin access required'})
             return
         
         # Store admin session
-        admin_sessions[request.sid] = user_data.user_id
+        presence.add_session(request.sid, user_id, is_admin=True)
         
         # Join user-specific room for targeted notifications
-        join_room(f'user_{user_data.user_id}')
+        join_room(f'user_{user_id}')
         
         emit('admin_authenticated', {
             'success': True,
-            'user_id': user_data.user_id,
+            'user_id': user_id,
             'admin': True,
             'message': 'Successfully authenticated as admin with bypass privileges'
         })
         
-        log_info(f"Admin user {user_data.user_id} authenticated with bypass privileges")
+        log_info(f"Admin user {user_id} authenticated with bypass privileges")
         
     except Exception as e:
         log_error("Admin authentication error", e)
@@ -145,25 +141,27 @@ def handle_authentication(data):
             return
         
         log_info(f"Verifying token: {token[:20]}...")
-        user_data = verify_token(token)
-        if not user_data:
+        token_entry = resolve_token(token)
+        if not token_entry or token_entry['expires_at'] < datetime.utcnow():
             log_error("Invalid token verification")
             emit('auth_error', {'message': 'Invalid token'})
             return
         
+        user_id = token_entry['user_id']
+        
         # Store user session
-        active_users[request.sid] = user_data.user_id
+        presence.add_session(request.sid, user_id)
         
         # Join user-specific room for targeted notifications
-        join_room(f'user_{user_data.user_id}')
+        join_room(f'user_{user_id}')
         
         emit('authenticated', {
             'success': True,
-            'user_id': user_data.user_id,
+            'user_id': user_id,
             'message': 'Successfully authenticated for notifications'
         })
         
-        log_info(f"User {user_data.user_id} authenticated and joined notification room")
+        log_info(f"User {user_id} authenticated and joined notification room")
         
     except Exception as e:
         log_error("Authentication error", e)
@@ -193,6 +191,10 @@ def handle_join_club_room(data):
             'message': f'Joined club {club_id} notification room'
         })
         
+        # Resume: replay what this client missed since its last delivered message
+        if data.get('last_message_id') is not None:
+            emit_club_messages_since(club_id, data['last_message_id'])
+        
         print(f"User {user_id} joined club room {club_room}")
         
     except Exception as e:
@@ -216,6 +218,7 @@ def handle_leave_club_room(data):
         # Leave club room
         club_room = f'club_{club_id}'
         leave_room(club_room)
+        typing_presence.leave(request.sid, club_room)
         
         emit('left_club_room', {
             'club_id': club_id,
@@ -236,18 +239,9 @@ def handle_typing(data):
         if not user_id:
             return
             
+        # Coalesced and emitted to the room by the typing presence task
         room = f"club_{data['club_id']}"
-        typing_status[room] = typing_status.get(room, {})
-        typing_status[room][user_id] = data['isTyping']
-        
-        # Only emit if someone is actually typing
-        if any(typing_status[room].values()):
-            emit('userTyping', {
-                'users': [uid for uid, typing in typing_status[room].items() if typing],
-                'isTyping': True
-            }, room=room)
-        else:
-            emit('userTyping', {'isTyping': False}, room=room)
+        typing_presence.update(request.sid, room, user_id, bool(data['isTyping']))
     except Exception as e:
         logger.error(f"Error in typing: {str(e)}")
 
@@ -276,6 +270,9 @@ def handle_join_event_chat(data):
         event_room = f'event_{event_id}_{chat_type}'
         join_room(event_room)
         
+        # Warm the chat session so the first message skips the lookups
+        chat_sessions.authorize(request.sid, user_id, event_id, chat_type, admin_session=is_admin_session(request.sid))
+        
         emit('joined_chat', {
             'event_id': event_id,
             'chat_type': chat_type,
@@ -314,100 +311,65 @@ def handle_send_event_message(data, callback=None):
                 callback({'error': 'Missing required fields'})
             return
         
-        # Get user object
-        user_obj = User.query.get(user_id)
-        if not user_obj:
-            log_error(f"User {user_id} not found in database")
+        # Profile and event role come from the socket's cached chat session
+        chat_session, access_error = chat_sessions.authorize(
+            request.sid, user_id, event_id, chat_type, admin_session=is_admin_session(request.sid)
+        )
+        if access_error:
+            log_error(f"User {user_id} denied access to event {event_id} {chat_type} chat: {access_error}")
             if callback:
-                callback({'error': 'User not found'})
+                callback({'error': access_error})
             return
         
-        # Check if user is admin - consistent check
-        is_admin = user_obj and hasattr(user_obj, 'admin') and user_obj.admin
-        is_admin_session_user = is_admin_session(request.sid)
-        
-        log_info(f"User {user_id} admin status: {is_admin}, admin session: {is_admin_session_user}")
-        
-        # Admin users bypass all permission checks
-        if not (is_admin or is_admin_session_user):
-            # For non-admin users, check event association
-            user_association = UserEventAssociation.query.filter_by(
-                user_id=user_id,
-                event_id=event_id
-            ).first()
-
-            if not user_association:
-                log_error(f"User {user_id} not associated with event {event_id}")
-                if callback: 
-                    callback({'error': 'Access denied - not associated with event'})
+        # Save message to database, or queue it for the write-behind flusher
+        if chat_writer.enabled:
+            if chat_type not in EventChat.chat_type.type.enums:
+                log_error(f"Invalid chat type {chat_type}")
+                if callback:
+                    callback({'error': 'Failed to save message'})
+                return
+            try:
+                new_message = EventChat(**chat_writer.submit('event', {
+                    'event_id': event_id,
+                    'sender_id': user_id,
+                    'message': message_text,
+                    'chat_type': chat_type
+                }))
+                log_info(f"Message queued for write-behind: {new_message.id}")
+            except Exception as e:
+                log_error("Failed to queue chat message", e)
+                if callback:
+                    callback({'error': 'Failed to save message'})
                 return
-
-            user_role = user_association.role or 'attendee'
-            log_info(f"User {user_id} role in event {event_id}: {user_role}")
-
-            # Role-based access control for non-admin users
-            if chat_type == 'organizer_admin':
-                if user_role not in ['organizer']:
-                    log_error(f"User {user_id} denied organizer access")
-                    if callback: 
-                        callback({'error': 'Access denied - organizer access required'})
-                    return
-            elif chat_type == 'organizer_volunteer':
-                if user_role not in ['organizer', 'volunteer']:
-                    log_error(f"User {user_id} denied organizer/volunteer access")
-                    if callback: 
-                        callback({'error': 'Access denied - organizer or volunteer access required'})
-                    return
-            elif chat_type == 'attendee_only':
-                if user_role not in ['organizer', 'volunteer', 'attendee']:
-                    log_error(f"User {user_id} denied attendee access")
-                    if callback: 
-                        callback({'error': 'Access denied - not registered for event'})
-                    return
         else:
-            log_info(f"Admin user {user_id} bypassing permission checks")
-        
-        # Save message to database
-        try:
-            new_message = EventChat(
-                event_id=event_id,
-                sender_id=user_id,
-                message=message_text,
-                chat_type=chat_type,
-                timestamp=datetime.utcnow()
-            )
+            try:
+                new_message = EventChat(
+                    event_id=event_id,
+                    sender_id=user_id,
+                    message=message_text,
+                    chat_type=chat_type,
+                    timestamp=datetime.utcnow()
+                )
             
-            db.session.add(new_message)
-            db.session.commit()
+                db.session.add(new_message)
+                EventCounters.bump(event_id, message_count=1)
+                db.session.commit()
             
-            log_info(f"Message saved to database: {new_message.id}")
+                log_info(f"Message saved to database: {new_message.id}")
             
-        except Exception as e:
-            db.session.rollback()
-            log_error("Failed to save chat message", e)
-            if callback:
-                callback({'error': 'Failed to save message'})
-            return
+            except Exception as e:
+                db.session.rollback()
+                log_error("Failed to save chat message", e)
+                if callback:
+                    callback({'error': 'Failed to save message'})
+                return
         
-        # Get sender details
-        sender_name = None
-        if user_obj:
-            if hasattr(user_obj, 'student') and user_obj.student:
-                sender_name = user_obj.student.full_name
-            elif hasattr(user_obj, 'faculty') and user_obj.faculty:
-                sender_name = user_obj.faculty.full_name
-            elif hasattr(user_obj, 'admin') and user_obj.admin:
-                sender_name = user_obj.admin.full_name
-            else:
-                # Use the full_name property from User model
-                sender_name = getattr(user_obj, 'full_name', 'Unknown')
-
         # Prepare message data
         message_data = {
             'id': new_message.id,
             'event_id': new_message.event_id,
             'sender_id': new_message.sender_id,
-            'sender_name': sender_name or "Unknown",
+            'sender_name': chat_session.sender_name,
             'message': new_message.message,
             'chat_type': new_message.chat_type,
             'timestamp': new_message.timestamp.isoformat()
@@ -443,12 +405,9 @@ def handle_typing_event(data):
         if not event_id:
             return
         
-        # Emit typing indicator to event chat room
+        # Coalesced and emitted to the event chat room by the typing presence task
         event_room = f'event_{event_id}_{chat_type}'
-        emit('user_typing_event', {
-            'user_id': user_id,
-            'is_typing': is_typing
-        }, room=event_room, include_self=False)
+        typing_presence.update(request.sid, event_room, user_id, bool(is_typing))
         
     except Exception as e:
         print(f"Error handling typing event: {str(e)}")
@@ -463,11 +422,8 @@ def handle_unread_count_request():
             return
         
         # Get unread count from database
-        from .models.notification import Notification
-        unread_count = Notification.query.filter_by(
-            user_id=user_id,
-            is_read=False
-        ).count()
+        from .services.notification_inbox import NotificationInbox
+        unread_count = NotificationInbox.unread_count(user_id)
         
         emit('unread_count_update', {'count': unread_count})
         
@@ -486,6 +442,8 @@ def handle_join_room(data):
         room = f"club_{data['club_id']}"
         join_room(room)
         emit('status', {'msg': f'Joined room: {room}'}, room=request.sid)
+        if data.get('last_message_id') is not None:
+            emit_club_messages_since(data['club_id'], data['last_message_id'])
     except Exception as e:
         logger.error(f"Error in joinClubRoom: {str(e)}")
         emit('error', {'message': str(e)}, room=request.sid)
@@ -501,6 +459,23 @@ def handle_send_message(data):
             
         room = f"club_{data['club_id']}"
         
+        from .utils.chat_history import club_message_to_dict
+        if chat_writer.enabled:
+            # Emit now; the write-behind flusher inserts the message
+            from Backend.models import Club
+            row = chat_writer.submit('club', {
+                'club_id': data['club_id'],
+                'sender_id': user_id,
+                'message_text': data['message_text'],
+                'is_admin_message': False
+            })
+            leader_id = db.session.query(Club.leader_id).filter_by(club_id=data['club_id']).scalar()
+            chat_session = chat_sessions.profile(request.sid, user_id)
+            message = club_message_to_dict(SimpleNamespace(sender=None, **row), leader_id)
+            message['sender_name'] = chat_session.sender_name if chat_session else "Unknown"
+            emit('newMessage', message, room=room)
+            return
+        
         # Save to database
         from Backend.models import ClubChat
         chat = ClubChat(
@@ -513,15 +488,7 @@ def handle_send_message(data):
         db.session.commit()
         
         # Broadcast to room
-        message = {
-            'message_id': chat.message_id,
-            'club_id': chat.club_id,
-            'sender_id': chat.sender_id,
-            'sender_name': chat.sender.full_name if chat.sender else "Unknown",
-            'message_text': chat.message_text,
-            'sent_at': chat.sent_at.isoformat(),
-            'is_leader': chat.club.leader_id == user_id
-        }
+        message = club_message_to_dict(chat, chat.club.leader_id)
         print('Message sent:', message)
         emit('newMessage', message, room=room)
     except Exception as e:
@@ -529,6 +496,25 @@ def handle_send_message(data):
         logger.error(f"Error in sendMessage: {str(e)}")
         emit('error', {'message': str(e)}, room=request.sid)
 
+def emit_club_messages_since(club_id, last_message_id):
+    """
+    Send the joining client the club messages after last_message_id, one
+    window at a time. has_more tells the client to page on via
+    GET /clubs/<id>/chats?since_message_id=<newest_id>.
+    """
+    from Backend.models import Club
+    from .utils.chat_history import club_chat_window, club_message_to_dict
+
+    club = Club.query.get(club_id)
+    if not club:
+        return
+    chats, has_more = club_chat_window(club_id, after_id=int(last_message_id))
+    emit('clubMessagesSince', {
+        'club_id': club.club_id,
+        'messages': [club_message_to_dict(chat, club.leader_id) for chat in chats],
+        'has_more': has_more
+    }, room=request.sid)
+
 # Utility functions for broadcasting notifications
 def broadcast_to_user(user_id, event_name, data):
     """Broadcast event to specific user"""
@@ -560,11 +546,8 @@ def notify_user_realtime(user_id, notification_data):
     
     # Also send unread count update
     try:
-        from .models.notification import Notification
-        unread_count = Notification.query.filter_by(
-            user_id=user_id,
-            is_read=False
-        ).count()
+        from .services.notification_inbox import NotificationInbox
+        unread_count = NotificationInbox.unread_count(user_id)
         broadcast_to_user(user_id, 'unread_count_update', {'count': unread_count})
     except Exception as e:
         print(f"Failed to update unread count for user {user_id}: {str(e)}")
@@ -0,0 +1,301 @@
+"""
+Write-behind chat persistence (optional, CHAT_WRITE_BEHIND=true)
+Socket chat messages get their id and timestamp in process and are emitted
+straight away; a background flusher bulk-inserts them every
+CHAT_FLUSH_INTERVAL_MS or once CHAT_FLUSH_BATCH_SIZE are waiting.
+
+Ids are reserved in blocks from the table's own sequence, so they stay the
+integers the clients and the keyset windows already use. Before a message is
+acknowledged it is appended (and by default fsynced) to a spill segment in
+CHAT_SPILL_DIR; a segment is deleted only once every message in it is
+committed. Segments left behind by a crash are replayed at startup. Inserts
+use ON CONFLICT DO NOTHING on the reserved id, so replaying a segment that
+was already partly flushed is harmless and only new rows bump the counters.
+
+Within a process, id order, timestamp order, spill order and emit order are
+the same. Messages reach the history endpoints after at most one flush
+interval.
+"""
+
+import atexit
+import glob
+import json
+import os
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import DataError, IntegrityError
+from .. import db
+
+try:
+    import fcntl
+except ImportError:  # no cross-process guard on spill segments
+    fcntl = None
+
+# kind -> (model name, id column, timestamp column)
+CHAT_KINDS = {
+    'event': ('EventChat', 'id', 'timestamp'),
+    'club': ('ClubChat', 'message_id', 'sent_at')
+}
+
+
+def _chat_model(kind):
+    from .. import models
+    return getattr(models, CHAT_KINDS[kind][0])
+
+
+class SpillSegment:
+    """One append-only JSON-lines file of acknowledged, not yet committed messages"""
+
+    def __init__(self, path, fsync=True):
+        self.path = path
+        self.fsync = fsync
+        self.file = open(path, 'a', encoding='utf-8')
+        if fcntl:
+            # Held until the segment is removed so a starting process does not replay it
+            fcntl.flock(self.file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        self.count = 0
+
+    def append(self, kind, row):
+        self.file.write(json.dumps({'kind': kind, 'row': row}, default=lambda value: value.isoformat()) + '\n')
+        self.file.flush()
+        if self.fsync:
+            os.fsync(self.file.fileno())
+        self.count += 1
+
+    def remove(self):
+        os.remove(self.path)
+        self.file.close()
+
+
+class ChatWriteBehind:
+    """Reserves ids, spills, buffers and bulk-inserts chat messages"""
+
+    def __init__(self):
+        self.app = None
+        self.enabled = False
+        self.flush_interval = 0.2
+        self.batch_size = 500
+        self.id_block_size = 100
+        self.spill_dir = None
+        self.fsync = True
+        self._ids = {kind: deque() for kind in CHAT_KINDS}
+        self._pending = []  # [(kind, row)] in submit order
+        self._retry = []  # rows of a failed flush, written before _pending
+        self._segment = None
+        self._sealed = []  # segments whose rows are in _retry or being flushed
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = False
+        self._thread = None
+        self.submitted = 0
+        self.flushed = 0
+        self.flushes = 0
+        self.failures = 0
+        self.dropped = 0
+        self.replayed = 0
+
+    def init_app(self, app):
+        """Replay spilled messages and start the flusher when CHAT_WRITE_BEHIND is on"""
+        if not app.config.get('CHAT_WRITE_BEHIND') or self._thread is not None:
+            return
+        if app.config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite'):
+            print("Warning: Chat write-behind needs PostgreSQL sequences; writing chat messages synchronously")
+            return
+
+        self.app = app
+        self.flush_interval = app.config.get('CHAT_FLUSH_INTERVAL_MS', 200) / 1000
+        self.batch_size = app.config.get('CHAT_FLUSH_BATCH_SIZE', self.batch_size)
+        self.id_block_size = app.config.get('CHAT_ID_BLOCK_SIZE', self.id_block_size)
+        self.spill_dir = app.config['CHAT_SPILL_DIR']
+        self.fsync = app.config.get('CHAT_SPILL_FSYNC', True)
+        os.makedirs(self.spill_dir, exist_ok=True)
+
+        with app.app_context():
+            self.replayed = self.replay()
+        if self.replayed:
+            print(f"✓ Replayed {self.replayed} spilled chat messages")
+
+        self._segment = self._open_segment()
+        self.enabled = True
+        self._thread = threading.Thread(target=self.run_forever, daemon=True, name='chat-writer')
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def submit(self, kind, values):
+        """
+        Give the message its id and timestamp, spill it and queue it for the
+        flusher. Returns the complete row; the caller emits it.
+        """
+        _, id_column, time_column = CHAT_KINDS[kind]
+        with self._lock:
+            ids = self._ids[kind]
+            if not ids:
+                ids.extend(self._reserve_ids(kind))
+            row = dict(values)
+            row[id_column] = ids.popleft()
+            row[time_column] = datetime.utcnow()
+            self._segment.append(kind, row)
+            self._pending.append((kind, row))
+            self.submitted += 1
+            backlog = len(self._pending)
+
+        if backlog >= self.batch_size:
+            self._wakeup.set()
+        return row
+
+    def flush(self):
+        """Write everything submitted so far; returns the number of rows committed"""
+        with self._flush_lock:
+            with self._lock:
+                batch = self._retry + self._pending
+                if not batch:
+                    return 0
+                self._retry = []
+                self._pending = []
+                self._sealed.append(self._segment)
+                self._segment = self._open_segment()
+
+            try:
+                with self.app.app_context():
+                    written = self._write(batch)
+            except Exception as e:
+                db.session.rollback()
+                with self._lock:
+                    self._retry = batch
+                self.failures += 1
+                print(f"Error flushing {len(batch)} chat messages, will retry: {str(e)}")
+                return 0
+
+            with self._lock:
+                sealed, self._sealed = self._sealed, []
+            for segment in sealed:
+                segment.remove()
+            self.flushed += written
+            self.flushes += 1
+            return written
+
+    def run_forever(self):
+        while not self._stopping:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Error in chat writer: {str(e)}")
+
+    def stop(self):
+        """Final flush on shutdown; anything that fails stays in the spill files"""
+        if not self.enabled:
+            return
+        self._stopping = True
+        self._wakeup.set()
+        self.flush()
+        with self._lock:
+            if self._segment is not None and not self._segment.count and not self._retry:
+                self._segment.remove()
+                self._segment = None
+        self.enabled = False
+
+    def replay(self):
+        """Insert the messages of spill segments no live process holds; returns rows inserted"""
+        inserted = 0
+        for path in sorted(glob.glob(os.path.join(self.spill_dir, 'chat-*.jsonl'))):
+            with open(path, 'r', encoding='utf-8') as spill:
+                if fcntl:
+                    try:
+                        fcntl.flock(spill.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except OSError:
+                        continue  # owned by a running process
+
+                rows = []
+                for line in spill:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # torn final line of a crashed write; it was never acknowledged
+                    row = entry['row']
+                    time_column = CHAT_KINDS[entry['kind']][2]
+                    row[time_column] = datetime.fromisoformat(row[time_column])
+                    rows.append((entry['kind'], row))
+
+                for start in range(0, len(rows), self.batch_size):
+                    inserted += self._write(rows[start:start + self.batch_size])
+            os.remove(path)
+        return inserted
+
+    def stats(self):
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'pending': len(self._pending),
+                'retrying': len(self._retry),
+                'spill_segments': len(self._sealed) + (1 if self._segment else 0),
+                'submitted': self.submitted,
+                'flushed': self.flushed,
+                'flushes': self.flushes,
+                'failures': self.failures,
+                'dropped': self.dropped,
+                'replayed': self.replayed
+            }
+
+    def _write(self, batch):
+        """Bulk insert one batch and bump the event message counters; commits"""
+        try:
+            inserted = self._insert(batch)
+            db.session.commit()
+            return inserted
+        except (IntegrityError, DataError):
+            # A bad row (deleted event or club, invalid chat type) must not block the rest
+            db.session.rollback()
+
+        inserted = 0
+        for kind, row in batch:
+            try:
+                inserted += self._insert([(kind, row)])
+                db.session.commit()
+            except (IntegrityError, DataError) as e:
+                db.session.rollback()
+                self.dropped += 1
+                print(f"❌ Dropping chat message {row[CHAT_KINDS[kind][1]]}: {str(e)}")
+        return inserted
+
+    def _insert(self, batch):
+        from ..models import EventCounters
+
+        inserted = 0
+        for kind in CHAT_KINDS:
+            rows = [row for row_kind, row in batch if row_kind == kind]
+            if not rows:
+                continue
+            table = _chat_model(kind).__table__
+            id_column = CHAT_KINDS[kind][1]
+            statement = pg_insert(table).values(rows).on_conflict_do_nothing(index_elements=[id_column])
+
+            if kind == 'event':
+                event_ids = db.session.execute(statement.returning(table.c.event_id)).scalars().all()
+                for event_id, count in Counter(event_ids).items():
+                    EventCounters.bump(event_id, message_count=count)
+                inserted += len(event_ids)
+            else:
+                inserted += len(db.session.execute(statement.returning(table.c[id_column])).scalars().all())
+        return inserted
+
+    def _reserve_ids(self, kind):
+        table = _chat_model(kind).__table__
+        with db.engine.connect() as connection:
+            return connection.execute(
+                text("SELECT nextval(pg_get_serial_sequence(:table, :column)) FROM generate_series(1, :n)"),
+                {'table': table.name, 'column': CHAT_KINDS[kind][1], 'n': self.id_block_size}
+            ).scalars().all()
+
+    def _open_segment(self):
+        path = os.path.join(self.spill_dir, f'chat-{time.time_ns():020d}-{os.getpid()}.jsonl')
+        return SpillSegment(path, fsync=self.fsync)
+
+
+chat_writer = ChatWriteBehind()
\ No newline at end of file
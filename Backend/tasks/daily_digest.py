@@ -0,0 +1,186 @@
+"""
+Personalized daily event digest
+Walks the active users in user_id order, DIGEST_CHUNK_SIZE at a time. For
+each chunk three set-based queries find, among the week's upcoming events,
+the ones from the users' clubs, the ones they registered for and their
+category history; every user gets their DIGEST_EVENTS_PER_USER best matches
+(the soonest events when nothing matches). A chunk is one multi-row INSERT
+whose commit also advances the day's DigestRun checkpoint, followed by one
+push per recipient, so an interrupted run resumes after its last committed
+chunk (see resume_daily_digest).
+"""
+
+from collections import defaultdict
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import func, insert
+from sqlalchemy.exc import IntegrityError
+from ..models.user import User
+from ..models.event import Event
+from ..models.event_registration import EventRegistration
+from ..models.association_tables import user_club_association, ClubMembershipStatus
+from ..models.notification import Notification, NotificationType
+from ..models.notification_counter import NotificationCounter
+from ..models.digest_run import DigestRun, DIGEST_RUNNING, DIGEST_COMPLETED
+from ..utils.notification_fanout import notification_payload, push_notifications
+from ..utils.unread_cache import unread_counts
+from .. import db
+
+# Match weights: registered > club event > category affinity (0..1 share of past registrations)
+REGISTERED_WEIGHT = 3
+CLUB_WEIGHT = 2
+AFFINITY_WEIGHT = 1
+
+
+def digest_candidates(limit=50, days=7):
+    """Upcoming events of the next `days` days, soonest first"""
+    now = datetime.utcnow()
+    return Event.query.filter(
+        Event.event_date >= now,
+        Event.event_date <= now + timedelta(days=days),
+        Event.event_status == 'upcoming'
+    ).order_by(Event.event_date.asc(), Event.event_id.asc()).limit(limit).all()
+
+
+def digest_message(events):
+    event_list = "\n".join([f"• {event.title} - {event.event_date.strftime('%m/%d %H:%M')}" for event in events])
+    return f"📅 Upcoming Events This Week:\n{event_list}"
+
+
+def score_events(user_ids, candidates):
+    """{user_id: {event_id: score}} for the chunk, from three grouped queries"""
+    event_ids = [event.event_id for event in candidates]
+    club_events = defaultdict(list)
+    for event in candidates:
+        if event.club_id is not None:
+            club_events[event.club_id].append(event.event_id)
+    category_of = {event.event_id: event.category for event in candidates}
+    scores = defaultdict(lambda: defaultdict(float))
+
+    for user_id, event_id in db.session.query(EventRegistration.user_id, EventRegistration.event_id).filter(
+        EventRegistration.user_id.in_(user_ids),
+        EventRegistration.event_id.in_(event_ids)
+    ):
+        scores[user_id][event_id] += REGISTERED_WEIGHT
+
+    if club_events:
+        for user_id, club_id in db.session.query(user_club_association.c.user_id, user_club_association.c.club_id).filter(
+            user_club_association.c.user_id.in_(user_ids),
+            user_club_association.c.club_id.in_(list(club_events)),
+            user_club_association.c.status == ClubMembershipStatus.APPROVED.value
+        ):
+            for event_id in club_events[club_id]:
+                scores[user_id][event_id] += CLUB_WEIGHT
+
+    history = defaultdict(dict)
+    for user_id, category, count in db.session.query(
+        EventRegistration.user_id, Event.category, func.count()
+    ).join(Event, Event.event_id == EventRegistration.event_id).filter(
+        EventRegistration.user_id.in_(user_ids),
+        Event.category.isnot(None)
+    ).group_by(EventRegistration.user_id, Event.category):
+        history[user_id][category] = count
+    for user_id, categories in history.items():
+        total = sum(categories.values())
+        for event_id, category in category_of.items():
+            if category in categories:
+                scores[user_id][event_id] += AFFINITY_WEIGHT * categories[category] / total
+
+    return scores
+
+
+def pick_events(event_scores, candidates, per_user):
+    """Best-scoring events (ties: soonest first), or the soonest events when nothing scored"""
+    if not event_scores:
+        return candidates[:per_user]
+    ranked = sorted(candidates, key=lambda event: -event_scores.get(event.event_id, 0))
+    return sorted(ranked[:per_user], key=lambda event: (event.event_date, event.event_id))
+
+
+def digest_chunk(run, user_ids, candidates, per_user):
+    """Write and push one chunk's digests, advancing the checkpoint in the same commit"""
+    scores = score_events(user_ids, candidates)
+    created_at = datetime.utcnow()
+    rows = [
+        {
+            'user_id': user_id,
+            'message': digest_message(pick_events(scores.get(user_id), candidates, per_user)),
+            'notification_type': NotificationType.EVENT_REMINDER,
+            'is_read': False,
+            'created_at': created_at
+        }
+        for user_id in user_ids
+    ]
+
+    try:
+        inserted = db.session.execute(
+            insert(Notification).returning(Notification.notification_id, Notification.user_id, Notification.message),
+            rows
+        ).all()
+        NotificationCounter.bump([row.user_id for row in inserted], 1)
+        run.last_user_id = user_ids[-1]
+        run.users_processed += len(user_ids)
+        run.notifications_created += len(inserted)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    unread_counts.adjust([row.user_id for row in inserted], 1)
+    push_notifications([
+        (row.user_id, notification_payload(row.notification_id, row.message, NotificationType.EVENT_REMINDER, created_at))
+        for row in inserted
+    ])
+    return len(inserted)
+
+
+def run_daily_digest(resume_only=False):
+    """
+    Start today's digest, or continue it from its checkpoint. With
+    resume_only, only an unfinished run is continued. Returns the DigestRun
+    (None if nothing was started).
+    """
+    config = current_app.config
+    chunk_size = config.get('DIGEST_CHUNK_SIZE', 1000)
+    per_user = config.get('DIGEST_EVENTS_PER_USER', 5)
+    today = datetime.utcnow().date()
+
+    run = DigestRun.query.get(today)
+    if run is None:
+        if resume_only:
+            return None
+        run = DigestRun(run_date=today, status=DIGEST_RUNNING, last_user_id=0, started_at=datetime.utcnow())
+        try:
+            db.session.add(run)
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            return None  # another process started today's digest
+    elif run.status == DIGEST_COMPLETED:
+        return run
+    else:
+        print(f"Resuming daily digest after user {run.last_user_id} ({run.users_processed} users done)")
+
+    candidates = digest_candidates(limit=config.get('DIGEST_CANDIDATE_EVENTS', 50))
+    while candidates:
+        user_ids = [
+            user_id for (user_id,) in db.session.query(User.user_id).filter(
+                User.is_active == True,
+                User.user_id > run.last_user_id
+            ).order_by(User.user_id.asc()).limit(chunk_size)
+        ]
+        if not user_ids:
+            break
+        digest_chunk(run, user_ids, candidates, per_user)
+        print(f"Daily digest: {run.users_processed} users, {run.notifications_created} notifications")
+
+    run.status = DIGEST_COMPLETED
+    run.finished_at = datetime.utcnow()
+    db.session.commit()
+    print(f"✓ Daily digest completed for {run.users_processed} users")
+    return run
+
+
+def resume_daily_digest():
+    """Continue today's digest if a previous process stopped mid-run"""
+    return run_daily_digest(resume_only=True)
\ No newline at end of file
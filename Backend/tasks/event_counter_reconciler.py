@@ -0,0 +1,69 @@
+"""
+Event counter reconciliation
+Recomputes the maintained event counters from the source tables and repairs
+any drift (cascaded deletes, writes that bypass EventCounters.bump, etc.)
+"""
+
+from ..models.event import Event
+from ..models.event_counters import EventCounters, COUNTER_SOURCES
+from .. import db
+
+def reconcile_event_counters(batch_size=500):
+    """
+    Compare stored counters with freshly tallied ones, batch_size events at a
+    time, and fix rows that differ or are missing.
+    Each batch is its own short transaction; an increment racing a repair can
+    be overwritten and is corrected on the next run. Returns the number of
+    events repaired.
+    """
+    repaired = 0
+    last_event_id = 0
+
+    while True:
+        event_ids = [
+            event_id for (event_id,) in db.session.query(Event.event_id)
+            .filter(Event.event_id > last_event_id)
+            .order_by(Event.event_id.asc())
+            .limit(batch_size)
+            .all()
+        ]
+        if not event_ids:
+            break
+        last_event_id = event_ids[-1]
+
+        tallied = EventCounters.tally(event_ids)
+        stored = {
+            counters.event_id: counters
+            for counters in EventCounters.query.filter(EventCounters.event_id.in_(event_ids)).all()
+        }
+
+        try:
+            for event_id in event_ids:
+                expected = tallied.get(event_id, dict.fromkeys(COUNTER_SOURCES, 0))
+                counters = stored.get(event_id)
+                if counters is None:
+                    db.session.add(EventCounters(event_id=event_id, **expected))
+                elif any(getattr(counters, name) != value for name, value in expected.items()):
+                    for name, value in expected.items():
+                        setattr(counters, name, value)
+                else:
+                    continue
+                repaired += 1
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        if len(event_ids) < batch_size:
+            break
+
+    return repaired
+
+def schedule_event_counter_reconciler(scheduler, interval_minutes=60, batch_size=500):
+    """Run reconcile_event_counters every interval_minutes on the scheduler"""
+    def run_reconciler():
+        repaired = reconcile_event_counters(batch_size=batch_size)
+        if repaired:
+            print(f"✓ Event counter reconciliation repaired {repaired} events")
+
+    return scheduler.add_job('counters.reconcile_events', run_reconciler, minutes=interval_minutes)
\ No newline at end of file
@@ -0,0 +1,107 @@
+"""
+Job handlers
+Notification fan-out, real-time pushes, emails and reminder sends run here,
+on the job workers, instead of inside the HTTP request that triggered them.
+Handlers raise to have the job retried; a fan-out is only retried when
+nothing was written, so a retry never notifies the same users twice.
+"""
+
+from ..models.event import Event
+from ..models.notification import NotificationType
+from ..models.broadcast_notification import BROADCAST_ALL_USERS, BROADCAST_CLUB_MEMBERS, BROADCAST_ADMINS
+from ..utils.notification_fanout import (
+    fan_out_notifications, broadcast_notification, normalize_notification_type, event_registrants
+)
+from .job_queue import job_handler, enqueue
+
+# Audience-wide announcements are stored once as a broadcast
+BROADCAST_AUDIENCES = {
+    'all_active_users': BROADCAST_ALL_USERS,
+    'club_members': BROADCAST_CLUB_MEMBERS,
+    'admins': BROADCAST_ADMINS,
+}
+
+# Everything else is written per recipient: audience name -> recipient select builder
+DIRECT_AUDIENCES = {
+    'event_registrants': event_registrants,
+}
+
+
+def enqueue_notification_fan_out(audience, message, notification_type=NotificationType.GENERAL,
+                                 related_club_id=None, related_event_id=None, related_user_id=None,
+                                 commit=True, **audience_args):
+    """Queue a notification to everyone in `audience` (a key of BROADCAST_AUDIENCES or DIRECT_AUDIENCES)"""
+    if audience not in BROADCAST_AUDIENCES and audience not in DIRECT_AUDIENCES:
+        raise ValueError(f"Unknown notification audience '{audience}'")
+    return enqueue('notifications.fan_out', {
+        'audience': audience,
+        'audience_args': audience_args,
+        'message': message,
+        'notification_type': normalize_notification_type(notification_type).value,
+        'related_club_id': related_club_id,
+        'related_event_id': related_event_id,
+        'related_user_id': related_user_id
+    }, queue='notifications', commit=commit)
+
+
+@job_handler('notifications.fan_out')
+def fan_out_job(audience, message, notification_type, audience_args=None,
+                related_club_id=None, related_event_id=None, related_user_id=None):
+    audience_args = audience_args or {}
+    if audience in BROADCAST_AUDIENCES:
+        # A failed insert raises before anything is pushed, so retrying is safe
+        stats = broadcast_notification(
+            BROADCAST_AUDIENCES[audience],
+            message=message,
+            notification_type=notification_type,
+            audience_club_id=audience_args.get('club_id'),
+            exclude_user_id=audience_args.get('exclude_user_id'),
+            related_club_id=related_club_id,
+            related_event_id=related_event_id,
+            related_user_id=related_user_id
+        )
+        print(f"Broadcast notification {stats['broadcast_id']} to {stats['recipients']} {audience}")
+        return
+
+    stats = fan_out_notifications(
+        DIRECT_AUDIENCES[audience](**audience_args),
+        message=message,
+        notification_type=notification_type,
+        related_club_id=related_club_id,
+        related_event_id=related_event_id,
+        related_user_id=related_user_id
+    )
+    if stats['recipients'] and not stats['created']:
+        raise RuntimeError(f"All {stats['failed_chunks']} notification chunks failed")
+    if stats['failed_chunks']:
+        print(f"Notification fan-out to {audience} lost {stats['failed_chunks']} chunks")
+    print(f"Created {stats['created']} notifications for {audience}")
+
+
+@job_handler('notifications.club_realtime')
+def club_realtime_job(club_id, data):
+    from ..socket_handlers import notify_club_realtime
+    notify_club_realtime(club_id, data)
+
+
+@job_handler('email.welcome')
+def welcome_email_job(email, full_name):
+    from ..utils.email_service import EmailService
+    success, message = EmailService.send_welcome_email(email, full_name)
+    if not success:
+        raise RuntimeError(message)
+
+
+@job_handler('reminders.event')
+def event_reminder_job(event_id):
+    event = Event.query.get(event_id)
+    if not event:
+        print(f"Event {event_id} not found, skipping reminder")
+        return
+    fan_out_job(
+        'event_registrants',
+        f"⏰ Reminder: '{event.title}' is starting soon! Don't forget to attend.",
+        NotificationType.EVENT_REMINDER.value,
+        audience_args={'event_id': event.event_id},
+        related_event_id=event.event_id
+    )
\ No newline at end of file
@@ -0,0 +1,306 @@
+"""
+Database-backed job queue
+Request handlers enqueue jobs (one INSERT) and return; worker threads, either
+in the web process or in `python -m Backend.worker`, claim them with
+SELECT ... FOR UPDATE SKIP LOCKED, run the registered handler and retry
+failures with exponential backoff until they are moved to the dead state.
+"""
+
+import os
+import random
+import socket
+import threading
+import time
+import traceback
+from datetime import datetime, timedelta
+from threading import Thread
+from flask import current_app
+from ..models.job import Job, JOB_PENDING, JOB_RUNNING, JOB_SUCCEEDED, JOB_DEAD
+from .. import db
+
+# task name -> callable(**payload)
+JOB_HANDLERS = {}
+
+# Wakes idle in-process workers as soon as a job is enqueued
+_wakeup = threading.Condition()
+
+
+def job_handler(name):
+    """Register a function as the handler for jobs with task == name"""
+    def decorator(func):
+        JOB_HANDLERS[name] = func
+        return func
+    return decorator
+
+
+def enqueue(task, payload=None, queue='default', delay_seconds=0, max_attempts=None, commit=True):
+    """
+    Add a job and return its job_id.
+    Pass commit=False to enqueue inside the caller's transaction, so the job
+    only exists if the caller's own writes are committed.
+    """
+    if max_attempts is None:
+        max_attempts = current_app.config.get('JOB_MAX_ATTEMPTS', 5)
+
+    job = Job(
+        queue=queue,
+        task=task,
+        payload=payload or {},
+        status=JOB_PENDING,
+        attempts=0,
+        max_attempts=max_attempts,
+        run_at=datetime.utcnow() + timedelta(seconds=delay_seconds)
+    )
+    db.session.add(job)
+    if commit:
+        db.session.commit()
+        wake_workers()
+    else:
+        db.session.flush()
+    return job.job_id
+
+
+def wake_workers():
+    with _wakeup:
+        _wakeup.notify_all()
+
+
+def backoff_seconds(attempts, base_seconds=10, max_seconds=600):
+    """Delay before retry number `attempts`: base * 2^(attempts-1), capped, with 10% jitter"""
+    delay = min(base_seconds * (2 ** max(attempts - 1, 0)), max_seconds)
+    return delay + random.uniform(0, delay * 0.1)
+
+
+def claim_jobs(worker_id, queues=None, limit=1):
+    """
+    Lock up to `limit` due jobs, mark them running and commit.
+    Rows locked by another worker are skipped rather than waited on.
+    Returns [(job_id, task, payload, attempts, max_attempts)].
+    """
+    now = datetime.utcnow()
+    query = Job.query.filter(Job.status == JOB_PENDING, Job.run_at <= now)
+    if queues:
+        query = query.filter(Job.queue.in_(queues))
+
+    try:
+        jobs = query.order_by(Job.run_at.asc(), Job.job_id.asc()) \
+            .with_for_update(skip_locked=True) \
+            .limit(limit) \
+            .all()
+
+        claimed = []
+        for job in jobs:
+            job.status = JOB_RUNNING
+            job.locked_by = worker_id
+            job.locked_at = now
+            job.attempts += 1
+            claimed.append((job.job_id, job.task, dict(job.payload or {}), job.attempts, job.max_attempts))
+        db.session.commit()
+        return claimed
+    except Exception:
+        db.session.rollback()
+        raise
+
+
+def complete_job(job_id):
+    Job.query.filter_by(job_id=job_id).update({
+        'status': JOB_SUCCEEDED,
+        'finished_at': datetime.utcnow(),
+        'locked_by': None,
+        'locked_at': None,
+        'last_error': None
+    }, synchronize_session=False)
+    db.session.commit()
+
+
+def fail_job(job_id, attempts, max_attempts, error):
+    """Schedule a retry with backoff, or move the job to the dead state when out of attempts"""
+    config = current_app.config
+    values = {'locked_by': None, 'locked_at': None, 'last_error': error[-4000:]}
+    if attempts >= max_attempts:
+        values.update(status=JOB_DEAD, finished_at=datetime.utcnow())
+    else:
+        delay = backoff_seconds(
+            attempts,
+            base_seconds=config.get('JOB_BACKOFF_BASE_SECONDS', 10),
+            max_seconds=config.get('JOB_BACKOFF_MAX_SECONDS', 600)
+        )
+        values.update(status=JOB_PENDING, run_at=datetime.utcnow() + timedelta(seconds=delay))
+
+    Job.query.filter_by(job_id=job_id).update(values, synchronize_session=False)
+    db.session.commit()
+    return values['status']
+
+
+def run_job(job_id, task, payload, attempts, max_attempts):
+    """Run one claimed job; returns its new status"""
+    handler = JOB_HANDLERS.get(task)
+    try:
+        if handler is None:
+            raise LookupError(f"No handler registered for job task '{task}'")
+        handler(**payload)
+    except Exception as e:
+        db.session.rollback()
+        status = fail_job(job_id, attempts, max_attempts, traceback.format_exc())
+        print(f"Job {job_id} ({task}) failed on attempt {attempts}/{max_attempts}: {str(e)}")
+        return status
+
+    complete_job(job_id)
+    return JOB_SUCCEEDED
+
+
+def requeue_stale_jobs(timeout_seconds=300):
+    """
+    Recover jobs left running by a worker that died mid-job: back to pending,
+    or dead if they already used all their attempts. Returns the number recovered.
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=timeout_seconds)
+    stale = Job.query.filter(Job.status == JOB_RUNNING, Job.locked_at < cutoff)
+    try:
+        dead = stale.filter(Job.attempts >= Job.max_attempts).update({
+            'status': JOB_DEAD,
+            'finished_at': datetime.utcnow(),
+            'locked_by': None,
+            'locked_at': None,
+            'last_error': 'Worker lost while running the job'
+        }, synchronize_session=False)
+        retried = stale.filter(Job.attempts < Job.max_attempts).update({
+            'status': JOB_PENDING,
+            'run_at': datetime.utcnow(),
+            'locked_by': None,
+            'locked_at': None
+        }, synchronize_session=False)
+        db.session.commit()
+        return dead + retried
+    except Exception:
+        db.session.rollback()
+        raise
+
+
+def purge_finished_jobs(retention_days=7, batch_size=1000):
+    """Delete succeeded jobs older than retention_days in batches; dead jobs are kept"""
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    deleted = 0
+    while True:
+        ids = db.session.query(Job.job_id).filter(
+            Job.status == JOB_SUCCEEDED,
+            Job.finished_at < cutoff
+        ).limit(batch_size).subquery()
+        count = Job.query.filter(Job.job_id.in_(db.select(ids.c.job_id))).delete(synchronize_session=False)
+        db.session.commit()
+        deleted += count
+        if count < batch_size:
+            return deleted
+
+
+def retry_job(job_id):
+    """Put a dead job back on the queue with a fresh set of attempts"""
+    updated = Job.query.filter_by(job_id=job_id, status=JOB_DEAD).update({
+        'status': JOB_PENDING,
+        'attempts': 0,
+        'run_at': datetime.utcnow(),
+        'finished_at': None
+    }, synchronize_session=False)
+    db.session.commit()
+    if updated:
+        wake_workers()
+    return bool(updated)
+
+
+def queue_stats():
+    """Number of jobs per status"""
+    counts = dict(db.session.query(Job.status, db.func.count(Job.job_id)).group_by(Job.status).all())
+    return {status: counts.get(status, 0) for status in (JOB_PENDING, JOB_RUNNING, JOB_SUCCEEDED, JOB_DEAD)}
+
+
+class JobWorkerPool:
+    """
+    Worker threads that poll the jobs table.
+    Each thread claims one job at a time; idle threads sleep up to
+    poll_interval seconds or until enqueue() wakes them. One thread also
+    recovers stale jobs and purges old succeeded ones once a minute.
+    """
+
+    def __init__(self):
+        self.app = None
+        self.threads = []
+        self.processed = 0
+        self.failed = 0
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """Start the in-process workers unless JOB_WORKER_THREADS is 0"""
+        if app.config.get('JOB_WORKER_THREADS', 2) > 0:
+            self.start(app, app.config['JOB_WORKER_THREADS'])
+
+    def start(self, app, thread_count, queues=None):
+        if self.threads:
+            return self.threads
+        from . import job_handlers  # registers the handlers
+        self.app = app
+        self._stop.clear()
+        prefix = f"{socket.gethostname()}:{os.getpid()}"
+        for index in range(thread_count):
+            thread = Thread(
+                target=self._run,
+                args=(f"{prefix}:{index}", queues, index == 0),
+                daemon=True
+            )
+            thread.start()
+            self.threads.append(thread)
+        return self.threads
+
+    def stop(self):
+        self._stop.set()
+        wake_workers()
+
+    def run_forever(self, app, thread_count, queues=None):
+        """Start the workers and block until interrupted (standalone worker process)"""
+        self.start(app, thread_count, queues)
+        try:
+            while not self._stop.is_set():
+                time.sleep(1)
+        except KeyboardInterrupt:
+            self.stop()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'threads': len(self.threads),
+                'processed': self.processed,
+                'failed': self.failed
+            }
+
+    def _run(self, worker_id, queues, housekeeper):
+        config = self.app.config
+        poll_interval = config.get('JOB_POLL_INTERVAL_SECONDS', 1)
+        last_housekeeping = 0
+
+        while not self._stop.is_set():
+            claimed = []
+            try:
+                with self.app.app_context():
+                    if housekeeper and time.monotonic() - last_housekeeping >= 60:
+                        last_housekeeping = time.monotonic()
+                        recovered = requeue_stale_jobs(config.get('JOB_LOCK_TIMEOUT_SECONDS', 300))
+                        if recovered:
+                            print(f"✓ Recovered {recovered} stale jobs")
+                        purge_finished_jobs(config.get('JOB_RETENTION_DAYS', 7))
+
+                    claimed = claim_jobs(worker_id, queues=queues)
+                    for job in claimed:
+                        status = run_job(*job)
+                        with self._lock:
+                            self.processed += 1
+                            if status != JOB_SUCCEEDED:
+                                self.failed += 1
+            except Exception as e:
+                print(f"Error in job worker {worker_id}: {str(e)}")
+
+            if not claimed:
+                with _wakeup:
+                    _wakeup.wait(timeout=poll_interval)
+
+
+job_workers = JobWorkerPool()
\ No newline at end of file
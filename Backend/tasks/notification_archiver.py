@@ -0,0 +1,75 @@
+"""
+Notification retention
+Moves read notifications older than the retention window into
+notifications_archive in batches, keeping the hot table small
+"""
+
+from datetime import datetime, timedelta
+from sqlalchemy import insert, select, literal
+from ..models.notification import Notification
+from ..models.notification_archive import NotificationArchive
+from .. import db
+
+ARCHIVED_COLUMNS = [
+    'notification_id', 'user_id', 'message', 'notification_type', 'related_club_id',
+    'related_user_id', 'related_event_id', 'is_read', 'read_at', 'created_at'
+]
+
+def archive_batch(cutoff, batch_size):
+    """The ids of the next batch_size read notifications created before cutoff, oldest first"""
+    return (
+        select(Notification.notification_id)
+        .where(Notification.is_read == True, Notification.created_at < cutoff)
+        .order_by(Notification.created_at.asc(), Notification.notification_id.asc())
+        .limit(batch_size)
+    )
+
+def archive_read_notifications(retention_days=90, batch_size=1000):
+    """
+    Copy read notifications created before the retention cutoff into the
+    archive and delete them, batch_size rows per transaction.
+    Unread notifications are never archived, so unread counters are unaffected.
+    Batches are taken oldest first so each one is a short range scan of
+    idx_notification_read_created rather than a scan of the whole table.
+    Returns the number of notifications archived.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    archived = 0
+
+    while True:
+        notification_ids = db.session.execute(archive_batch(cutoff, batch_size)).scalars().all()
+        if not notification_ids:
+            break
+
+        try:
+            db.session.execute(
+                insert(NotificationArchive).from_select(
+                    ARCHIVED_COLUMNS + ['archived_at'],
+                    select(
+                        *[getattr(Notification, column) for column in ARCHIVED_COLUMNS],
+                        literal(datetime.utcnow())
+                    ).where(Notification.notification_id.in_(notification_ids))
+                )
+            )
+            Notification.query.filter(
+                Notification.notification_id.in_(notification_ids)
+            ).delete(synchronize_session=False)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        archived += len(notification_ids)
+        if len(notification_ids) < batch_size:
+            break
+
+    return archived
+
+def schedule_notification_archiver(scheduler, interval_hours=24, retention_days=90, batch_size=1000):
+    """Run archive_read_notifications every interval_hours on the scheduler"""
+    def run_archiver():
+        archived = archive_read_notifications(retention_days=retention_days, batch_size=batch_size)
+        if archived:
+            print(f"✓ Archived {archived} read notifications older than {retention_days} days")
+
+    return scheduler.add_job('notifications.archive_read', run_archiver, hours=interval_hours)
\ No newline at end of file
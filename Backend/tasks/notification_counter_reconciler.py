@@ -0,0 +1,73 @@
+"""
+Notification counter reconciliation
+Recomputes the maintained unread counters from the notifications table and
+repairs any drift (writes that bypass NotificationCounter.bump, cascades, etc.)
+"""
+
+from ..models.user import User
+from ..models.notification_counter import NotificationCounter
+from ..utils.unread_cache import unread_counts
+from .. import db
+
+def reconcile_notification_counters(batch_size=1000):
+    """
+    Compare stored unread counters with freshly tallied ones, batch_size users
+    at a time, and fix rows that differ or are missing.
+    Each batch is its own short transaction. Returns the number of users repaired.
+    """
+    repaired = 0
+    last_user_id = 0
+
+    while True:
+        user_ids = [
+            user_id for (user_id,) in db.session.query(User.user_id)
+            .filter(User.user_id > last_user_id)
+            .order_by(User.user_id.asc())
+            .limit(batch_size)
+            .all()
+        ]
+        if not user_ids:
+            break
+        last_user_id = user_ids[-1]
+
+        tallied = NotificationCounter.tally(user_ids)
+        stored = dict(
+            db.session.query(NotificationCounter.user_id, NotificationCounter.unread_count)
+            .filter(NotificationCounter.user_id.in_(user_ids))
+            .all()
+        )
+
+        drifted = []
+        try:
+            for user_id in user_ids:
+                expected = tallied.get(user_id, 0)
+                if user_id not in stored:
+                    db.session.add(NotificationCounter(user_id=user_id, unread_count=expected))
+                elif stored[user_id] != expected:
+                    NotificationCounter.query.filter_by(user_id=user_id).update(
+                        {'unread_count': expected}, synchronize_session=False
+                    )
+                else:
+                    continue
+                drifted.append(user_id)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        unread_counts.invalidate(*drifted)
+        repaired += len(drifted)
+
+        if len(user_ids) < batch_size:
+            break
+
+    return repaired
+
+def schedule_notification_counter_reconciler(scheduler, interval_minutes=60, batch_size=1000):
+    """Run reconcile_notification_counters every interval_minutes on the scheduler"""
+    def run_reconciler():
+        repaired = reconcile_notification_counters(batch_size=batch_size)
+        if repaired:
+            print(f"✓ Notification counter reconciliation repaired {repaired} users")
+
+    return scheduler.add_job('counters.reconcile_notifications', run_reconciler, minutes=interval_minutes)
\ No newline at end of file
@@ -1,133 +1,200 @@
 """
-Event reminder scheduler
-Sends reminder notifications for upcoming events
+Event reminder jobs
+Send each registrant one reminder per configured offset (REMINDER_OFFSETS,
+e.g. 24h, 1h and 10m before the event), recorded in the sent_reminders
+ledger, and schedule the daily digest (daily_digest.py). Run by the scheduler
+(tasks/scheduler.py), which provides the app context.
 """
 
-import schedule
-import time
 from datetime import datetime, timedelta
-from threading import Thread
+from flask import current_app
+from sqlalchemy import exists, insert, literal, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from ..models.event import Event
 from ..models.event_registration import EventRegistration
-from ..utils.notification_utils import create_event_reminder_notifications, create_and_broadcast_notification
-from ..models.notification import NotificationType
-from .. import db, create_app
+from ..models.notification import Notification, NotificationType
+from ..models.notification_counter import NotificationCounter
+from ..models.sent_reminder import SentReminder
+from ..utils.notification_fanout import notification_payload, push_notifications, FANOUT_CHUNK_SIZE
+from ..utils.unread_cache import unread_counts
+from .job_queue import enqueue
+from .. import db
 
-def send_event_reminders():
-    """Send reminders for events starting in the next 24 hours"""
-    try:
-        app = create_app()
-        with app.app_context():
-            # Get events starting in the next 24 hours
-            tomorrow = datetime.utcnow() + timedelta(hours=24)
-            today = datetime.utcnow()
-            
-            upcoming_events = Event.query.filter(
-                Event.event_date >= today,
-                Event.event_date <= tomorrow,
-                Event.event_status == 'upcoming'
-            ).all()
-            
-            for event in upcoming_events:
-                try:
-                    # Check if we already sent a reminder for this event today
-                    # (You might want to add a field to track this)
-                    
-                    # Send reminders to registered users
-                    reminder_count = create_event_reminder_notifications(event)
-                    
-                    if reminder_count > 0:
-                        print(f"✓ Sent {reminder_count} reminders for event: {event.title}")
-                    
-                except Exception as e:
-                    print(f"Failed to send reminders for event {event.event_id}: {str(e)}")
-            
-            print(f"✓ Reminder check completed. Found {len(upcoming_events)} upcoming events.")
-            
-    except Exception as e:
-        print(f"Error in reminder scheduler: {str(e)}")
+# Reminders go out this long before an event; kinds are the ledger keys
+DEFAULT_REMINDER_OFFSETS = '24h,1h,10m'
+OFFSET_UNITS = {'d': 'days', 'h': 'hours', 'm': 'minutes'}
+
+def parse_reminder_offsets(spec):
+    """'24h,1h,10m' -> [(kind, timedelta)] from the largest offset down"""
+    offsets = {}
+    for kind in spec.split(','):
+        kind = kind.strip().lower()
+        if not kind:
+            continue
+        amount, unit = kind[:-1], kind[-1:]
+        if unit not in OFFSET_UNITS or not amount.isdigit() or int(amount) <= 0:
+            raise ValueError(f"Invalid reminder offset '{kind}'")
+        offsets[kind] = timedelta(**{OFFSET_UNITS[unit]: int(amount)})
+    return sorted(offsets.items(), key=lambda item: item[1], reverse=True)
+
+def reminder_windows(offsets, now):
+    """
+    (kind, offset, start, end) per reminder kind. An event gets a kind's
+    reminder while it starts in (start, end]: between the next smaller offset
+    and this one, so each run sends an event at most its nearest reminder.
+    """
+    windows = []
+    for index, (kind, offset) in enumerate(offsets):
+        smaller = offsets[index + 1][1] if index + 1 < len(offsets) else timedelta(0)
+        windows.append((kind, offset, now + smaller, now + offset))
+    return windows
+
+def offset_label(offset):
+    """timedelta(hours=1) -> '1 hour'"""
+    minutes = int(offset.total_seconds() // 60)
+    for size, unit in ((1440, 'day'), (60, 'hour'), (1, 'minute')):
+        if minutes % size == 0:
+            count = minutes // size
+            return f"{count} {unit}{'' if count == 1 else 's'}"
+    return f"{minutes} minutes"
+
+def send_due_reminders(kind, offset, start, end=None, event_ids=None):
+    """
+    Remind the registrants of upcoming events starting in (start, end] (end
+    None: no upper bound; event_ids: only those events) who have no `kind`
+    reminder in the ledger yet. One statement claims the
+    ledger rows and inserts a notification for exactly the rows it claimed,
+    so an overlapping or repeated run sends nothing twice (SQLite has no
+    data-modifying CTEs: see claim_and_notify_sqlite). Returns the number of
+    reminders sent.
+    """
+    created_at = datetime.utcnow()
+    due = select(
+        Event.event_id, EventRegistration.user_id, literal(kind), literal(created_at)
+    ).join(
+        Event, Event.event_id == EventRegistration.event_id
+    ).where(
+        Event.event_date > start,
+        Event.event_status == 'upcoming',
+        ~exists().where(
+            SentReminder.event_id == Event.event_id,
+            SentReminder.user_id == EventRegistration.user_id,
+            SentReminder.reminder_kind == kind
+        )
+    ).distinct()
+    if end is not None:
+        due = due.where(Event.event_date <= end)
+    if event_ids is not None:
+        due = due.where(Event.event_id.in_(event_ids))
+
+    claimed = pg_insert(SentReminder).from_select(
+        ['event_id', 'user_id', 'reminder_kind', 'sent_at'], due
+    ).on_conflict_do_nothing().returning(SentReminder.event_id, SentReminder.user_id).cte('claimed')
+
+    message = literal("⏰ Reminder: '") + Event.title + literal(f"' starts in {offset_label(offset)}! Don't forget to attend.")
+    statement = insert(Notification).from_select(
+        ['user_id', 'message', 'notification_type', 'related_event_id', 'is_read', 'created_at'],
+        select(
+            claimed.c.user_id,
+            message,
+            literal(NotificationType.EVENT_REMINDER, Notification.notification_type.type),
+            claimed.c.event_id,
+            literal(False),
+            literal(created_at)
+        ).join_from(claimed, Event, Event.event_id == claimed.c.event_id)
+    ).returning(Notification.notification_id, Notification.user_id, Notification.related_event_id, Notification.message)
 
-def send_daily_event_digest():
-    """Send daily digest of upcoming events to all users"""
     try:
-        app = create_app()
-        with app.app_context():
-            from ..models.user import User
-            
-            # Get events for the next 7 days
-            next_week = datetime.utcnow() + timedelta(days=7)
-            today = datetime.utcnow()
-            
-            upcoming_events = Event.query.filter(
-                Event.event_date >= today,
-                Event.event_date <= next_week,
-                Event.event_status == 'upcoming'
-            ).limit(5).all()  # Limit to 5 events
-            
-            if not upcoming_events:
-                return
-            
-            # Create digest message
-            event_list = "\n".join([f"• {event.title} - {event.event_date.strftime('%m/%d %H:%M')}" 
-                                  for event in upcoming_events])
-            
-            digest_message = f"📅 Upcoming Events This Week:\n{event_list}"
-            
-            # Send to all active users
-            active_users = User.query.filter_by(is_active=True).all()
-            
-            digest_count = 0
-            for user in active_users:
-                try:
-                    create_and_broadcast_notification(
-                        user_id=user.user_id,
-                        message=digest_message,
-                        notification_type=NotificationType.EVENT_REMINDER
-                    )
-                    digest_count += 1
-                except Exception as e:
-                    print(f"Failed to send digest to user {user.user_id}: {str(e)}")
-            
-            print(f"✓ Sent weekly digest to {digest_count} users")
-            
-    except Exception as e:
-        print(f"Error in daily digest: {str(e)}")
+        if db.engine.dialect.name == 'postgresql':
+            sent = db.session.execute(statement).all()
+        else:
+            sent = claim_and_notify_sqlite(due, offset, created_at)
+        NotificationCounter.bump([row.user_id for row in sent], 1)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
 
-def start_reminder_scheduler():
-    """Start the reminder scheduler in a background thread"""
-    def run_scheduler():
-        # Schedule reminders every hour
-        schedule.every().hour.do(send_event_reminders)
-        
-        # Schedule daily digest at 9 AM
-        schedule.every().day.at("09:00").do(send_daily_event_digest)
-        
-        print("✓ Reminder scheduler started")
-        
-        while True:
-            schedule.run_pending()
-            time.sleep(60)  # Check every minute
-    
-    # Run scheduler in background thread
-    scheduler_thread = Thread(target=run_scheduler, daemon=True)
-    scheduler_thread.start()
+    unread_counts.adjust([row.user_id for row in sent], 1)
+    payloads = [
+        (row.user_id, notification_payload(
+            row.notification_id, row.message, NotificationType.EVENT_REMINDER, created_at,
+            related_event_id=row.related_event_id
+        ))
+        for row in sent
+    ]
+    for chunk_start in range(0, len(payloads), FANOUT_CHUNK_SIZE):
+        push_notifications(payloads[chunk_start:chunk_start + FANOUT_CHUNK_SIZE])
+    return len(sent)
+
+def claim_and_notify_sqlite(due, offset, created_at):
+    """
+    SQLite (development) version of send_due_reminders' statement: claim the
+    ledger rows, then insert one notification per claimed row, in the
+    caller's transaction. Returns the inserted notification rows.
+    """
+    claimed = db.session.execute(
+        sqlite_insert(SentReminder).from_select(
+            ['event_id', 'user_id', 'reminder_kind', 'sent_at'], due
+        ).on_conflict_do_nothing().returning(SentReminder.event_id, SentReminder.user_id)
+    ).all()
+    if not claimed:
+        return []
+
+    titles = dict(db.session.query(Event.event_id, Event.title).filter(
+        Event.event_id.in_({row.event_id for row in claimed})
+    ).all())
+    return db.session.execute(
+        insert(Notification).returning(
+            Notification.notification_id, Notification.user_id, Notification.related_event_id, Notification.message
+        ),
+        [
+            {
+                'user_id': row.user_id,
+                'message': f"⏰ Reminder: '{titles[row.event_id]}' starts in {offset_label(offset)}! Don't forget to attend.",
+                'notification_type': NotificationType.EVENT_REMINDER,
+                'related_event_id': row.event_id,
+                'is_read': False,
+                'created_at': created_at
+            }
+            for row in claimed
+        ]
+    ).all()
+
+def send_event_reminders(offsets=None):
+    """Send every due reminder (REMINDER_OFFSETS) not already in the ledger; returns {kind: sent}"""
+    if offsets is None:
+        offsets = parse_reminder_offsets(current_app.config.get('REMINDER_OFFSETS', DEFAULT_REMINDER_OFFSETS))
     
-    return scheduler_thread
+    sent = {}
+    for kind, offset, start, end in reminder_windows(offsets, datetime.utcnow()):
+        sent[kind] = send_due_reminders(kind, offset, start, end)
+        if sent[kind]:
+            print(f"✓ Sent {sent[kind]} {kind} event reminders")
+    return sent
+
+def schedule_reminders(scheduler, interval_minutes=5, digest_at="09:00"):
+    """Register the reminder jobs: due reminders every interval_minutes and the daily digest"""
+    from .daily_digest import run_daily_digest, resume_daily_digest
+    scheduler.add_job('reminders.due', send_event_reminders, minutes=interval_minutes)
+    scheduler.add_job('reminders.daily_digest', run_daily_digest, at=digest_at)
+    # Picks up a digest interrupted by a restart or a leadership change
+    scheduler.add_job('reminders.daily_digest_resume', resume_daily_digest, minutes=15)
 
 def send_immediate_event_reminder(event_id):
-    """Send immediate reminder for a specific event"""
+    """Queue an immediate reminder for a specific event (call inside an app context)"""
     try:
-        app = create_app()
-        with app.app_context():
-            event = Event.query.get(event_id)
-            if not event:
-                print(f"Event {event_id} not found")
-                return False
-            
-            reminder_count = create_event_reminder_notifications(event)
-            print(f"✓ Sent {reminder_count} immediate reminders for event: {event.title}")
-            return True
-            
+        event = Event.query.get(event_id)
+        if not event:
+            print(f"Event {event_id} not found")
+            return False
+        
+        enqueue('reminders.event', {'event_id': event.event_id}, queue='reminders')
+        print(f"✓ Queued immediate reminders for event: {event.title}")
+        return True
+        
     except Exception as e:
+        db.session.rollback()
         print(f"Error sending immediate reminder: {str(e)}")
         return False
\ No newline at end of file
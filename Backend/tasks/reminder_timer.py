@@ -0,0 +1,177 @@
+"""
+Event reminder timer
+Keeps a min-heap of the next reminder fire times (event_date minus each
+REMINDER_OFFSETS offset) and sleeps until the earliest one, so reminders go
+out on the minute instead of on the next polling run. The heap holds the
+upcoming events starting within the largest offset plus one reload interval;
+it is reloaded from Event.event_date every REMINDER_TIMER_RELOAD_MINUTES
+and updated in between by the routes that create, reschedule, approve,
+cancel or delete events (reschedule / cancel).
+
+Only the scheduler leader sends. Sends go through send_due_reminders and the
+sent_reminders ledger, so the periodic reminders.due sweep, which stays as a
+safety net, never duplicates a timer send. Events changed in another process
+are picked up at the next reload.
+"""
+
+import heapq
+import threading
+from datetime import datetime, timedelta
+from ..models.event import Event
+from .reminder_scheduler import parse_reminder_offsets, send_due_reminders, DEFAULT_REMINDER_OFFSETS
+from .. import db
+
+
+class ReminderTimer:
+    """Min-heap of (fire_at, event_id, kind, event_date) with lazy invalidation"""
+
+    def __init__(self):
+        self.app = None
+        self.offsets = parse_reminder_offsets(DEFAULT_REMINDER_OFFSETS)
+        self.reload_interval = timedelta(minutes=15)
+        self._heap = []
+        self._scheduled = {}  # event_id -> event_date its heap entries were built for
+        self._loaded_until = None
+        self._condition = threading.Condition()
+        self._thread = None
+        self.fired = 0
+        self.sent = 0
+        self.reloads = 0
+
+    def init_app(self, app):
+        """Load the heap and start the timer thread"""
+        self.app = app
+        self.offsets = parse_reminder_offsets(app.config.get('REMINDER_OFFSETS', DEFAULT_REMINDER_OFFSETS))
+        self.reload_interval = timedelta(minutes=app.config.get('REMINDER_TIMER_RELOAD_MINUTES', 15))
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.run_forever, daemon=True, name='reminder-timer')
+            self._thread.start()
+
+    def reload(self):
+        """Rebuild the heap from the events starting within the horizon; call in an app context"""
+        now = datetime.utcnow()
+        horizon = now + self.offsets[0][1] + self.reload_interval
+        events = db.session.query(Event.event_id, Event.event_date).filter(
+            Event.event_status == 'upcoming',
+            Event.event_date > now,
+            Event.event_date <= horizon
+        ).all()
+        db.session.commit()
+
+        with self._condition:
+            self._heap = []
+            self._scheduled = {}
+            self._loaded_until = horizon
+            for event_id, event_date in events:
+                self._push(event_id, event_date, now)
+            self.reloads += 1
+            self._condition.notify()
+        return len(events)
+
+    def reschedule(self, event_id):
+        """
+        The event was created or its date, status or approval changed: rebuild
+        its entries from the database. Call after the commit, in an app context.
+        """
+        if self._thread is None:
+            return
+        try:
+            event = db.session.query(Event.event_date, Event.event_status).filter(Event.event_id == event_id).first()
+        except Exception as e:
+            print(f"Warning: Could not reschedule reminders for event {event_id}: {str(e)}")
+            return
+
+        now = datetime.utcnow()
+        with self._condition:
+            if (event is None or event.event_status != 'upcoming' or event.event_date is None
+                    or event.event_date <= now or self._loaded_until is None
+                    or event.event_date > self._loaded_until):
+                self._scheduled.pop(event_id, None)
+                return
+            if self._scheduled.get(event_id) == event.event_date:
+                return
+            self._push(event_id, event.event_date, now)
+            self._condition.notify()
+
+    def cancel(self, event_id):
+        """Drop the event's pending reminders (deleted or cancelled)"""
+        with self._condition:
+            self._scheduled.pop(event_id, None)
+
+    def run_forever(self):
+        next_reload = datetime.utcnow()
+        while True:
+            try:
+                if datetime.utcnow() >= next_reload:
+                    with self.app.app_context():
+                        self.reload()
+                    next_reload = datetime.utcnow() + self.reload_interval
+
+                due = self._wait(next_reload)
+                if due:
+                    self._fire(due)
+            except Exception as e:
+                print(f"Error in reminder timer: {str(e)}")
+                with self._condition:
+                    self._condition.wait(60)
+
+    def stats(self):
+        with self._condition:
+            return {
+                'scheduled_events': len(self._scheduled),
+                'heap_size': len(self._heap),
+                'next_fire_at': self._heap[0][0].isoformat() if self._heap else None,
+                'loaded_until': self._loaded_until.isoformat() if self._loaded_until else None,
+                'fired': self.fired,
+                'sent': self.sent,
+                'reloads': self.reloads
+            }
+
+    def _push(self, event_id, event_date, now):
+        """Queue one entry per reminder kind whose window has not passed; caller holds the lock"""
+        self._scheduled[event_id] = event_date
+        for index, (kind, offset) in enumerate(self.offsets):
+            smaller = self.offsets[index + 1][1] if index + 1 < len(self.offsets) else timedelta(0)
+            if event_date - smaller <= now:
+                continue  # too late for this kind; a smaller one covers it
+            heapq.heappush(self._heap, (max(event_date - offset, now), event_id, kind, event_date))
+
+    def _wait(self, until):
+        """Sleep until the earliest fire time (or until), then pop the due, still valid entries"""
+        with self._condition:
+            while True:
+                now = datetime.utcnow()
+                if now >= until:
+                    return []
+                if self._heap and self._heap[0][0] <= now:
+                    break
+                deadline = min(self._heap[0][0], until) if self._heap else until
+                self._condition.wait((deadline - now).total_seconds())
+
+            due = {}
+            while self._heap and self._heap[0][0] <= now:
+                _, event_id, kind, event_date = heapq.heappop(self._heap)
+                if self._scheduled.get(event_id) == event_date:
+                    due.setdefault(kind, []).append(event_id)
+            return due
+
+    def _fire(self, due):
+        from .scheduler import scheduler
+
+        if not scheduler.is_leader:
+            return
+        now = datetime.utcnow()
+        offsets = dict(self.offsets)
+        kinds = [kind for kind, _ in self.offsets]
+        with self.app.app_context():
+            for kind, event_ids in due.items():
+                index = kinds.index(kind)
+                smaller = self.offsets[index + 1][1] if index + 1 < len(self.offsets) else timedelta(0)
+                sent = send_due_reminders(kind, offsets[kind], now + smaller, event_ids=event_ids)
+                self.fired += len(event_ids)
+                self.sent += sent
+                if sent:
+                    print(f"✓ Sent {sent} {kind} event reminders for events {event_ids}")
+
+
+reminder_timer = ReminderTimer()
\ No newline at end of file
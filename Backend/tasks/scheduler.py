@@ -0,0 +1,195 @@
+"""
+Periodic job runner
+One scheduler per process, bound to the app create_app already built: jobs
+run inside app.app_context() on the app's engine and pool, so a tick costs a
+context push instead of a second application. With several server processes
+only the leader runs jobs. Leadership is a PostgreSQL session-level advisory
+lock held on a dedicated connection; if the leader dies its connection
+closes, the lock is released and another process takes over on its next tick.
+Each job keeps timing metrics (runs, failures, last/avg/max duration) served
+at /api/admin/scheduler.
+"""
+
+import time
+from datetime import datetime
+from threading import Lock, Thread
+import schedule
+from sqlalchemy import text
+from .. import db
+
+
+class ScheduledJob:
+    """A registered job and its timing metrics"""
+
+    def __init__(self, name, func):
+        self.name = name
+        self.func = func
+        self.runs = 0
+        self.failures = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.last_ms = None
+        self.last_run_at = None
+        self.last_error = None
+
+    def record(self, duration_ms, error=None):
+        self.runs += 1
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+        self.last_ms = duration_ms
+        self.last_run_at = datetime.utcnow()
+        if error is not None:
+            self.failures += 1
+            self.last_error = error
+
+    def to_dict(self, next_run=None):
+        return {
+            'name': self.name,
+            'runs': self.runs,
+            'failures': self.failures,
+            'last_ms': round(self.last_ms, 2) if self.last_ms is not None else None,
+            'avg_ms': round(self.total_ms / self.runs, 2) if self.runs else None,
+            'max_ms': round(self.max_ms, 2),
+            'last_run_at': self.last_run_at.isoformat() if self.last_run_at else None,
+            'next_run_at': next_run.isoformat() if next_run else None,
+            'last_error': self.last_error
+        }
+
+
+class JobScheduler:
+    """schedule-based runner with advisory-lock leader election"""
+
+    def __init__(self):
+        self.app = None
+        self.tick_seconds = 30
+        self.lock_key = 7310021
+        self.jobs = {}
+        self._schedule = schedule.Scheduler()
+        self._entries = {}  # name -> schedule.Job
+        self._leader_connection = None
+        self._lock = Lock()
+        self._thread = None
+        self.is_leader = False
+
+    def init_app(self, app):
+        self.app = app
+        self.tick_seconds = app.config.get('SCHEDULER_TICK_SECONDS', self.tick_seconds)
+        self.lock_key = app.config.get('SCHEDULER_LOCK_KEY', self.lock_key)
+
+    def add_job(self, name, func, minutes=None, hours=None, at=None):
+        """
+        Run func every `minutes` / `hours`, or daily at "HH:MM".
+        func runs in an app context; exceptions are recorded, not raised.
+        """
+        if at is not None:
+            entry = self._schedule.every().day.at(at)
+        elif hours is not None:
+            entry = self._schedule.every(hours).hours
+        else:
+            entry = self._schedule.every(minutes or 1).minutes
+
+        job = ScheduledJob(name, func)
+        with self._lock:
+            self.jobs[name] = job
+            self._entries[name] = entry.do(self._run, job)
+        return job
+
+    def start(self):
+        """Start the tick thread (once)"""
+        if self._thread is not None:
+            return self._thread
+        self._thread = Thread(target=self.run_forever, daemon=True, name='scheduler')
+        self._thread.start()
+        return self._thread
+
+    def run_forever(self):
+        while True:
+            try:
+                self.tick()
+            except Exception as e:
+                print(f"Error in scheduler: {str(e)}")
+            time.sleep(self.tick_seconds)
+
+    def tick(self):
+        """Run the due jobs if this process is the leader"""
+        if self._elect():
+            self._schedule.run_pending()
+
+    def run_now(self, name):
+        """Run one job immediately in this process (admin/manual use)"""
+        return self._run(self.jobs[name])
+
+    def stats(self):
+        with self._lock:
+            return {
+                'leader': self.is_leader,
+                'tick_seconds': self.tick_seconds,
+                'jobs': [job.to_dict(self._entries[name].next_run) for name, job in self.jobs.items()]
+            }
+
+    def _run(self, job):
+        started = time.perf_counter()
+        error = None
+        try:
+            with self.app.app_context():
+                try:
+                    job.func()
+                except Exception:
+                    db.session.rollback()
+                    raise
+        except Exception as e:
+            error = str(e)
+            print(f"Error in scheduled job {job.name}: {error}")
+        duration_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            job.record(duration_ms, error)
+        return error is None
+
+    def _elect(self):
+        """Keep or try to take the advisory lock; True while this process leads"""
+        with self.app.app_context():
+            if db.engine.dialect.name != 'postgresql':
+                # No advisory locks (e.g. SQLite): a single process is assumed
+                self.is_leader = True
+                return True
+
+            if self._leader_connection is not None:
+                try:
+                    self._leader_connection.execute(text("SELECT 1"))
+                    self._leader_connection.commit()
+                    return True
+                except Exception as e:
+                    print(f"Warning: Scheduler lost its leader connection: {str(e)}")
+                    self._release()
+
+            connection = db.engine.connect()
+            try:
+                acquired = connection.execute(
+                    text("SELECT pg_try_advisory_lock(:key)"), {'key': self.lock_key}
+                ).scalar()
+                connection.commit()
+            except Exception:
+                connection.close()
+                raise
+
+            if not acquired:
+                connection.close()
+                return False
+
+            # The lock lives as long as this connection; keep it out of the pool
+            connection.detach()
+            self._leader_connection = connection
+            self.is_leader = True
+            print(f"✓ Scheduler leadership acquired (lock {self.lock_key})")
+            return True
+
+    def _release(self):
+        self.is_leader = False
+        try:
+            self._leader_connection.close()
+        except Exception:
+            pass
+        self._leader_connection = None
+
+
+scheduler = JobScheduler()
\ No newline at end of file
@@ -0,0 +1,64 @@
+"""
+Expired auth token reaper
+Bulk-deletes expired tokens in batches, off the request path
+"""
+
+from datetime import datetime
+from ..models.auth_token import AuthToken
+from ..models.revoked_token import RevokedToken
+from .. import db
+
+def reap_expired_tokens(batch_size=1000, max_batches=None):
+    """
+    Delete expired tokens in batches of batch_size, then drop revocation
+    entries whose tokens have expired.
+    Each batch is its own short transaction so the reaper never holds
+    long locks on auth_tokens. Returns the number of rows deleted.
+    """
+    deleted = 0
+    batches = 0
+    now = datetime.utcnow()
+
+    while max_batches is None or batches < max_batches:
+        expired_ids = [
+            token_id for (token_id,) in db.session.query(AuthToken.token_id)
+            .filter(AuthToken.expires_at < now)
+            .limit(batch_size)
+            .all()
+        ]
+        if not expired_ids:
+            break
+
+        try:
+            AuthToken.query.filter(
+                AuthToken.token_id.in_(expired_ids)
+            ).delete(synchronize_session=False)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        deleted += len(expired_ids)
+        batches += 1
+
+        if len(expired_ids) < batch_size:
+            break
+
+    # Revocations are only needed while the revoked tokens could still be valid
+    try:
+        RevokedToken.query.filter(RevokedToken.expires_at < now).delete(synchronize_session=False)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    return deleted
+
+def schedule_token_reaper(scheduler, interval_minutes=15, batch_size=1000):
+    """Run reap_expired_tokens every interval_minutes on the scheduler"""
+    def run_reaper():
+        deleted = reap_expired_tokens(batch_size=batch_size)
+        if deleted:
+            print(f"✓ Token reaper removed {deleted} expired tokens")
+
+    return scheduler.add_job('tokens.reap_expired', run_reaper, minutes=interval_minutes)
\ No newline at end of file
@@ -0,0 +1,175 @@
+"""
+Shared fixtures for the backend test suite
+The app is built once per session on an in-memory SQLite database without
+background tasks; every test gets freshly created tables and empty caches.
+
+Run from the repository root:
+    python -m pytest Backend/tests
+
+Set TEST_POSTGRES_URL to also run the tests that need PostgreSQL row locks
+or advisory locks (see postgres_app).
+"""
+
+import os
+import tempfile
+import uuid
+from datetime import datetime, timedelta
+
+# Must be set before Backend is imported (load_dotenv does not override them)
+os.environ['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+os.environ.setdefault('SECRET_KEY', 'test-secret-key')
+os.environ['LOG_FILE'] = os.path.join(tempfile.gettempdir(), 'backend-tests.log')
+
+import pytest
+from werkzeug.security import generate_password_hash
+from Backend import create_app, db as _db
+
+POSTGRES_URL = os.getenv('TEST_POSTGRES_URL')
+
+# Hashing is deliberately slow: every test user shares one hash of 'password'
+PASSWORD_HASH = generate_password_hash('password')
+
+
+@pytest.fixture(scope='session')
+def app():
+    app = create_app(start_background_tasks=False)
+    app.config['TESTING'] = True
+    return app
+
+
+@pytest.fixture
+def db(app):
+    from Backend.utils.token_cache import token_cache
+    from Backend.utils.unread_cache import unread_counts
+    from Backend.utils.feed_cache import feed_cache, MemoryCacheBackend
+
+    with app.app_context():
+        _db.drop_all()
+        _db.create_all()
+        token_cache.clear()
+        unread_counts.invalidate_all()
+        feed_cache.set_backend(MemoryCacheBackend())
+        yield _db
+        _db.session.remove()
+
+
+@pytest.fixture
+def client(app, db):
+    return app.test_client()
+
+
+@pytest.fixture
+def make_user(db):
+    """make_user('a@x.com', role='student') -> User with its role profile"""
+    from Backend.models import User, Student, Faculty, Admin
+
+    def make(email, role='student', full_name=None, is_active=True):
+        user = User(email=email, is_active=is_active, password_hash=PASSWORD_HASH)
+        db.session.add(user)
+        db.session.flush()
+        name = full_name or email.split('@')[0].title()
+        if role == 'student':
+            db.session.add(Student(user_id=user.user_id, full_name=name))
+        elif role == 'faculty':
+            db.session.add(Faculty(user_id=user.user_id, full_name=name))
+        elif role == 'admin':
+            db.session.add(Admin(user_id=user.user_id, full_name=name))
+        db.session.commit()
+        return user
+
+    return make
+
+
+@pytest.fixture
+def make_event(db):
+    """make_event(creator, capacity=None, ...) -> approved upcoming Event"""
+    from Backend.models import Event
+
+    def make(creator, starts_in=timedelta(days=2), **fields):
+        event_date = datetime.utcnow() + starts_in
+        values = dict(
+            title='Test event',
+            date=event_date.date(),
+            time=event_date.time(),
+            event_date=event_date,
+            created_by=creator.user_id,
+            event_status='upcoming',
+            approval_status='approved'
+        )
+        values.update(fields)
+        event = Event(**values)
+        db.session.add(event)
+        db.session.commit()
+        return event
+
+    return make
+
+
+@pytest.fixture
+def auth_headers(app):
+    """auth_headers(user) -> Authorization header with a fresh token"""
+    from Backend.services.auth_service import AuthService
+
+    def headers(user):
+        token = AuthService.generate_auth_token(user, app.config['TOKEN_EXPIRATION_HOURS'])
+        return {'Authorization': f'Bearer {token.token}'}
+
+    return headers
+
+@pytest.fixture
+def count_queries(db):
+    """with count_queries() as queries: ... -> queries is the list of SQL statements run"""
+    from contextlib import contextmanager
+    from sqlalchemy import event
+
+    @contextmanager
+    def counting():
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            yield statements
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+
+    return counting
+
+
+@pytest.fixture
+def postgres_app(app):
+    """
+    A second app on TEST_POSTGRES_URL sharing the models, with the tables in
+    a throwaway schema. Each thread that pushes its own app context gets its
+    own session and connection. Skipped when TEST_POSTGRES_URL is not set.
+    """
+    if not POSTGRES_URL:
+        pytest.skip('set TEST_POSTGRES_URL to run on PostgreSQL')
+    from flask import Flask
+    from sqlalchemy import create_engine, text
+
+    schema = f"test_{uuid.uuid4().hex[:8]}"
+    admin_engine = create_engine(POSTGRES_URL)
+    with admin_engine.begin() as connection:
+        connection.execute(text(f'CREATE SCHEMA {schema}'))
+
+    postgres_app = Flask(__name__)
+    postgres_app.config.update(app.config)
+    postgres_app.config.update(
+        SQLALCHEMY_DATABASE_URI=POSTGRES_URL,
+        SQLALCHEMY_ENGINE_OPTIONS={'connect_args': {'options': f'-csearch_path={schema}'}}
+    )
+    _db.init_app(postgres_app)
+    with postgres_app.app_context():
+        _db.create_all()
+    try:
+        yield postgres_app
+    finally:
+        with postgres_app.app_context():
+            _db.session.remove()
+            _db.engine.dispose()
+        with admin_engine.begin() as connection:
+            connection.execute(text(f'DROP SCHEMA {schema} CASCADE'))
+        admin_engine.dispose()
\ No newline at end of file
@@ -0,0 +1,68 @@
+import pytest
+from Backend.middlewares.auth_middleware import resolve_token, token_required
+from Backend.services.auth_service import AuthService
+from Backend.services.signed_token_service import revocation_list
+
+
+def call_protected(app, token, view):
+    from Backend import db
+    db.session.expunge_all()  # no identity-map hits: every load is a query
+    with app.test_request_context(headers={'Authorization': f'Bearer {token}'}):
+        return token_required(view)()
+
+
+@pytest.fixture
+def signed_mode(app, db, monkeypatch):
+    monkeypatch.setitem(app.config, 'AUTH_TOKEN_MODE', 'signed')
+    revocation_list.load()
+
+
+def test_signed_token_needs_no_queries_for_id_only_routes(app, signed_mode, make_user, count_queries):
+    user = make_user('signed@test.edu')
+    token = AuthService.generate_auth_token(user, 1).token
+
+    with count_queries() as queries:
+        assert call_protected(app, token, lambda current_user: current_user.user_id) == user.user_id
+    assert queries == []
+
+
+def test_current_user_loads_the_user_on_first_other_attribute(app, signed_mode, make_user, count_queries):
+    user = make_user('signed@test.edu', full_name='Signed User')
+    token = AuthService.generate_auth_token(user, 1).token
+
+    with count_queries() as queries:
+        assert call_protected(app, token, lambda current_user: (current_user.email, current_user.full_name)) == (
+            'signed@test.edu', 'Signed User'
+        )
+    assert queries
+
+
+def test_opaque_mode_does_not_decode_dotted_tokens(app, db, monkeypatch):
+    monkeypatch.setitem(app.config, 'SECRET_KEY', None)
+    assert resolve_token('not-a.signed-token') is None
+
+
+def test_signed_mode_without_secret_key_fails_clearly(app, signed_mode, monkeypatch, make_user):
+    monkeypatch.setitem(app.config, 'SECRET_KEY', None)
+    with pytest.raises(RuntimeError, match='SECRET_KEY'):
+        AuthService.generate_auth_token(make_user('signed@test.edu'), 1)
+
+def test_banned_user_token_stops_authenticating(client, make_user, auth_headers):
+    from Backend.models import AuthToken
+    admin = make_user('admin@test.edu', role='admin')
+    user = make_user('banned@test.edu')
+    headers = auth_headers(user)
+    assert client.get('/api/notifications/unread-count', headers=headers).status_code == 200
+
+    response = client.patch(f'/api/admin/users/{user.user_id}/status', json={'status': 'banned'}, headers=auth_headers(admin))
+    assert response.status_code == 200, response.get_json()
+
+    assert AuthToken.query.filter_by(user_id=user.user_id).count() == 0
+    assert client.get('/api/notifications/unread-count', headers=headers).status_code == 401
+
+
+def test_inactive_user_is_rejected(client, make_user, auth_headers):
+    user = make_user('inactive@test.edu', is_active=False)
+    response = client.get('/api/notifications/unread-count', headers=auth_headers(user))
+    assert response.status_code == 401
+    assert response.get_json()['error'] == 'Account is inactive'
\ No newline at end of file
@@ -0,0 +1,101 @@
+import os
+import time
+import uuid
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import insert, text
+from Backend.models import AuthToken
+from Backend.models.revoked_token import RevokedToken
+from Backend.migrations.hash_auth_tokens import backfill_token_hashes
+from Backend.tasks.token_reaper import reap_expired_tokens
+
+RUN_BENCHMARKS = os.getenv('RUN_BENCHMARKS', '').lower() in ('1', 'true', 'yes')
+
+
+def add_tokens(db, user, count, expires_in):
+    tokens = [AuthToken.issue(user.user_id, AuthToken.generate_token(), 1) for _ in range(count)]
+    for token in tokens:
+        token.expires_at = datetime.utcnow() + expires_in
+    db.session.add_all(tokens)
+    db.session.commit()
+    return tokens
+
+
+def test_find_by_token_matches_the_hash_only(db, make_user):
+    user = make_user('student@test.edu')
+    token = add_tokens(db, user, 1, timedelta(hours=1))[0]
+
+    assert token.token_hash == AuthToken.hash_token(token.token) != token.token
+    assert len(token.token_hash) == 64
+    assert AuthToken.find_by_token(token.token).first().token_id == token.token_id
+    assert AuthToken.find_by_token(token.token_hash).first() is None
+    assert AuthToken.find_by_token('not-a-token').first() is None
+
+
+def test_reaper_deletes_expired_tokens_in_batches(db, make_user):
+    user = make_user('student@test.edu')
+    add_tokens(db, user, 5, timedelta(hours=-1))
+    valid = add_tokens(db, user, 2, timedelta(hours=1))
+    db.session.add_all([
+        RevokedToken(jti='expired', user_id=user.user_id, expires_at=datetime.utcnow() - timedelta(hours=1)),
+        RevokedToken(jti='live', user_id=user.user_id, expires_at=datetime.utcnow() + timedelta(hours=1))
+    ])
+    db.session.commit()
+
+    assert reap_expired_tokens(batch_size=2, max_batches=1) == 2
+    assert reap_expired_tokens(batch_size=2) == 3
+    assert reap_expired_tokens(batch_size=2) == 0
+    assert sorted(token_id for (token_id,) in db.session.query(AuthToken.token_id)) == sorted(t.token_id for t in valid)
+    assert [revoked.jti for revoked in RevokedToken.query.all()] == ['live']
+
+
+def test_backfill_hashes_legacy_plaintext_tokens(db):
+    # The pre-migration layout: plaintext token column, token_hash just added
+    db.session.execute(text('DROP TABLE auth_tokens'))
+    db.session.execute(text(
+        "CREATE TABLE auth_tokens (token_id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL, token TEXT, "
+        "token_hash VARCHAR(64), issued_at DATETIME, expires_at DATETIME, token_type VARCHAR(20))"
+    ))
+    plain = [str(uuid.uuid4()) for _ in range(5)]
+    db.session.execute(
+        text("INSERT INTO auth_tokens (user_id, token) VALUES (1, :token)"),
+        [{'token': token} for token in plain]
+    )
+    db.session.commit()
+
+    assert backfill_token_hashes(batch_size=2) == 5
+    assert backfill_token_hashes(batch_size=2) == 0
+    stored = dict(db.session.execute(text('SELECT token, token_hash FROM auth_tokens')).all())
+    assert stored == {token: AuthToken.hash_token(token) for token in plain}
+
+
+@pytest.mark.skipif(not RUN_BENCHMARKS, reason='set RUN_BENCHMARKS=1 to run')
+def test_token_lookup_benchmark(db, rows=1_000_000, lookups=20):
+    """Plaintext Text equality without an index (before) vs the unique token_hash index (after)"""
+    plain = [str(uuid.uuid4()) for _ in range(rows)]
+    db.session.execute(text('CREATE TABLE legacy_auth_tokens (token_id INTEGER PRIMARY KEY, user_id INTEGER, token TEXT)'))
+    for start in range(0, rows, 50000):
+        chunk = plain[start:start + 50000]
+        db.session.execute(text('INSERT INTO legacy_auth_tokens (user_id, token) VALUES (1, :token)'),
+                           [{'token': token} for token in chunk])
+        db.session.execute(insert(AuthToken), [
+            {'user_id': 1, 'token_hash': AuthToken.hash_token(token), 'token_type': 'access'} for token in chunk
+        ])
+    db.session.commit()
+    probes = plain[::rows // lookups][:lookups]
+
+    started = time.perf_counter()
+    for token in probes:
+        assert db.session.execute(text('SELECT token_id FROM legacy_auth_tokens WHERE token = :token'),
+                                  {'token': token}).scalar() is not None
+    before = (time.perf_counter() - started) / lookups
+
+    started = time.perf_counter()
+    for token in probes:
+        assert AuthToken.find_by_token(token).with_entities(AuthToken.token_id).scalar() is not None
+    after = (time.perf_counter() - started) / lookups
+
+    db.session.execute(text('DROP TABLE legacy_auth_tokens'))
+    print(f"\ntoken lookup at {rows:,} rows: plaintext scan {before * 1000:.2f} ms, "
+          f"hash index {after * 1000:.3f} ms ({before / after:,.0f}x)")
+    assert after < before
\ No newline at end of file
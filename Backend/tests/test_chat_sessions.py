@@ -0,0 +1,20 @@
+from Backend.models import UserEventAssociation
+from Backend.utils.chat_sessions import chat_sessions
+
+
+def test_session_sender_name_is_the_users_full_name(db, make_user, make_event):
+    student = make_user('student@test.edu', full_name='Student Name')
+    event = make_event(make_user('organizer@test.edu', role='faculty'))
+    db.session.add(UserEventAssociation(user_id=student.user_id, event_id=event.event_id, role='attendee'))
+    db.session.commit()
+
+    session, error = chat_sessions.authorize('sid-1', student.user_id, event.event_id, 'attendee_only', admin_session=False)
+    assert error is None
+    assert session.sender_name == student.full_name == 'Student Name'
+    chat_sessions.close('sid-1')
+
+
+def test_session_sender_name_without_role_profile(db, make_user):
+    user = make_user('plain@test.edu', role=None)
+    assert chat_sessions.profile('sid-2', user.user_id).sender_name == 'Unknown'
+    chat_sessions.close('sid-2')
\ No newline at end of file
@@ -0,0 +1,123 @@
+import os
+import time
+from datetime import timedelta
+import pytest
+from sqlalchemy import func, insert
+from Backend.models import User, Club, EventRegistration, Notification
+from Backend.models.association_tables import user_club_association, ClubMembershipStatus
+from Backend.models.digest_run import DigestRun, DIGEST_COMPLETED
+from Backend.tasks import daily_digest
+from Backend.tasks.daily_digest import run_daily_digest, resume_daily_digest, digest_candidates, score_events, pick_events
+
+RUN_BENCHMARKS = os.getenv('RUN_BENCHMARKS', '').lower() in ('1', 'true', 'yes')
+
+
+def add_users(db, count, inactive=0):
+    db.session.execute(insert(User), [
+        {'email': f'user{n}@test.edu', 'password_hash': 'x', 'is_active': n >= inactive}
+        for n in range(count)
+    ])
+    db.session.commit()
+
+
+def digests_per_user(db):
+    return dict(db.session.query(Notification.user_id, func.count()).group_by(Notification.user_id).all())
+
+
+def test_resume_after_a_failed_chunk_sends_each_user_one_digest(app, db, make_user, make_event, monkeypatch):
+    make_event(make_user('organizer@test.edu', role='faculty'))
+    add_users(db, 8, inactive=1)
+    active = [user_id for (user_id,) in db.session.query(User.user_id).filter(User.is_active == True)]
+    monkeypatch.setitem(app.config, 'DIGEST_CHUNK_SIZE', 3)
+
+    real_chunk = daily_digest.digest_chunk
+    calls = []
+
+    def crash_on_second_chunk(*args):
+        calls.append(args)
+        if len(calls) == 2:
+            raise RuntimeError('worker killed')
+        return real_chunk(*args)
+
+    monkeypatch.setattr(daily_digest, 'digest_chunk', crash_on_second_chunk)
+    with pytest.raises(RuntimeError):
+        run_daily_digest()
+    assert sum(digests_per_user(db).values()) == 3  # only the first chunk committed
+
+    monkeypatch.setattr(daily_digest, 'digest_chunk', real_chunk)
+    run = resume_daily_digest()
+
+    assert run.status == DIGEST_COMPLETED
+    assert run.users_processed == run.notifications_created == len(active)
+    assert digests_per_user(db) == {user_id: 1 for user_id in active}
+
+    # A finished day is neither resumed nor run again
+    assert run_daily_digest().status == DIGEST_COMPLETED
+    assert sum(digests_per_user(db).values()) == len(active)
+
+
+def test_resume_without_an_unfinished_run_does_nothing(db, make_user, make_event):
+    make_event(make_user('organizer@test.edu', role='faculty'))
+
+    assert resume_daily_digest() is None
+    assert DigestRun.query.count() == 0
+    assert Notification.query.count() == 0
+
+
+def test_events_ranked_registered_then_club_then_category(db, make_user, make_event):
+    organizer = make_user('organizer@test.edu', role='faculty')
+    student = make_user('student@test.edu')
+    newcomer = make_user('newcomer@test.edu')
+    club = Club(name='Chess', leader_id=student.user_id)
+    db.session.add(club)
+    db.session.commit()
+    db.session.execute(user_club_association.insert().values(
+        user_id=student.user_id, club_id=club.club_id, status=ClubMembershipStatus.APPROVED
+    ))
+
+    soonest = make_event(organizer, starts_in=timedelta(days=1), title='Soonest')
+    affinity = make_event(organizer, starts_in=timedelta(days=2), title='Affinity', category='sports')
+    club_event = make_event(organizer, starts_in=timedelta(days=3), title='Club', club_id=club.club_id)
+    registered = make_event(organizer, starts_in=timedelta(days=4), title='Registered')
+    past = make_event(organizer, starts_in=timedelta(days=-30), title='Past', category='sports')
+    db.session.add_all([
+        EventRegistration(user_id=student.user_id, event_id=registered.event_id, status='approved'),
+        EventRegistration(user_id=student.user_id, event_id=past.event_id, status='approved')
+    ])
+    db.session.commit()
+
+    candidates = digest_candidates()
+    assert [event.event_id for event in candidates] == [
+        soonest.event_id, affinity.event_id, club_event.event_id, registered.event_id
+    ]
+
+    scores = score_events([student.user_id, newcomer.user_id], candidates)
+    assert dict(scores[student.user_id]) == {
+        registered.event_id: daily_digest.REGISTERED_WEIGHT,
+        club_event.event_id: daily_digest.CLUB_WEIGHT,
+        affinity.event_id: daily_digest.AFFINITY_WEIGHT
+    }
+    assert newcomer.user_id not in scores
+
+    def picked(user_id, per_user):
+        return [event.title for event in pick_events(scores.get(user_id), candidates, per_user)]
+
+    assert picked(student.user_id, 1) == ['Registered']
+    assert picked(student.user_id, 2) == ['Club', 'Registered']  # listed soonest first
+    assert picked(student.user_id, 3) == ['Affinity', 'Club', 'Registered']
+    assert picked(newcomer.user_id, 2) == ['Soonest', 'Affinity']
+
+
+@pytest.mark.skipif(not RUN_BENCHMARKS, reason='set RUN_BENCHMARKS=1 to run')
+def test_daily_digest_benchmark(db, make_user, make_event, users=50000):
+    organizer = make_user('organizer@test.edu', role='faculty')
+    for day in range(1, 7):
+        make_event(organizer, starts_in=timedelta(days=day), category=f'category{day % 3}')
+    add_users(db, users)
+
+    started = time.perf_counter()
+    run = run_daily_digest()
+    elapsed = time.perf_counter() - started
+
+    assert run.notifications_created == run.users_processed == users + 1
+    print(f"\ndaily digest for {users:,} users: {elapsed:.2f}s ({run.users_processed / elapsed:,.0f} users/s)")
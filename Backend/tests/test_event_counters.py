@@ -0,0 +1,52 @@
+from Backend.models import EventCounters, EventRegistration, UserEventAssociation
+
+
+def counters(event_id):
+    return EventCounters.query.get(event_id)
+
+
+def test_registrations_counted_when_event_has_no_counters_row(client, make_user, make_event, auth_headers):
+    organizer = make_user('organizer@test.edu', role='faculty')
+    event = make_event(organizer, capacity=0)  # 0 = no limit
+    assert counters(event.event_id) is None
+
+    for email in ('first@test.edu', 'second@test.edu'):
+        response = client.post(f'/api/events/{event.event_id}/register', headers=auth_headers(make_user(email)))
+        assert response.status_code == 200, response.get_json()
+
+    assert counters(event.event_id).registration_count == 2
+
+
+def test_capacity_claim_counted_when_event_has_no_counters_row(client, make_user, make_event, auth_headers):
+    organizer = make_user('organizer@test.edu', role='faculty')
+    event = make_event(organizer, capacity=2)
+
+    for email in ('first@test.edu', 'second@test.edu', 'third@test.edu'):
+        client.post(f'/api/events/{event.event_id}/register', headers=auth_headers(make_user(email)))
+
+    assert counters(event.event_id).registration_count == 2
+    assert EventRegistration.query.filter_by(event_id=event.event_id).count() == 2
+
+
+def test_approval_counted_when_event_has_no_counters_row(client, db, make_user, make_event, auth_headers):
+    organizer = make_user('organizer@test.edu', role='faculty')
+    event = make_event(organizer, capacity=None)
+    db.session.add(UserEventAssociation(user_id=organizer.user_id, event_id=event.event_id, role='organizer'))
+    registrations = []
+    for email in ('first@test.edu', 'second@test.edu'):
+        registration = EventRegistration(user_id=make_user(email).user_id, event_id=event.event_id, status='pending')
+        db.session.add(registration)
+        registrations.append(registration)
+    db.session.commit()
+    assert counters(event.event_id) is None
+
+    url = f'/api/events/{event.event_id}/registrations/{registrations[0].registration_id}'
+    response = client.put(url, json={'status': 'approved'}, headers=auth_headers(organizer))
+    assert response.status_code == 200, response.get_json()
+    assert counters(event.event_id).approved_count == 1
+
+    # Approving again is not counted twice; rejecting gives the seat back
+    client.put(url, json={'status': 'approved'}, headers=auth_headers(organizer))
+    assert counters(event.event_id).approved_count == 1
+    client.put(url, json={'status': 'rejected'}, headers=auth_headers(organizer))
+    assert counters(event.event_id).approved_count == 0
\ No newline at end of file
@@ -0,0 +1,113 @@
+from datetime import datetime, timedelta
+from Backend.models import AdminPosting
+from Backend.services.feed_service import FeedService, MAX_FEED_PAGE_SIZE
+
+
+def make_feed(db, make_user, make_event):
+    """Seven events and four pinned admin postings, two of them sharing an event's timestamp"""
+    organizer = make_user('organizer@test.edu', role='faculty')
+    admin = make_user('admin@test.edu', role='admin')
+    base = datetime(2030, 1, 1, 12, 0)
+
+    events = [make_event(organizer, event_date=base + timedelta(hours=hour), title=f'Event {hour}')
+              for hour in (0, 1, 2, 2, 3, 5, 6)]
+    postings = [AdminPosting(admin_id=admin.user_id, title=f'Posting {hour}', is_pinned=True,
+                             created_at=base + timedelta(hours=hour))
+                for hour in (1, 2, 4, 6)]
+    postings.append(AdminPosting(admin_id=admin.user_id, title='Unpinned', is_pinned=False, created_at=base))
+    db.session.add_all(postings)
+    make_event(organizer, event_date=base + timedelta(hours=7), approval_status='pending')
+    db.session.commit()
+    return events, postings
+
+
+def walk(page_size):
+    items, cursor = FeedService.fetch_items(limit=page_size)
+    pages = [items]
+    while cursor:
+        items, cursor = FeedService.fetch_items(cursor, limit=page_size)
+        pages.append(items)
+    return pages
+
+
+def keys(items):
+    return [(item.kind, item.item_id) for item in items]
+
+
+def test_fetch_items_merges_events_and_admin_postings_newest_first(db, make_user, make_event):
+    make_feed(db, make_user, make_event)
+    items, cursor = FeedService.fetch_items(limit=None)
+
+    assert cursor is None
+    assert len(items) == 11  # neither the pending event nor the unpinned posting
+    order = [(item.sort_at, item.kind, item.item_id) for item in items]
+    assert order == sorted(order, reverse=True)
+    assert {item.kind for item in items} == {'event', 'admin'}
+
+
+def test_cursor_pages_cover_the_feed_exactly_once(db, make_user, make_event):
+    make_feed(db, make_user, make_event)
+    full = keys(FeedService.fetch_items(limit=None)[0])
+
+    for page_size in (1, 2, 3, 4, 10, 11, 50):
+        pages = walk(page_size)
+        assert all(len(page) <= page_size for page in pages)
+        assert [key for page in pages for key in keys(page)] == full, page_size
+
+
+def test_cursor_is_stable_when_newer_items_arrive(db, make_user, make_event):
+    make_feed(db, make_user, make_event)
+    first, cursor = FeedService.fetch_items(limit=4)
+    rest = keys(FeedService.fetch_items(cursor, limit=None)[0])
+
+    # Items newer than the first page do not shift the following pages
+    make_event(make_user('late@test.edu', role='faculty'), event_date=datetime(2031, 1, 1))
+    db.session.add(AdminPosting(title='Late posting', is_pinned=True, created_at=datetime(2031, 1, 1)))
+    db.session.commit()
+
+    second, _ = FeedService.fetch_items(cursor, limit=100)
+    assert keys(second) == rest
+    assert not set(keys(first)) & set(keys(second))
+
+
+def test_get_page_caps_the_limit_and_personalizes(db, make_user, make_event):
+    make_feed(db, make_user, make_event)
+    student = make_user('student@test.edu')
+
+    page = FeedService.get_page(student.user_id, limit=5)
+    assert len(page['posts']) == 5
+    assert page['next_cursor']
+
+    following = FeedService.get_page(student.user_id, cursor=page['next_cursor'], limit=5)
+    assert not {(p['type'], p['id']) for p in page['posts']} & {(p['type'], p['id']) for p in following['posts']}
+
+    assert len(FeedService.get_page(student.user_id, limit=MAX_FEED_PAGE_SIZE * 10)['posts']) == 11
+    assert len(FeedService.get_page(student.user_id, limit=0)['posts']) == 1
+    assert all(post['registration_status'] == 'not_registered'
+               for post in page['posts'] if post['type'] == 'event')
+
+
+def test_feed_route_pages_and_rejects_invalid_cursor(client, db, make_user, make_event, auth_headers):
+    make_feed(db, make_user, make_event)
+    headers = auth_headers(make_user('student@test.edu'))
+
+    first = client.get('/api/social/feed?limit=6', headers=headers).get_json()
+    second = client.get(f"/api/social/feed?limit=6&cursor={first['next_cursor']}", headers=headers).get_json()
+    assert len(first['posts']) == 6 and len(second['posts']) == 5
+    assert second['next_cursor'] is None
+
+    # Not base64, base64 of a non-list, and a list with a bad timestamp
+    for cursor in ('not-a-cursor!', 'WzFd', 'WyJ5ZXN0ZXJkYXkiLCJldmVudCIsMV0'):
+        response = client.get(f'/api/social/feed?cursor={cursor}', headers=headers)
+        assert response.status_code == 400, cursor
+        assert response.get_json() == {'error': 'Invalid cursor'}
+
+
+def test_legacy_posts_route_is_capped(client, db, make_user, make_event, auth_headers):
+    organizer = make_user('organizer@test.edu', role='faculty')
+    for hour in range(MAX_FEED_PAGE_SIZE + 5):
+        make_event(organizer, event_date=datetime(2030, 1, 1) + timedelta(hours=hour))
+
+    response = client.get('/api/social/posts', headers=auth_headers(make_user('student@test.edu')))
+    assert response.status_code == 200
+    assert len(response.get_json()) == MAX_FEED_PAGE_SIZE
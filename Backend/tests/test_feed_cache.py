@@ -0,0 +1,98 @@
+import pytest
+from Backend.services.feed_service import FeedService
+from Backend.utils.feed_cache import FeedCache, MemoryCacheBackend, RedisCacheBackend, feed_cache
+
+
+class BrokenBackend(MemoryCacheBackend):
+    name = 'broken'
+
+    def get(self, key):
+        raise ConnectionError('cache is down')
+
+
+@pytest.fixture(params=['memory', 'redis'])
+def cache(request):
+    if request.param == 'memory':
+        return FeedCache(MemoryCacheBackend())
+    fakeredis = pytest.importorskip('fakeredis')
+    return FeedCache(RedisCacheBackend(fakeredis.FakeRedis()))
+
+
+def test_hits_and_misses_are_counted_per_layer(cache):
+    page = {'posts': [{'type': 'event', 'id': 1}], 'next_cursor': None}
+    generation = cache.shared_generation()
+
+    assert cache.get_shared(generation, None, 20) is None
+    cache.set_shared(generation, None, 20, page)
+    assert cache.get_shared(generation, None, 20) == page
+    assert cache.get_shared(generation, None, 20) == page
+    assert cache.get_shared(generation, 'cursor', 20) is None
+
+    assert cache.get_overlay(7, cache.overlay_generation(7)) is None
+    cache.set_overlay(7, cache.overlay_generation(7), [[1, None, 'pending']])
+    assert cache.get_overlay(7, cache.overlay_generation(7)) == [[1, None, 'pending']]
+
+    stats = cache.stats()
+    assert stats['shared'] == {'hits': 2, 'misses': 2, 'hit_rate': 0.5}
+    assert stats['overlay'] == {'hits': 1, 'misses': 1, 'hit_rate': 0.5}
+    assert stats['errors'] == 0
+
+
+def test_invalidation_bumps_the_generation(cache):
+    generation = cache.shared_generation()
+    cache.set_shared(generation, None, 20, {'posts': [], 'next_cursor': None})
+    cache.set_overlay(7, cache.overlay_generation(7), [])
+    cache.set_overlay(8, cache.overlay_generation(8), [])
+
+    cache.invalidate_shared()
+    assert cache.shared_generation() == generation + 1
+    assert cache.get_shared(cache.shared_generation(), None, 20) is None
+
+    cache.invalidate_user(7)
+    assert cache.get_overlay(7, cache.overlay_generation(7)) is None
+    assert cache.get_overlay(8, cache.overlay_generation(8)) == []
+    assert cache.stats()['invalidations'] == 2
+
+
+def test_backend_errors_count_as_misses():
+    cache = FeedCache(BrokenBackend())
+
+    assert cache.shared_generation() == 0
+    assert cache.get_shared(0, None, 20) is None
+    assert cache.stats()['errors'] == 2
+    assert cache.stats()['shared']['misses'] == 1
+
+
+def test_feed_pages_are_served_from_the_cache(db, make_user, make_event, count_queries):
+    organizer = make_user('organizer@test.edu', role='faculty')
+    make_event(organizer)
+    student = make_user('student@test.edu')
+
+    FeedService.get_page(student.user_id)
+    with count_queries() as queries:
+        FeedService.get_page(student.user_id)
+
+    stats = feed_cache.stats()
+    assert stats['shared']['hits'] == 1 and stats['overlay']['hits'] == 1
+    assert len(queries) == 2  # registration counts: the counters, then the events without any
+
+
+def test_registration_counts_are_current_on_a_cached_page(client, make_user, make_event, auth_headers):
+    organizer = make_user('organizer@test.edu', role='faculty')
+    limited = make_event(organizer, capacity=10)
+    unlimited = make_event(organizer, capacity=0)
+    student = make_user('student@test.edu')
+
+    def counts():
+        page = client.get('/api/social/feed', headers=auth_headers(student)).get_json()
+        return {post['id']: (post['current_registrations'], post['registration_status']) for post in page['posts']}
+
+    assert counts() == {limited.event_id: (0, 'not_registered'), unlimited.event_id: (0, 'not_registered')}
+
+    for event in (limited, unlimited):
+        response = client.post(f'/api/events/{event.event_id}/register', headers=auth_headers(student))
+        assert response.status_code == 200, response.get_json()
+    client.post(f'/api/events/{limited.event_id}/register', headers=auth_headers(make_user('other@test.edu')))
+
+    assert counts() == {limited.event_id: (2, 'pending'), unlimited.event_id: (1, 'pending')}
+    assert feed_cache.stats()['shared']['hits'] == 1
@@ -0,0 +1,157 @@
+import threading
+from datetime import datetime, timedelta
+import pytest
+from Backend.models.job import Job, JOB_PENDING, JOB_RUNNING, JOB_SUCCEEDED, JOB_DEAD
+from Backend.tasks.job_queue import (
+    JOB_HANDLERS, enqueue, claim_jobs, run_job, retry_job, queue_stats, requeue_stale_jobs
+)
+
+
+@pytest.fixture
+def handlers(monkeypatch):
+    """Register test handlers; calls are recorded as (task, payload)"""
+    calls = []
+
+    def record(**payload):
+        calls.append(('test.record', payload))
+
+    def explode(**payload):
+        calls.append(('test.explode', payload))
+        raise RuntimeError('handler failed')
+
+    monkeypatch.setitem(JOB_HANDLERS, 'test.record', record)
+    monkeypatch.setitem(JOB_HANDLERS, 'test.explode', explode)
+    return calls
+
+
+def make_due(job_id):
+    Job.query.filter_by(job_id=job_id).update({'run_at': datetime.utcnow() - timedelta(seconds=1)})
+
+
+def test_enqueue_claim_run_done(db, handlers):
+    job_id = enqueue('test.record', {'event_id': 7})
+    assert queue_stats() == {JOB_PENDING: 1, JOB_RUNNING: 0, JOB_SUCCEEDED: 0, JOB_DEAD: 0}
+
+    claimed = claim_jobs('worker-1', limit=5)
+    assert claimed == [(job_id, 'test.record', {'event_id': 7}, 1, 5)]
+    job = db.session.get(Job, job_id)
+    assert (job.status, job.locked_by) == (JOB_RUNNING, 'worker-1')
+    assert claim_jobs('worker-2') == []
+
+    assert run_job(*claimed[0]) == JOB_SUCCEEDED
+    assert handlers == [('test.record', {'event_id': 7})]
+    db.session.expire_all()
+    job = db.session.get(Job, job_id)
+    assert job.status == JOB_SUCCEEDED
+    assert job.locked_by is None and job.finished_at is not None
+    assert queue_stats()[JOB_SUCCEEDED] == 1
+
+
+def test_delayed_and_other_queue_jobs_are_not_claimed(db, handlers):
+    enqueue('test.record', delay_seconds=60)
+    mail = enqueue('test.record', queue='mail')
+
+    assert claim_jobs('worker-1', queues=['default']) == []
+    assert [job[0] for job in claim_jobs('worker-1', queues=['mail'])] == [mail]
+
+
+def test_failing_job_is_retried_then_dead(app, db, handlers, monkeypatch):
+    monkeypatch.setitem(app.config, 'JOB_BACKOFF_BASE_SECONDS', 10)
+    job_id = enqueue('test.explode', {'n': 1}, max_attempts=2)
+
+    assert run_job(*claim_jobs('worker-1')[0]) == JOB_PENDING
+    db.session.expire_all()
+    job = db.session.get(Job, job_id)
+    assert job.attempts == 1
+    assert job.run_at > datetime.utcnow() + timedelta(seconds=5)  # backed off
+    assert 'handler failed' in job.last_error
+    assert claim_jobs('worker-1') == []
+
+    make_due(job_id)
+    assert run_job(*claim_jobs('worker-1')[0]) == JOB_DEAD
+    db.session.expire_all()
+    job = db.session.get(Job, job_id)
+    assert (job.status, job.attempts) == (JOB_DEAD, 2)
+    assert job.finished_at is not None
+    assert len(handlers) == 2
+
+    # A dead job can be put back with fresh attempts
+    assert retry_job(job_id)
+    assert claim_jobs('worker-1')[0][3] == 1
+
+
+def test_unknown_task_fails(db):
+    job_id = enqueue('test.missing', max_attempts=1)
+
+    assert run_job(*claim_jobs('worker-1')[0]) == JOB_DEAD
+    assert 'No handler registered' in db.session.get(Job, job_id).last_error
+
+
+def test_stale_running_jobs_are_recovered(db, handlers):
+    retried = enqueue('test.record')
+    dead = enqueue('test.record', max_attempts=1)
+    claim_jobs('lost-worker', limit=2)
+    Job.query.update({'locked_at': datetime.utcnow() - timedelta(minutes=10)})
+    db.session.commit()
+
+    assert requeue_stale_jobs(timeout_seconds=300) == 2
+    db.session.expire_all()
+    assert db.session.get(Job, retried).status == JOB_PENDING
+    assert db.session.get(Job, dead).status == JOB_DEAD
+
+
+def test_locked_jobs_are_skipped_on_postgres(postgres_app):
+    from Backend import db
+
+    with postgres_app.app_context():
+        job_ids = [enqueue('test.record', {'n': n}) for n in range(10)]
+
+    with postgres_app.app_context():
+        # A worker mid-claim holds row locks on the first three jobs
+        locked = [job.job_id for job in Job.query.order_by(Job.job_id).with_for_update().limit(3)]
+        claimed = []
+        other = threading.Thread(target=lambda: claimed.extend(claim_in_new_context(postgres_app, 'worker-2', 10)))
+        other.start()
+        other.join(timeout=10)
+        assert not other.is_alive(), 'claim waited on the locked rows'
+        db.session.rollback()
+
+    assert locked == job_ids[:3]
+    assert sorted(job[0] for job in claimed) == job_ids[3:]
+
+
+def test_concurrent_workers_never_claim_the_same_job_on_postgres(postgres_app):
+    with postgres_app.app_context():
+        job_ids = [enqueue('test.record', {'n': n}) for n in range(200)]
+
+    claimed = {}
+    start = threading.Barrier(8)
+
+    def worker(worker_id):
+        start.wait()
+        claimed[worker_id] = []
+        while True:
+            jobs = claim_in_new_context(postgres_app, worker_id, 3)
+            if not jobs:
+                return
+            claimed[worker_id].extend(job[0] for job in jobs)
+
+    threads = [threading.Thread(target=worker, args=(f'worker-{n}',)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=60)
+
+    all_claimed = [job_id for jobs in claimed.values() for job_id in jobs]
+    assert len(all_claimed) == len(set(all_claimed)) == len(job_ids)
+    assert sorted(all_claimed) == job_ids
+
+
+def claim_in_new_context(app, worker_id, limit):
+    from Backend import db
+
+    with app.app_context():
+        try:
+            return claim_jobs(worker_id, limit=limit)
+        finally:
+            db.session.remove()
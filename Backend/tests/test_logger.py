@@ -0,0 +1,156 @@
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import pytest
+from Backend.logger import Logger
+
+RUN_BENCHMARKS = os.getenv('RUN_BENCHMARKS', '').lower() in ('1', 'true', 'yes')
+
+
+@pytest.fixture
+def make_logger(monkeypatch, tmp_path):
+    """make_logger(LOG_LEVEL='WARN', ...) -> a fresh Logger (not the singleton) writing to tmp_path"""
+    loggers = []
+
+    def make(**settings):
+        monkeypatch.setenv('LOG_FILE', str(tmp_path / 'combined.log'))
+        monkeypatch.setenv('LOG_FLUSH_INTERVAL_MS', '10')
+        for name, value in settings.items():
+            monkeypatch.setenv(name, str(value))
+        logger = object.__new__(Logger)
+        logger._configure()
+        loggers.append(logger)
+        return logger
+
+    yield make
+    for logger in loggers:
+        logger.close()
+
+
+def read_lines(path):
+    with open(path, encoding='utf-8') as log_file:
+        return log_file.read().splitlines()
+
+
+def test_lines_are_written_in_order(make_logger):
+    logger = make_logger()
+    for n in range(500):
+        logger.info(f"request {n}")
+    logger.flush()
+
+    lines = read_lines(logger.log_file_path)
+    assert [line.rsplit(': ', 1)[1] for line in lines] == [f"request {n}" for n in range(500)]
+    assert all('[INFO]' in line for line in lines)
+    assert logger.stats()['written'] == 500
+
+
+def test_json_format(make_logger):
+    logger = make_logger(LOG_FORMAT='json')
+    logger.error({'path': '/api/events'})
+    logger.flush()
+
+    entry = json.loads(read_lines(logger.log_file_path)[0])
+    assert entry['level'] == 'ERROR'
+    assert entry['message'] == "{'path': '/api/events'}"
+    assert entry['pid'] == os.getpid()
+    datetime.fromisoformat(entry['timestamp'])
+
+
+def test_level_filters_before_queueing(make_logger):
+    logger = make_logger(LOG_LEVEL='WARN')
+    logger.debug("debug")
+    logger.info("info")
+    logger.warn("warn")
+    logger.error("error")
+    logger.flush()
+
+    assert [line.rsplit(': ', 1)[1] for line in read_lines(logger.log_file_path)] == ['warn', 'error']
+
+
+def test_rotates_by_size_and_keeps_backup_count(make_logger):
+    logger = make_logger(LOG_MAX_BYTES=500, LOG_BACKUP_COUNT=2)
+    for n in range(40):
+        logger.info(f"line {n:02d} " + 'x' * 40)
+        logger.flush()  # one batch per line so every write checks the size
+
+    path = logger.log_file_path
+    assert os.path.exists(f"{path}.1") and os.path.exists(f"{path}.2")
+    assert not os.path.exists(f"{path}.3")
+    assert all(os.path.getsize(name) <= 500 for name in (path, f"{path}.1", f"{path}.2"))
+    assert read_lines(path)[-1].endswith('line 39 ' + 'x' * 40)
+
+
+def test_full_queue_drops_and_reports(make_logger):
+    logger = make_logger(LOG_QUEUE_SIZE=5)
+    logger._pid = os.getpid()  # writer not started yet: the queue only fills
+    for n in range(8):
+        logger.info(f"line {n}")
+    assert logger.stats()['dropped'] == 3
+
+    logger._pid = None
+    logger._start_writer()
+    logger.flush()
+
+    lines = read_lines(logger.log_file_path)
+    assert [line.rsplit(': ', 1)[1] for line in lines[:5]] == [f"line {n}" for n in range(5)]
+    assert lines[5].endswith("Logger dropped 3 messages (queue full)")
+    assert logger.stats()['dropped'] == 0
+
+
+def test_drops_from_concurrent_callers_are_all_counted(make_logger):
+    logger = make_logger(LOG_QUEUE_SIZE=1)
+    logger._pid = os.getpid()  # writer not started: every call after the first is dropped
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        for _ in range(8):
+            pool.submit(lambda: [logger.info("line") for _ in range(2000)])
+
+    assert logger.stats()['dropped'] == 8 * 2000 - 1
+
+
+def test_close_stops_the_writer_before_closing_the_file(make_logger):
+    logger = make_logger()
+    for n in range(2000):
+        logger.info(f"line {n}")
+    writer = logger._writer
+    logger.close()
+
+    assert not writer.is_alive()
+    assert logger._file is None
+    assert len(read_lines(logger.log_file_path)) == 2000
+
+    # Logging after close starts a new writer
+    logger.info("after close")
+    logger.flush()
+    assert read_lines(logger.log_file_path)[-1].endswith("after close")
+
+
+def open_per_line(path):
+    """The previous Logger._log: open, append one line, close"""
+    def log(message):
+        with open(path, 'a') as log_file:
+            log_file.write(f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} [INFO]: {message}\n")
+    return log
+
+
+@pytest.mark.skipif(not RUN_BENCHMARKS, reason='set RUN_BENCHMARKS=1 to run')
+@pytest.mark.parametrize('threads', [1, 8])
+def test_logger_benchmark(make_logger, tmp_path, threads, lines=20000):
+    logger = make_logger(LOG_QUEUE_SIZE=lines + 10)
+
+    def run(log):
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            for worker in range(threads):
+                pool.submit(lambda w=worker: [log(f"GET /api/events worker={w} n={n}") for n in range(lines // threads)])
+        return time.perf_counter() - started
+
+    legacy = run(open_per_line(str(tmp_path / 'legacy.log')))
+    buffered = run(logger.info)
+    logger.flush(timeout=60)
+
+    assert logger.stats()['dropped'] == 0
+    print(f"\n{threads} thread(s), {lines:,} lines: open-per-line {lines / legacy:,.0f}/s, "
+          f"buffered {lines / buffered:,.0f}/s ({legacy / buffered:.1f}x)")
+    assert buffered < legacy
\ No newline at end of file
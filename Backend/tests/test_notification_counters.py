@@ -0,0 +1,58 @@
+from Backend.models import Notification, NotificationCounter
+from Backend.models.notification import NotificationType
+
+
+def unread_counter(user_id):
+    return NotificationCounter.query.get(user_id).unread_count
+
+
+def add_notifications(db, user, count):
+    notifications = [
+        Notification(user_id=user.user_id, message=f'Notification {n}', notification_type=NotificationType.GENERAL)
+        for n in range(count)
+    ]
+    db.session.add_all(notifications)
+    db.session.commit()
+    assert NotificationCounter.query.get(user.user_id) is None
+    return notifications
+
+
+def test_mark_read_counted_when_user_has_no_counter_row(client, db, make_user, auth_headers):
+    user = make_user('reader@test.edu')
+    notifications = add_notifications(db, user, 3)
+
+    response = client.put(f'/api/notifications/{notifications[0].notification_id}/mark-read', headers=auth_headers(user))
+    assert response.status_code == 200, response.get_json()
+    assert unread_counter(user.user_id) == 2
+
+    # Reading it again changes nothing
+    client.put(f'/api/notifications/{notifications[0].notification_id}/mark-read', headers=auth_headers(user))
+    assert unread_counter(user.user_id) == 2
+
+
+def test_delete_counted_when_user_has_no_counter_row(client, db, make_user, auth_headers):
+    user = make_user('reader@test.edu')
+    notifications = add_notifications(db, user, 3)
+
+    response = client.delete(f'/api/notifications/{notifications[0].notification_id}', headers=auth_headers(user))
+    assert response.status_code == 200, response.get_json()
+    assert unread_counter(user.user_id) == 2
+
+    response = client.get('/api/notifications/unread-count', headers=auth_headers(user))
+    assert response.get_json()['data']['unread_count'] == 2
+
+def test_missing_counters_are_created_in_one_upsert(db, make_user, count_queries):
+    users = [make_user(f'user{n}@test.edu') for n in range(30)]
+    add_notifications(db, users[0], 2)
+    user_ids = [user.user_id for user in users]
+    NotificationCounter.recount(user_ids[:1])
+    db.session.commit()
+
+    with count_queries() as queries:
+        NotificationCounter.recount(user_ids)
+    assert len(queries) == 2  # tally + upsert
+    db.session.commit()
+
+    assert NotificationCounter.query.count() == 30
+    assert unread_counter(user_ids[0]) == 2
+    assert unread_counter(user_ids[1]) == 0
\ No newline at end of file
@@ -0,0 +1,69 @@
+import os
+import time
+import pytest
+from sqlalchemy import insert
+from Backend.models import User, Notification, NotificationCounter
+from Backend.models.notification import NotificationType
+from Backend.models.broadcast_notification import BROADCAST_ALL_USERS
+from Backend.services.notification_inbox import NotificationInbox
+from Backend.utils.notification_fanout import fan_out_notifications, broadcast_notification, all_active_users
+
+RUN_BENCHMARKS = os.getenv('RUN_BENCHMARKS', '').lower() in ('1', 'true', 'yes')
+
+
+def add_users(db, count, inactive=0):
+    db.session.execute(insert(User), [
+        {'email': f'user{n}@test.edu', 'password_hash': 'x', 'is_active': n >= inactive}
+        for n in range(count)
+    ])
+    db.session.commit()
+
+
+def notification_inserts(queries):
+    return [q for q in queries if q.lstrip().upper().startswith('INSERT INTO NOTIFICATIONS')]
+
+
+def test_fan_out_writes_one_insert_per_chunk(db, count_queries):
+    add_users(db, 7, inactive=1)
+
+    with count_queries() as queries:
+        stats = fan_out_notifications(all_active_users(), 'Hello', NotificationType.GENERAL, chunk_size=3)
+
+    assert stats == {'recipients': 6, 'created': 6, 'pushed': 6, 'failed_chunks': 0}
+    assert len(notification_inserts(queries)) == 2  # 6 recipients in chunks of 3
+    assert Notification.query.count() == 6
+    assert NotificationCounter.query.filter_by(unread_count=1).count() == 6
+
+
+def test_fan_out_excludes_a_user(db):
+    add_users(db, 4)
+    sender = User.query.first()
+
+    stats = fan_out_notifications(all_active_users(exclude_user_id=sender.user_id), 'Hello', push=False)
+    assert stats['created'] == 3 and stats['pushed'] == 0
+    assert Notification.query.filter_by(user_id=sender.user_id).count() == 0
+
+
+def test_broadcast_stores_one_row_and_counts_as_unread(db, count_queries):
+    add_users(db, 5)
+
+    with count_queries() as queries:
+        stats = broadcast_notification(BROADCAST_ALL_USERS, 'Campus closed', NotificationType.SYSTEM_ALERT)
+
+    assert stats['recipients'] == 5 and stats['pushed'] == 5
+    assert notification_inserts(queries) == []
+    user_id = User.query.first().user_id
+    assert NotificationInbox.unread_count(user_id) == 1
+
+
+@pytest.mark.skipif(not RUN_BENCHMARKS, reason='set RUN_BENCHMARKS=1 to run')
+@pytest.mark.parametrize('recipients', [1000, 10000, 100000])
+def test_fan_out_benchmark(db, recipients):
+    add_users(db, recipients)
+
+    started = time.perf_counter()
+    stats = fan_out_notifications(all_active_users(), 'Benchmark', NotificationType.GENERAL)
+    elapsed = time.perf_counter() - started
+
+    assert stats['created'] == recipients
+    print(f"\nfan-out to {recipients:,} recipients: {elapsed:.2f}s ({recipients / elapsed:,.0f}/s)")
\ No newline at end of file
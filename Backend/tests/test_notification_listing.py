@@ -0,0 +1,122 @@
+"""
+Notification listing: index usage (EXPLAIN harness), keyset paging and archiving.
+The EXPLAIN tests always run on SQLite; set TEST_POSTGRES_URL to also run
+them on PostgreSQL (tables are created in a throwaway schema and dropped).
+"""
+
+import os
+import uuid
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import create_engine, text, update
+from Backend.models import Notification, NotificationArchive
+from Backend.models.notification import NotificationType
+from Backend.models.broadcast_notification import BROADCAST_ALL_USERS
+from Backend.services.notification_inbox import NotificationInbox
+from Backend.tasks.notification_archiver import archive_batch, archive_read_notifications
+from Backend.utils.notification_fanout import broadcast_notification
+
+POSTGRES_URL = os.getenv('TEST_POSTGRES_URL')
+
+
+@pytest.fixture(params=['sqlite', 'postgresql'])
+def plan_connection(request, db):
+    if request.param == 'sqlite':
+        yield db.session.connection()
+        return
+    if not POSTGRES_URL:
+        pytest.skip('set TEST_POSTGRES_URL to run on PostgreSQL')
+
+    engine = create_engine(POSTGRES_URL)
+    schema = f"explain_{uuid.uuid4().hex[:8]}"
+    with engine.connect() as connection:
+        connection.execute(text(f'CREATE SCHEMA {schema}'))
+        connection.execute(text(f'SET search_path TO {schema}'))
+        db.metadata.create_all(connection)
+        # Empty tables: make the planner show which index it would use
+        connection.execute(text('SET enable_seqscan = off'))
+        try:
+            yield connection
+        finally:
+            connection.rollback()
+            connection.execute(text(f'DROP SCHEMA {schema} CASCADE'))
+            connection.commit()
+    engine.dispose()
+
+
+def explain(connection, statement):
+    """The query plan of statement as one string"""
+    sql = str(statement.compile(dialect=connection.dialect, compile_kwargs={'literal_binds': True}))
+    if connection.dialect.name == 'postgresql':
+        return '\n'.join(row[0] for row in connection.execute(text(f'EXPLAIN {sql}')))
+    return '\n'.join(row[-1] for row in connection.execute(text(f'EXPLAIN QUERY PLAN {sql}')))
+
+
+def test_inbox_listing_uses_the_created_index(plan_connection):
+    direct, _ = NotificationInbox._branches(1, limit=21)
+    assert 'idx_notification_user_created' in explain(plan_connection, direct)
+
+
+def test_unread_listing_uses_the_unread_index(plan_connection):
+    direct, _ = NotificationInbox._branches(1, unread_only=True, limit=21)
+    assert 'idx_notification_user_unread' in explain(plan_connection, direct)
+
+
+def test_keyset_page_uses_the_created_index(plan_connection):
+    direct, _ = NotificationInbox._branches(1, before=(datetime(2030, 1, 1), 500), limit=21)
+    assert 'idx_notification_user_created' in explain(plan_connection, direct)
+
+
+def test_mark_all_read_uses_the_unread_index(plan_connection):
+    statement = update(Notification).where(Notification.user_id == 1, Notification.is_read == False).values(is_read=True)
+    assert 'idx_notification_user_unread' in explain(plan_connection, statement)
+
+
+def add_notifications(db, user, count, start=None, **fields):
+    start = start or datetime.utcnow() - timedelta(hours=count)
+    db.session.add_all([
+        Notification(
+            user_id=user.user_id, message=f'Notification {n}', notification_type=NotificationType.GENERAL,
+            created_at=start + timedelta(minutes=n), **fields
+        )
+        for n in range(count)
+    ])
+    db.session.commit()
+
+
+def test_archive_batch_uses_the_retention_index(plan_connection):
+    plan = explain(plan_connection, archive_batch(datetime.utcnow() - timedelta(days=90), 1000))
+    assert 'idx_notification_read_created' in plan
+    assert 'TEMP B-TREE' not in plan  # rows come out of the index in batch order, no sort
+
+def test_keyset_windows_walk_the_whole_inbox_once(db, make_user):
+    user = make_user('reader@test.edu')
+    add_notifications(db, user, 23)
+    broadcast_notification(BROADCAST_ALL_USERS, 'Broadcast', push=False)
+
+    seen, cursor = [], None
+    while True:
+        window = NotificationInbox.get_window(user.user_id, cursor=cursor, limit=10)
+        seen += [n['id'] for n in window['notifications']]
+        cursor = window['next_cursor']
+        if not window['has_more']:
+            break
+
+    everything = NotificationInbox.get_page(user.user_id, per_page=100)['notifications']
+    assert len(seen) == 24 and len(set(seen)) == 24
+    assert seen == [n['id'] for n in everything]
+    assert seen[0] < 0  # the broadcast is the newest
+
+
+def test_archiver_moves_only_old_read_notifications(db, make_user):
+    user = make_user('reader@test.edu')
+    old = datetime.utcnow() - timedelta(days=120)
+    add_notifications(db, user, 5, start=old, is_read=True)
+    add_notifications(db, user, 2, start=old, is_read=False)
+    add_notifications(db, user, 3, is_read=True)
+
+    assert archive_read_notifications(retention_days=90, batch_size=2) == 5
+    assert NotificationArchive.query.count() == 5
+    assert Notification.query.count() == 5
+    assert Notification.query.filter(Notification.created_at < old + timedelta(days=1), Notification.is_read == True).count() == 0
+    assert archive_read_notifications(retention_days=90, batch_size=2) == 0
\ No newline at end of file
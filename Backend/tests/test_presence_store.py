@@ -0,0 +1,136 @@
+from types import SimpleNamespace
+import pytest
+from Backend.utils import presence_store as presence_module
+from Backend.utils.presence_store import PresenceStore, MemoryPresenceStore, RedisPresenceStore
+from Backend.utils.typing_presence import TypingPresence
+
+
+class RecordingSocketIO:
+    def __init__(self):
+        self.emitted = []
+
+    def emit(self, event, data, to=None):
+        self.emitted.append((event, data, to))
+
+
+@pytest.fixture
+def redis_server():
+    """An in-process Redis (fakeredis, with Lua) that several clients can share"""
+    fakeredis = pytest.importorskip('fakeredis')
+    server = fakeredis.FakeServer()
+    return lambda: fakeredis.FakeRedis(server=server)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Frozen time.time() for the presence store; advance with clock.now += seconds"""
+    clock = SimpleNamespace(now=1_000_000.0)
+    monkeypatch.setattr(presence_module, 'time', SimpleNamespace(time=lambda: clock.now, sleep=lambda seconds: None))
+    return clock
+
+
+@pytest.fixture(params=['memory', 'redis'])
+def store(request):
+    if request.param == 'memory':
+        return PresenceStore(MemoryPresenceStore())
+    return PresenceStore(RedisPresenceStore(request.getfixturevalue('redis_server')()))
+
+
+def test_sessions(store):
+    store.add_session('sid-1', 7)
+    store.add_session('sid-2', 7)
+    store.add_session('sid-3', 8, is_admin=True)
+
+    assert store.user_id('sid-1') == 7
+    assert not store.is_admin('sid-1')
+    assert store.is_admin('sid-3')
+    assert store.user_id('unknown') is None
+    assert store.stats()['sessions'] == 3
+    assert store.stats()['online_users'] == 2
+
+    assert store.remove_session('sid-1') == (7, False)
+    assert store.is_online(7)  # still connected through sid-2
+    assert store.remove_session('sid-2') == (7, False)
+    assert not store.is_online(7)
+    assert store.remove_session('sid-2') is None
+    assert store.stats()['online_users'] == 1
+
+
+def test_typing_expires(store):
+    store.touch_typing('club_1', 7, expires_at=105)
+    store.touch_typing('club_1', 8, expires_at=110)
+    store.touch_typing('club_2', 9, expires_at=110)
+
+    assert store.typing_users('club_1', now=100) == {7, 8}
+    assert store.typing_users('club_1', now=106) == {8}
+    store.clear_typing('club_1', 8)
+    assert store.typing_users('club_1', now=106) == set()
+    assert store.typing_users('club_2', now=106) == {9}
+
+
+def test_typing_flush_emits_changes_once(store):
+    socketio = RecordingSocketIO()
+    typing = TypingPresence(store)
+    typing.socketio = socketio
+
+    typing.update('sid-1', 'club_1', 7, True)
+    typing.update('sid-1', 'club_1', 7, True)
+    typing.update('sid-2', 'event_5', 8, True)
+    assert typing.flush() == 2
+    assert sorted(socketio.emitted, key=str) == [
+        ('userTyping', {'users': [7], 'isTyping': True}, 'club_1'),
+        ('user_typing_event', {'user_id': 8, 'is_typing': True}, 'event_5')
+    ]
+
+    # Nothing changed: nothing is emitted
+    assert typing.flush() == 0
+
+    typing.disconnect('sid-1')
+    typing.leave('sid-2', 'event_5')
+    assert typing.flush() == 2
+    assert ('userTyping', {'isTyping': False}, 'club_1') in socketio.emitted
+    assert ('user_typing_event', {'user_id': 8, 'is_typing': False}, 'event_5') in socketio.emitted
+    assert typing.stats()['active_rooms'] == 0
+
+
+def test_sessions_of_a_dead_process_expire(redis_server, clock):
+    crashed = RedisPresenceStore(redis_server(), ttl_seconds=60, process_id='crashed')
+    alive = RedisPresenceStore(redis_server(), ttl_seconds=60, process_id='alive')
+    crashed.add_session('sid-a', 1)
+    alive.add_session('sid-b', 2)
+    assert crashed.online_count() == 2 and crashed.session_count() == 2
+
+    # Only the live process keeps heartbeating
+    for _ in range(3):
+        clock.now += 30
+        alive.heartbeat()
+
+    assert alive.live_processes() == ['alive']
+    assert alive.user_sids(1) == set()
+    assert alive.user_sids(2) == {'sid-b'}
+    assert alive.online_count() == 1
+    assert alive.session_count() == 1
+
+
+def test_shared_keys_carry_a_ttl(redis_server):
+    client = redis_server()
+    store = RedisPresenceStore(client, ttl_seconds=60, process_id='web-1')
+    store.add_session('sid-1', 7)
+
+    assert 0 < client.ttl('presence:sessions:web-1') <= 60
+    assert 0 < client.ttl('presence:user:7') <= 60
+
+
+def test_disconnect_elsewhere_keeps_a_user_online(redis_server):
+    first = RedisPresenceStore(redis_server(), process_id='web-1')
+    second = RedisPresenceStore(redis_server(), process_id='web-2')
+    first.add_session('sid-1', 7)
+    second.add_session('sid-2', 7)
+
+    assert first.remove_session('sid-1') == (7, False)
+    assert first.user_sids(7) == {'sid-2'}
+    assert first.online_count() == 1
+    assert first.remove_session('sid-2') is None  # owned by the other process
+
+    assert second.remove_session('sid-2') == (7, False)
+    assert second.online_count() == 0
\ No newline at end of file
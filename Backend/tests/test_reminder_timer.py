@@ -0,0 +1,17 @@
+from Backend.models import Event
+from Backend.tasks.reminder_timer import reminder_timer
+
+
+def test_event_approval_reschedules_reminders(client, monkeypatch, make_user, make_event, auth_headers):
+    rescheduled = []
+    monkeypatch.setattr(reminder_timer, 'reschedule', rescheduled.append)
+    admin = make_user('admin@test.edu', role='admin')
+    event = make_event(make_user('organizer@test.edu', role='faculty'), approval_status='pending')
+
+    client.put(
+        f'/api/events/admin/{event.event_id}/approval',
+        json={'approval_status': 'approved'},
+        headers=auth_headers(admin)
+    )
+    assert Event.query.get(event.event_id).approval_status == 'approved'
+    assert rescheduled == [event.event_id]
\ No newline at end of file
@@ -0,0 +1,43 @@
+from datetime import datetime, timedelta
+from Backend.models import EventRegistration, Notification, NotificationCounter, SentReminder
+from Backend.tasks.reminder_scheduler import send_due_reminders, send_event_reminders, parse_reminder_offsets
+
+
+def register(db, event, *users):
+    for user in users:
+        db.session.add(EventRegistration(user_id=user.user_id, event_id=event.event_id, status='approved'))
+    db.session.commit()
+
+
+def test_due_reminders_sent_once_per_kind(db, make_user, make_event):
+    organizer = make_user('organizer@test.edu', role='faculty')
+    event = make_event(organizer, starts_in=timedelta(minutes=30), title='Hackathon')
+    first, second = make_user('first@test.edu'), make_user('second@test.edu')
+    register(db, event, first, second)
+
+    now = datetime.utcnow()
+    assert send_due_reminders('1h', timedelta(hours=1), now + timedelta(minutes=10), now + timedelta(hours=1)) == 2
+    # A rerun (or an overlapping run) finds every row already claimed
+    assert send_due_reminders('1h', timedelta(hours=1), now + timedelta(minutes=10), now + timedelta(hours=1)) == 0
+
+    notifications = Notification.query.filter_by(related_event_id=event.event_id).all()
+    assert sorted(n.user_id for n in notifications) == [first.user_id, second.user_id]
+    assert notifications[0].message == "⏰ Reminder: 'Hackathon' starts in 1 hour! Don't forget to attend."
+    assert SentReminder.query.count() == 2
+    assert NotificationCounter.query.get(first.user_id).unread_count == 1
+
+
+def test_event_reminders_pick_the_nearest_window(db, make_user, make_event):
+    organizer = make_user('organizer@test.edu', role='faculty')
+    soon = make_event(organizer, starts_in=timedelta(minutes=30))
+    tomorrow = make_event(organizer, starts_in=timedelta(hours=20))
+    later = make_event(organizer, starts_in=timedelta(days=3))
+    register(db, soon, make_user('a@test.edu'))
+    register(db, tomorrow, make_user('b@test.edu'))
+    register(db, later, make_user('c@test.edu'))
+
+    offsets = parse_reminder_offsets('24h,1h,10m')
+    assert send_event_reminders(offsets) == {'24h': 1, '1h': 1, '10m': 0}
+    assert send_event_reminders(offsets) == {'24h': 0, '1h': 0, '10m': 0}
+    kinds = dict(db.session.query(SentReminder.event_id, SentReminder.reminder_kind).all())
+    assert kinds == {soon.event_id: '1h', tomorrow.event_id: '24h'}
\ No newline at end of file
@@ -0,0 +1,89 @@
+import random
+import time
+from datetime import datetime, timedelta
+import pytest
+from Backend.models import SystemLog
+from Backend.tasks.scheduler import JobScheduler
+
+
+@pytest.fixture
+def make_scheduler():
+    def make(app):
+        scheduler = JobScheduler()
+        scheduler.init_app(app)
+        return scheduler
+    return make
+
+
+def job_stats(scheduler, name):
+    return next(job for job in scheduler.stats()['jobs'] if job['name'] == name)
+
+
+def test_run_now_records_duration_and_errors(app, db, make_scheduler):
+    scheduler = make_scheduler(app)
+
+    def failing():
+        db.session.add(SystemLog(action_type='test', log_type='info', description='not committed'))
+        db.session.flush()
+        raise RuntimeError('job exploded')
+
+    scheduler.add_job('slow', lambda: time.sleep(0.02), minutes=5)
+    scheduler.add_job('failing', failing, hours=1)
+
+    assert scheduler.run_now('slow')
+    assert scheduler.run_now('slow')
+    assert not scheduler.run_now('failing')
+
+    slow = job_stats(scheduler, 'slow')
+    assert (slow['runs'], slow['failures'], slow['last_error']) == (2, 0, None)
+    assert 20 <= slow['last_ms'] <= slow['max_ms']
+    assert slow['avg_ms'] >= 20
+    assert slow['last_run_at'] and slow['next_run_at']
+
+    failing_stats = job_stats(scheduler, 'failing')
+    assert (failing_stats['runs'], failing_stats['failures']) == (1, 1)
+    assert failing_stats['last_error'] == 'job exploded'
+    assert SystemLog.query.filter_by(description='not committed').count() == 0
+
+
+def test_tick_runs_due_jobs_on_sqlite(app, db, make_scheduler):
+    scheduler = make_scheduler(app)
+    runs = []
+    due = scheduler.add_job('due', lambda: runs.append('due'), minutes=1)
+    scheduler.add_job('later', lambda: runs.append('later'), at='23:59')
+    scheduler._entries['due'].next_run = datetime.now() - timedelta(seconds=1)
+
+    scheduler.tick()
+
+    assert scheduler.is_leader and scheduler.stats()['leader']
+    assert runs == ['due']
+    assert due.runs == 1
+
+
+def test_only_one_scheduler_leads_on_postgres(postgres_app, make_scheduler):
+    first, second = make_scheduler(postgres_app), make_scheduler(postgres_app)
+    # Keep clear of any other test run or server sharing the database
+    first.lock_key = second.lock_key = random.randint(1, 2 ** 31 - 1)
+    runs = []
+    for scheduler in (first, second):
+        scheduler.add_job('tick', lambda scheduler=scheduler: runs.append(scheduler), minutes=1)
+        scheduler._entries['tick'].next_run = datetime.now() - timedelta(seconds=1)
+
+    try:
+        assert first._elect() and first.is_leader
+        assert not second._elect() and not second.is_leader
+        assert first._elect()  # keeps the lock on its own connection
+
+        second.tick()
+        first.tick()
+        assert runs == [first]
+
+        # The leader goes away: its connection closes and the lock is free
+        first._release()
+        assert not first.is_leader
+        assert second._elect() and second.is_leader
+        assert not first._elect()
+    finally:
+        for scheduler in (first, second):
+            if scheduler._leader_connection is not None:
+                scheduler._release()
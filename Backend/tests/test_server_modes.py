@@ -0,0 +1,111 @@
+"""
+Server entry point smoke test
+Boots `python -m Backend.server` once per installed SOCKETIO_ASYNC_MODE on a
+SQLite file and checks that it answers an authenticated REST request and
+accepts a Socket.IO connection. Modes whose package is missing are skipped.
+"""
+
+import importlib.util
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+import pytest
+import requests
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SEED = """
+from Backend import create_app, db
+from Backend.models import User, Student
+from Backend.services.auth_service import AuthService
+app = create_app(start_background_tasks=False)
+with app.app_context():
+    user = User(email='server@test.edu', password_hash='x', is_active=True)
+    db.session.add(user)
+    db.session.flush()
+    db.session.add(Student(user_id=user.user_id, full_name='Server'))
+    db.session.commit()
+    print(AuthService.generate_auth_token(user, 1).token)
+"""
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def server_output(log_path):
+    with open(log_path) as log:
+        return ''.join(log.readlines()[-30:])
+
+
+def wait_until_serving(port, process, log_path, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        assert process.poll() is None, f'server exited:\n{server_output(log_path)}'
+        try:
+            requests.get(f'http://127.0.0.1:{port}/socket.io/?EIO=4&transport=polling', timeout=1)
+            return
+        except requests.ConnectionError:
+            time.sleep(0.2)
+    raise TimeoutError(f'server did not start:\n{server_output(log_path)}')
+
+
+@pytest.fixture(params=['threading', 'eventlet', 'gevent'])
+def server(request, tmp_path):
+    mode = request.param
+    if mode != 'threading' and importlib.util.find_spec(mode) is None:
+        pytest.skip(f'{mode} is not installed')
+
+    port = free_port()
+    env = dict(
+        os.environ,
+        PYTHONPATH=REPO_ROOT,
+        SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'server.db'}",
+        SOCKETIO_ASYNC_MODE=mode,
+        PORT=str(port),
+        HOST='127.0.0.1',
+        LOG_FILE=str(tmp_path / 'combined.log'),
+        PYTHONWARNINGS='ignore'
+    )
+    env.pop('SOCKETIO_MESSAGE_QUEUE', None)
+    token = subprocess.run(
+        [sys.executable, '-c', SEED], env=dict(env, SOCKETIO_ASYNC_MODE='threading'), cwd=tmp_path,
+        check=True, capture_output=True, text=True
+    ).stdout.strip().splitlines()[-1]
+
+    log_path = tmp_path / 'server.log'
+    with open(log_path, 'w') as log:
+        process = subprocess.Popen([sys.executable, '-m', 'Backend.server'], env=env, cwd=tmp_path,
+                                   stdout=log, stderr=subprocess.STDOUT)
+    try:
+        wait_until_serving(port, process, log_path)
+        yield f'http://127.0.0.1:{port}', token, log_path
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def test_server_answers_rest_and_socketio(server):
+    import socketio
+
+    url, token, log_path = server
+    response = requests.get(f'{url}/api/social/feed', headers={'Authorization': f'Bearer {token}'}, timeout=10)
+    assert response.status_code == 200, server_output(log_path)
+    assert response.json() == {'posts': [], 'next_cursor': None}
+
+    connected = threading.Event()
+    client = socketio.Client(reconnection=False)
+    client.on('connect', connected.set)
+    client.connect(url, transports=['polling'], wait_timeout=10)
+    try:
+        assert connected.wait(10), server_output(log_path)
+    finally:
+        client.disconnect()
+
+    # The green modes must be patched before anything else is imported
+    assert 'monkey_patch' not in server_output(log_path)
@@ -0,0 +1,131 @@
+"""
+Cross-process Socket.IO delivery
+Runs two server processes on one SQLite file and the message queue named by
+TEST_SOCKETIO_MESSAGE_QUEUE (e.g. redis://localhost:6379/15). A client
+connected to the first process must receive an emit the second process makes
+to its user room. Skipped when no queue is configured or reachable.
+"""
+
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlparse
+import pytest
+import requests
+
+MESSAGE_QUEUE = os.getenv('TEST_SOCKETIO_MESSAGE_QUEUE')
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SEED = """
+from Backend import create_app, db
+from Backend.models import User, Student
+from Backend.services.auth_service import AuthService
+app = create_app(start_background_tasks=False)
+with app.app_context():
+    user = User(email='scaling@test.edu', password_hash='x', is_active=True)
+    db.session.add(user)
+    db.session.flush()
+    db.session.add(Student(user_id=user.user_id, full_name='Scaling'))
+    db.session.commit()
+    print(AuthService.generate_auth_token(user, 1).token)
+"""
+
+SERVE = """
+import sys
+from Backend import create_app, socketio
+app = create_app(start_background_tasks=False)
+socketio.run(app, host='127.0.0.1', port=int(sys.argv[1]), allow_unsafe_werkzeug=True)
+"""
+
+
+def queue_reachable(url):
+    parsed = urlparse(url)
+    try:
+        socket.create_connection((parsed.hostname or 'localhost', parsed.port or 6379), timeout=1).close()
+        return True
+    except OSError:
+        return False
+
+
+pytestmark = pytest.mark.skipif(
+    not MESSAGE_QUEUE or not queue_reachable(MESSAGE_QUEUE),
+    reason='TEST_SOCKETIO_MESSAGE_QUEUE is not set or not reachable'
+)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_serving(port, process, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        assert process.poll() is None, f'server on port {port} exited'
+        try:
+            requests.get(f'http://127.0.0.1:{port}/socket.io/?EIO=4&transport=polling', timeout=1)
+            return
+        except requests.ConnectionError:
+            time.sleep(0.2)
+    raise TimeoutError(f'server on port {port} did not start')
+
+
+@pytest.fixture
+def servers(tmp_path):
+    env = dict(
+        os.environ,
+        PYTHONPATH=REPO_ROOT,
+        SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'scaling.db'}",
+        SOCKETIO_MESSAGE_QUEUE=MESSAGE_QUEUE,
+        SOCKETIO_CHANNEL=f'test-scaling-{os.getpid()}',
+        SOCKETIO_ASYNC_MODE='threading',
+        LOG_FILE=str(tmp_path / 'combined.log')
+    )
+    token = subprocess.run(
+        [sys.executable, '-c', SEED], env=env, cwd=tmp_path, check=True, capture_output=True, text=True
+    ).stdout.strip().splitlines()[-1]
+
+    ports = [free_port(), free_port()]
+    processes = [
+        subprocess.Popen([sys.executable, '-c', SERVE, str(port)], env=env, cwd=tmp_path,
+                         stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        for port in ports
+    ]
+    try:
+        for port, process in zip(ports, processes):
+            wait_until_serving(port, process)
+        yield token, ports
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait(timeout=10)
+
+
+def test_emit_from_one_process_reaches_a_client_on_the_other(servers):
+    import socketio
+
+    token, (first, second) = servers
+    authenticated = threading.Event()
+    received = threading.Event()
+    client = socketio.Client()
+    client.on('authenticated', lambda data: authenticated.set())
+    client.on('unread_count_update', lambda data: received.set())
+
+    client.connect(f'http://127.0.0.1:{first}', transports=['polling'])
+    try:
+        client.emit('authenticate', {'token': token})
+        assert authenticated.wait(10)
+
+        # The second process emits unread_count_update to the user's room
+        response = requests.post(
+            f'http://127.0.0.1:{second}/api/notifications/create-samples',
+            headers={'Authorization': f'Bearer {token}'}, timeout=10
+        )
+        assert response.status_code == 201
+        assert received.wait(10)
+    finally:
+        client.disconnect()
\ No newline at end of file
@@ -0,0 +1,47 @@
+import pytest
+from Backend.models import User
+
+ROLES = ('student', 'faculty', 'admin', None)
+
+
+def make_users(make_user, count):
+    return [make_user(f'user{n}@test.edu', role=ROLES[n % len(ROLES)]) for n in range(count)]
+
+
+def test_role_options_answer_role_questions_without_more_queries(db, make_user, count_queries):
+    make_users(make_user, 8)
+    db.session.expunge_all()
+
+    with count_queries() as queries:
+        users = User.query.options(*User.role_options()).all()
+        rendered = [(user.role, user.full_name, user.profile_picture) for user in users]
+    assert len(queries) == 1
+    assert [role for role, _, _ in rendered] == [ROLES[n % len(ROLES)] for n in range(8)]
+    assert rendered[-1][1] == 'Unknown'
+
+
+def test_preload_roles_loads_profiles_in_one_query(db, make_user, count_queries):
+    make_users(make_user, 8)
+    db.session.expunge_all()
+    users = User.query.all()
+
+    with count_queries() as queries:
+        User.preload_roles(users)
+        names = [user.full_name for user in users]
+    assert len(queries) == 1
+    assert names[0] == 'User0'
+
+
+@pytest.mark.parametrize('count', [4, 20])
+def test_admin_user_listing_runs_constant_statements(client, db, make_user, auth_headers, count_queries, count):
+    admin = make_user('admin@test.edu', role='admin')
+    headers = auth_headers(admin)
+    make_users(make_user, count)
+    db.session.expunge_all()
+
+    with count_queries() as queries:
+        response = client.get(f'/api/admin/users?limit={count + 1}', headers=headers)
+    assert response.status_code == 200
+    assert len(response.get_json()['users']) == count + 1
+    # Token lookup, page count and page rows, whatever the page size
+    assert len(queries) == 3, queries
\ No newline at end of file
@@ -0,0 +1,101 @@
+"""
+Keyset windows over chat history
+Pages are anchored on a message id instead of an OFFSET, so fetching older
+history or the delta since the last seen message costs the same no matter
+how long the chat is.
+"""
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import joinedload
+from .. import db
+
+DEFAULT_CHAT_WINDOW = 50
+MAX_CHAT_WINDOW = 200
+
+
+def parse_window_args(args):
+    """Read before_id / after_id (or since_message_id) / limit / include_total from request args"""
+    limit = args.get('limit', default=None, type=int) or args.get('per_page', default=DEFAULT_CHAT_WINDOW, type=int)
+    after_id = args.get('after_id', default=None, type=int)
+    if after_id is None:
+        after_id = args.get('since_message_id', default=None, type=int)
+    return {
+        'before_id': args.get('before_id', default=None, type=int),
+        'after_id': after_id,
+        'limit': max(1, min(limit, MAX_CHAT_WINDOW)),
+        'include_total': args.get('include_total', default='false').lower() in ('1', 'true', 'yes')
+    }
+
+
+def keyset_window(query, sort_col, id_col, before_id=None, after_id=None, limit=DEFAULT_CHAT_WINDOW):
+    """
+    Return (rows, has_more) for one window of query ordered by (sort_col, id_col).
+
+    after_id:  the next `limit` messages after that message (reconnect delta)
+    before_id: the `limit` messages preceding that message (scrollback)
+    neither:   the latest `limit` messages
+    Rows are always returned oldest first.
+    """
+    anchor_id = after_id if after_id is not None else before_id
+    anchor = None
+    if anchor_id is not None:
+        anchor = db.session.query(sort_col).filter(id_col == anchor_id).scalar()
+
+    if after_id is not None:
+        if anchor is not None:
+            query = query.filter(or_(sort_col > anchor, and_(sort_col == anchor, id_col > after_id)))
+        else:
+            # Anchor message is gone; ids still increase with time
+            query = query.filter(id_col > after_id)
+        rows = query.order_by(sort_col.asc(), id_col.asc()).limit(limit + 1).all()
+        return rows[:limit], len(rows) > limit
+
+    if before_id is not None:
+        if anchor is not None:
+            query = query.filter(or_(sort_col < anchor, and_(sort_col == anchor, id_col < before_id)))
+        else:
+            query = query.filter(id_col < before_id)
+
+    rows = query.order_by(sort_col.desc(), id_col.desc()).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    rows.reverse()
+    return rows, has_more
+
+
+def window_response(messages, has_more, id_key, total=None):
+    """Response body for a keyset window; oldest_id / newest_id are the next anchors"""
+    data = {
+        'messages': messages,
+        'has_more': has_more,
+        'oldest_id': messages[0][id_key] if messages else None,
+        'newest_id': messages[-1][id_key] if messages else None
+    }
+    if total is not None:
+        data['total'] = total
+    return data
+
+
+def club_chat_window(club_id, after_id=None, before_id=None, limit=DEFAULT_CHAT_WINDOW):
+    """Keyset window of a club's chat with senders and their role profiles loaded"""
+    from ..models.club_chat import ClubChat
+    from ..models.user import User
+
+    query = ClubChat.query.options(
+        joinedload(ClubChat.sender).options(*User.role_options())
+    ).filter(ClubChat.club_id == club_id)
+    return keyset_window(query, ClubChat.sent_at, ClubChat.message_id,
+                         before_id=before_id, after_id=after_id, limit=limit)
+
+
+def club_message_to_dict(chat, leader_id):
+    """Club chat message in the shape broadcast as newMessage"""
+    return {
+        'message_id': chat.message_id,
+        'club_id': chat.club_id,
+        'sender_id': chat.sender_id,
+        'sender_name': chat.sender.full_name if chat.sender else "Unknown",
+        'message_text': chat.message_text,
+        'sent_at': chat.sent_at.isoformat() if chat.sent_at else None,
+        'is_leader': leader_id == chat.sender_id
+    }
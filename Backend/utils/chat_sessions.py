@@ -0,0 +1,178 @@
+"""
+Per-socket chat session state
+Caches, for each connected socket, the sender's display profile and their
+role in every event chat they joined, so send_event_message only inserts and
+emits. Entries are filled when the client joins an event room (or on the
+first message) and dropped on disconnect. Routes that change what a user may
+see in an event chat (new associations, event status changes, deletion,
+bans) invalidate by event or by user after they commit; a version per event
+and per user stops a load that raced with a change from being stored.
+
+Sockets are sticky to one server process, so the state is in process. Other
+processes only see invalidations through the TTL.
+"""
+
+import threading
+import time
+
+# chat_type -> roles allowed to post, and the error shown to everyone else
+CHAT_TYPE_ROLES = {
+    'organizer_admin': (('organizer',), 'Access denied - organizer access required'),
+    'organizer_volunteer': (('organizer', 'volunteer'), 'Access denied - organizer or volunteer access required'),
+    'attendee_only': (('organizer', 'volunteer', 'attendee'), 'Access denied - not registered for event')
+}
+
+_NOT_LOADED = object()
+
+
+class ChatSession:
+    """Cached state of one socket"""
+
+    __slots__ = ('user_id', 'user_version', 'loaded_at', 'is_admin', 'sender_name', 'roles')
+
+    def __init__(self, user_id, user_version, is_admin, sender_name):
+        self.user_id = user_id
+        self.user_version = user_version
+        self.loaded_at = time.monotonic()
+        self.is_admin = is_admin
+        self.sender_name = sender_name
+        self.roles = {}  # event_id -> (event_version, role or None)
+
+
+class ChatSessionCache:
+    """sid -> ChatSession, with event/user invalidation and hit/miss counters"""
+
+    def __init__(self, ttl_seconds=300):
+        self.ttl_seconds = ttl_seconds
+        self._sessions = {}
+        self._user_versions = {}
+        self._event_versions = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def init_app(self, app):
+        self.ttl_seconds = app.config.get('CHAT_SESSION_TTL_SECONDS', self.ttl_seconds)
+
+    def authorize(self, sid, user_id, event_id, chat_type, admin_session=False):
+        """
+        Check that user_id may post to the event chat.
+        Returns (session, None) when allowed or (None, error message).
+        """
+        session = self._get_session(sid, user_id)
+        if session is None:
+            session = self._load_session(sid, user_id)
+            if session is None:
+                return None, 'User not found'
+
+        # Admin users bypass all permission checks
+        if session.is_admin or admin_session:
+            return session, None
+
+        try:
+            event_id = int(event_id)
+        except (TypeError, ValueError):
+            return None, 'Access denied - not associated with event'
+
+        role = self._get_role(session, event_id)
+        if role is _NOT_LOADED:
+            role = self._load_role(session, event_id)
+        if role is None:
+            return None, 'Access denied - not associated with event'
+
+        allowed_roles, error = CHAT_TYPE_ROLES.get(chat_type, (None, None))
+        if allowed_roles is not None and (role or 'attendee') not in allowed_roles:
+            return None, error
+        return session, None
+
+    def profile(self, sid, user_id):
+        """The socket's cached session (sender name, admin flag), or None if the user is gone"""
+        return self._get_session(sid, user_id) or self._load_session(sid, user_id)
+
+    def close(self, sid):
+        with self._lock:
+            self._sessions.pop(sid, None)
+
+    def invalidate_event(self, *event_ids):
+        """Roles in these events changed (association added/removed, status, deletion)"""
+        with self._lock:
+            for event_id in event_ids:
+                self._event_versions[event_id] = self._event_versions.get(event_id, 0) + 1
+                self.invalidations += 1
+
+    def invalidate_user(self, *user_ids):
+        """Profile, admin flag or account status of these users changed"""
+        with self._lock:
+            for user_id in user_ids:
+                self._user_versions[user_id] = self._user_versions.get(user_id, 0) + 1
+                self.invalidations += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'sessions': len(self._sessions),
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'invalidations': self.invalidations,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+    def _get_session(self, sid, user_id):
+        with self._lock:
+            session = self._sessions.get(sid)
+            if (session is not None and session.user_id == user_id
+                    and session.user_version == self._user_versions.get(user_id, 0)
+                    and session.loaded_at + self.ttl_seconds >= time.monotonic()):
+                return session
+            self._sessions.pop(sid, None)
+            return None
+
+    def _load_session(self, sid, user_id):
+        from ..models import User
+
+        with self._lock:
+            user_version = self._user_versions.get(user_id, 0)
+        user = User.query.options(*User.role_options()).get(user_id)
+        if not user:
+            return None
+
+        session = ChatSession(
+            user_id,
+            user_version,
+            is_admin=bool(user.admin),
+            sender_name=user.full_name
+        )
+        with self._lock:
+            if user_version == self._user_versions.get(user_id, 0):
+                self._sessions[sid] = session
+        return session
+
+    def _get_role(self, session, event_id):
+        with self._lock:
+            cached = session.roles.get(event_id)
+            if cached is not None and cached[0] == self._event_versions.get(event_id, 0):
+                self.hits += 1
+                return cached[1]
+            self.misses += 1
+            return _NOT_LOADED
+
+    def _load_role(self, session, event_id):
+        from ..models import db, UserEventAssociation
+
+        with self._lock:
+            event_version = self._event_versions.get(event_id, 0)
+        association = db.session.query(UserEventAssociation.role).filter_by(
+            user_id=session.user_id,
+            event_id=event_id
+        ).first()
+        # No association is cached as None; a present association with no role as ''
+        role = None if association is None else (association.role or '')
+        with self._lock:
+            session.roles[event_id] = (event_version, role)
+        return role
+
+
+chat_sessions = ChatSessionCache()
\ No newline at end of file
@@ -0,0 +1,254 @@
+"""
+Batched event serialization
+Prefetches everything an event listing needs in a fixed number of queries,
+so listings scale with the page size instead of issuing per-event lookups.
+"""
+
+from functools import cached_property
+from sqlalchemy.orm import joinedload
+from .. import db
+from ..models.user import User
+from ..models.club import Club
+from ..models.event_tag import EventTag, EventTagMap
+from ..models.event_registration import EventRegistration
+from ..models.user_event_association import UserEventAssociation
+from ..models.event_budget import EventBudget
+from ..models.event_document import EventDocument
+from ..models.event_counters import EventCounters, COUNTER_SOURCES
+
+
+def _group_by_event(rows):
+    grouped = {}
+    for event_id, item in rows:
+        grouped.setdefault(event_id, []).append(item)
+    return grouped
+
+
+class EventBatch:
+    """
+    Lazily prefetched lookups for a list of events.
+    Each property costs one query the first time it is read and none after,
+    so routes only pay for the data their response shape actually uses.
+    """
+
+    def __init__(self, events):
+        self.events = [event for event in events if event is not None]
+        self.event_ids = [event.event_id for event in self.events]
+
+    @cached_property
+    def creators(self):
+        """{user_id: User} for the event creators, role profiles included"""
+        user_ids = {event.created_by for event in self.events if event.created_by}
+        if not user_ids:
+            return {}
+        users = User.query.options(*User.role_options()).filter(User.user_id.in_(user_ids)).all()
+        return {user.user_id: user for user in users}
+
+    @cached_property
+    def clubs(self):
+        """{club_id: Club}"""
+        club_ids = {event.club_id for event in self.events if event.club_id}
+        if not club_ids:
+            return {}
+        return {club.club_id: club for club in Club.query.filter(Club.club_id.in_(club_ids)).all()}
+
+    @cached_property
+    def tags(self):
+        """{event_id: [EventTag]}"""
+        if not self.event_ids:
+            return {}
+        rows = db.session.query(EventTagMap.event_id, EventTag).join(
+            EventTag, EventTag.tag_id == EventTagMap.tag_id
+        ).filter(EventTagMap.event_id.in_(self.event_ids)).all()
+        return _group_by_event(rows)
+
+    @cached_property
+    def associations(self):
+        """{event_id: [UserEventAssociation]} with users and role profiles loaded"""
+        if not self.event_ids:
+            return {}
+        associations = UserEventAssociation.query.options(
+            joinedload(UserEventAssociation.user).options(*User.role_options())
+        ).filter(UserEventAssociation.event_id.in_(self.event_ids)).all()
+        return _group_by_event((assoc.event_id, assoc) for assoc in associations)
+
+    @cached_property
+    def counters(self):
+        """{event_id: {counter: n}} from the maintained counters, tallied for events that have none yet"""
+        counters = {}
+        missing = []
+        for event in self.events:
+            if event.counters is not None:
+                counters[event.event_id] = {name: getattr(event.counters, name) for name in COUNTER_SOURCES}
+            else:
+                missing.append(event.event_id)
+        if missing:
+            tallied = EventCounters.tally(missing)
+            for event_id in missing:
+                counters[event_id] = tallied.get(event_id, dict.fromkeys(COUNTER_SOURCES, 0))
+        return counters
+
+    @cached_property
+    def registration_counts(self):
+        """{event_id: number of registrations}"""
+        return {event_id: counts['registration_count'] for event_id, counts in self.counters.items()}
+
+    @cached_property
+    def registrations(self):
+        """{event_id: [EventRegistration]} with users and role profiles loaded"""
+        if not self.event_ids:
+            return {}
+        registrations = EventRegistration.query.options(
+            joinedload(EventRegistration.user).options(*User.role_options())
+        ).filter(EventRegistration.event_id.in_(self.event_ids)).all()
+        return _group_by_event((reg.event_id, reg) for reg in registrations)
+
+    @cached_property
+    def budgets(self):
+        """{event_id: EventBudget}"""
+        if not self.event_ids:
+            return {}
+        budgets = EventBudget.query.filter(EventBudget.event_id.in_(self.event_ids)).all()
+        return {budget.event_id: budget for budget in budgets}
+
+    @cached_property
+    def documents(self):
+        """{event_id: [EventDocument]}"""
+        if not self.event_ids:
+            return {}
+        documents = EventDocument.query.filter(EventDocument.event_id.in_(self.event_ids)).all()
+        return _group_by_event((doc.event_id, doc) for doc in documents)
+
+    def creator_name(self, event):
+        creator = self.creators.get(event.created_by)
+        return creator.full_name if creator else None
+
+    def to_dict(self, event, include_associations=False):
+        """Serialize one event of the batch (same shape as routes.events.event_to_dict)"""
+        club = self.clubs.get(event.club_id)
+        associations = self.associations.get(event.event_id, [])
+
+        event_data = {
+            "event_id": event.event_id,
+            "title": event.title,
+            "description": event.description,
+            "venue": event.venue,
+            "category": event.category,
+            "visibility": event.visibility,
+            "image_url": event.image_url,
+            "date": event.date.isoformat() if event.date else None,
+            "time": event.time.isoformat() if event.time else None,
+            "end_date": event.end_date.isoformat() if event.end_date else None,
+            "event_date": event.event_date.isoformat() if event.event_date else None,
+            "duration_minutes": event.duration_minutes,
+            "registration_end_date": event.registration_end_date.isoformat() if event.registration_end_date else None,
+            "created_at": event.created_at.isoformat() if event.created_at else None,
+
+            # Status
+            "event_status": event.event_status,
+            "approval_status": event.approval_status,
+            "is_recurring": event.is_recurring,
+            "is_certified": event.is_certified,
+            "qr_check_in_enabled": event.qr_check_in_enabled,
+
+            # Target
+            "target_audience": event.target_audience,
+            "capacity": event.capacity,
+
+            # Budget - Convert to float instead of string for frontend compatibility
+            "estimated_budget": float(event.estimated_budget) if event.estimated_budget else 0,
+            "actual_spent": float(event.actual_spent) if event.actual_spent else 0,
+
+            # Creator
+            "created_by": event.created_by,
+            "created_by_name": self.creator_name(event),
+
+            # Meta
+            "registration_count": self.registration_counts.get(event.event_id, 0),
+
+            # Club reference
+            "club_id": event.club_id,
+            "club_ref": {
+                "club_id": club.club_id,
+                "name": club.name,
+                "description": club.description,
+                "leader_id": club.leader_id
+            } if club else None,
+        }
+
+        # Event tags
+        event_data["event_tags"] = [
+            {
+                "tag_id": tag.tag_id,
+                "tag_name": tag.tag_name
+            } for tag in self.tags.get(event.event_id, [])
+        ]
+
+        # User associations (organizers, volunteers, attendees)
+        event_data["user_associations"] = [
+            {
+                "user_id": ua.user_id,
+                "role": ua.role,
+                "user": {
+                    "user_id": ua.user.user_id,
+                    "full_name": ua.user.full_name,
+                    "email": ua.user.email
+                }
+            } for ua in associations if ua.user
+        ]
+
+        # Add user_role for the current user (this would be set separately)
+        if hasattr(event, 'user_role'):
+            event_data["user_role"] = event.user_role
+
+        if include_associations:
+            # Organizers/Admins
+            event_data["organizers"] = [
+                {
+                    "user_id": assoc.user_id,
+                    "role": assoc.role,
+                    "user_name": assoc.user.full_name if assoc.user else None
+                }
+                for assoc in associations
+            ]
+
+            # Registered attendees
+            event_data["attendees"] = [
+                {
+                    "user_id": reg.user_id,
+                    "user_name": reg.user.full_name if reg.user else None,
+                    "status": reg.status
+                }
+                for reg in self.registrations.get(event.event_id, [])
+            ]
+
+            # Budget details
+            budget = self.budgets.get(event.event_id)
+            if budget:
+                event_data["budget"] = {
+                    "budget_id": budget.budget_id,
+                    "allocated_amount": float(budget.allocated_amount) if budget.allocated_amount else 0,
+                    "total_spent": float(budget.total_spent) if budget.total_spent else 0,
+                    "remaining_budget": float(budget.remaining_budget) if budget.remaining_budget else 0
+                }
+
+            # Documents
+            event_data["documents"] = [
+                {
+                    "document_id": doc.document_id,
+                    "file_name": doc.file_name,
+                    "file_path": doc.file_url,
+                    "uploaded_by": doc.uploaded_by,
+                    "uploaded_at": doc.uploaded_at.isoformat() if doc.uploaded_at else None
+                } for doc in self.documents.get(event.event_id, [])
+            ]
+
+        return event_data
+
+    def serialize(self, include_associations=False):
+        return [self.to_dict(event, include_associations) for event in self.events]
+
+
+def serialize_events(events, include_associations=False):
+    """Serialize a list of events with a fixed number of prefetch queries"""
+    return EventBatch(events).serialize(include_associations)
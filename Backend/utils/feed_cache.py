@@ -0,0 +1,203 @@
+"""
+Social feed cache
+Two layers: shared, user-agnostic feed pages (approved events and pinned admin
+postings) and a small per-user overlay with the user's role and registration
+status per event. Both are invalidated by generation counters, so an
+invalidation is a single increment and stale entries simply age out.
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+
+
+class MemoryCacheBackend:
+    """In-process TTL + LRU backend (default)"""
+
+    name = 'memory'
+
+    def __init__(self, max_size=1000):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._counters = {}  # generation counters: never expire or get evicted
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key in self._counters:
+                return self._counters[key]
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            expires_at = time.monotonic() + ttl if ttl else None
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def incr(self, key):
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def size(self):
+        return len(self._entries)
+
+
+class RedisCacheBackend:
+    """
+    Backend for a Redis-compatible client: anything with get, set(ex=),
+    delete and incr works, including a local stand-in. Values are stored as JSON.
+    """
+
+    name = 'redis'
+
+    def __init__(self, client, prefix='feed:'):
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key):
+        raw = self.client.get(self.prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key, value, ttl=None):
+        self.client.set(self.prefix + key, json.dumps(value), ex=ttl)
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+    def incr(self, key):
+        return self.client.incr(self.prefix + key)
+
+    def size(self):
+        return None
+
+
+class FeedCache:
+    """
+    Feed page + per-user overlay cache with hit/miss counters.
+    Backend errors are counted and treated as misses so the feed keeps working.
+    """
+
+    def __init__(self, backend=None, shared_ttl_seconds=30, overlay_ttl_seconds=300):
+        self.backend = backend or MemoryCacheBackend()
+        self.shared_ttl_seconds = shared_ttl_seconds
+        self.overlay_ttl_seconds = overlay_ttl_seconds
+        self._lock = threading.Lock()
+        self._reset_counters()
+
+    def init_app(self, app):
+        """Pick the backend and TTLs from the app config"""
+        self.shared_ttl_seconds = app.config.get('FEED_CACHE_SHARED_TTL_SECONDS', self.shared_ttl_seconds)
+        self.overlay_ttl_seconds = app.config.get('FEED_CACHE_OVERLAY_TTL_SECONDS', self.overlay_ttl_seconds)
+
+        if app.config.get('FEED_CACHE_BACKEND', 'memory') == 'redis':
+            try:
+                import redis
+                self.set_backend(RedisCacheBackend(redis.Redis.from_url(app.config['FEED_CACHE_REDIS_URL'])))
+                return
+            except Exception as e:
+                print(f"Warning: Could not use Redis feed cache, falling back to memory: {str(e)}")
+        self.set_backend(MemoryCacheBackend(max_size=app.config.get('FEED_CACHE_MAX_SIZE', 1000)))
+
+    def set_backend(self, backend):
+        self.backend = backend
+        self._reset_counters()
+
+    # Shared pages
+    def shared_generation(self):
+        return self._call('get', 'shared:gen') or 0
+
+    def get_shared(self, generation, cursor, limit):
+        return self._count('shared', self._call('get', self._shared_key(generation, cursor, limit)))
+
+    def set_shared(self, generation, cursor, limit, page):
+        self._call('set', self._shared_key(generation, cursor, limit), page, self.shared_ttl_seconds)
+
+    def invalidate_shared(self):
+        """An approved event or admin posting was added, changed or removed"""
+        self._call('incr', 'shared:gen')
+        with self._lock:
+            self.invalidations += 1
+
+    # Per-user overlays
+    def overlay_generation(self, user_id):
+        return self._call('get', f'overlay:gen:{user_id}') or 0
+
+    def get_overlay(self, user_id, generation):
+        return self._count('overlay', self._call('get', f'overlay:{user_id}:{generation}'))
+
+    def set_overlay(self, user_id, generation, overlay):
+        self._call('set', f'overlay:{user_id}:{generation}', overlay, self.overlay_ttl_seconds)
+
+    def invalidate_user(self, *user_ids):
+        """The users' event roles or registrations changed"""
+        for user_id in user_ids:
+            self._call('incr', f'overlay:gen:{user_id}')
+            with self._lock:
+                self.invalidations += 1
+
+    def stats(self):
+        """Return hit/miss counters per layer for sizing"""
+        with self._lock:
+            stats = {
+                'backend': self.backend.name,
+                'size': self.backend.size(),
+                'shared_ttl_seconds': self.shared_ttl_seconds,
+                'overlay_ttl_seconds': self.overlay_ttl_seconds,
+                'invalidations': self.invalidations,
+                'errors': self.errors
+            }
+            for layer in ('shared', 'overlay'):
+                hits, misses = self.hits[layer], self.misses[layer]
+                lookups = hits + misses
+                stats[layer] = {
+                    'hits': hits,
+                    'misses': misses,
+                    'hit_rate': round(hits / lookups, 4) if lookups else 0.0
+                }
+            return stats
+
+    def _shared_key(self, generation, cursor, limit):
+        return f'shared:{generation}:{limit or "all"}:{cursor or ""}'
+
+    def _count(self, layer, value):
+        with self._lock:
+            if value is None:
+                self.misses[layer] += 1
+            else:
+                self.hits[layer] += 1
+        return value
+
+    def _call(self, method, *args):
+        try:
+            return getattr(self.backend, method)(*args)
+        except Exception as e:
+            with self._lock:
+                self.errors += 1
+            print(f"Feed cache {method} failed: {str(e)}")
+            return None
+
+    def _reset_counters(self):
+        with self._lock:
+            self.hits = {'shared': 0, 'overlay': 0}
+            self.misses = {'shared': 0, 'overlay': 0}
+            self.invalidations = 0
+            self.errors = 0
+
+
+feed_cache = FeedCache()
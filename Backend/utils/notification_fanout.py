@@ -0,0 +1,212 @@
+"""
+Bulk notification fan-out
+Audience-wide announcements (all users, club members, admins) are stored as a
+single BroadcastNotification row and only pushed per recipient. Notifications
+for ad-hoc recipient sets are written with one multi-row INSERT per chunk (one
+short transaction each) and pushed per chunk after it commits.
+"""
+
+from datetime import datetime
+from sqlalchemy import insert, select
+from ..models.notification import Notification, NotificationType
+from ..models.notification_counter import NotificationCounter
+from ..models.broadcast_notification import (
+    BroadcastNotification, BROADCAST_ALL_USERS, BROADCAST_CLUB_MEMBERS, BROADCAST_ADMINS
+)
+from .unread_cache import unread_counts
+from .. import db
+
+FANOUT_CHUNK_SIZE = 1000
+
+
+def normalize_notification_type(notification_type):
+    """Accept NotificationType members or their string values"""
+    if isinstance(notification_type, NotificationType):
+        return notification_type
+    return NotificationType(notification_type)
+
+
+def notification_payload(notification_id, message, notification_type, created_at, is_read=False,
+                         related_club_id=None, related_event_id=None, related_user_id=None):
+    """Socket payload for new_notification"""
+    return {
+        'id': notification_id,
+        'message': message,
+        'type': notification_type.value,
+        'read': is_read,
+        'time': 'Just now',
+        'created_at': created_at.isoformat(),
+        'related_club_id': related_club_id,
+        'related_event_id': related_event_id,
+        'related_user_id': related_user_id
+    }
+
+
+def all_active_users(exclude_user_id=None):
+    from ..models.user import User
+    query = select(User.user_id).where(User.is_active == True)
+    if exclude_user_id is not None:
+        query = query.where(User.user_id != exclude_user_id)
+    return query
+
+
+def approved_club_members(club_id, exclude_user_id=None):
+    from ..models.association_tables import user_club_association, ClubMembershipStatus
+    query = select(user_club_association.c.user_id).where(
+        user_club_association.c.club_id == club_id,
+        user_club_association.c.status == ClubMembershipStatus.APPROVED.value
+    )
+    if exclude_user_id is not None:
+        query = query.where(user_club_association.c.user_id != exclude_user_id)
+    return query
+
+
+def event_registrants(event_id):
+    from ..models.event_registration import EventRegistration
+    return select(EventRegistration.user_id).where(EventRegistration.event_id == event_id)
+
+
+def all_admins(exclude_user_id=None):
+    from ..models.admin import Admin
+    query = select(Admin.user_id)
+    if exclude_user_id is not None:
+        query = query.where(Admin.user_id != exclude_user_id)
+    return query
+
+
+def broadcast_recipients(audience, audience_club_id=None, exclude_user_id=None):
+    """Select of the user_ids a broadcast is pushed to"""
+    if audience == BROADCAST_ALL_USERS:
+        return all_active_users(exclude_user_id)
+    if audience == BROADCAST_CLUB_MEMBERS:
+        return approved_club_members(audience_club_id, exclude_user_id)
+    if audience == BROADCAST_ADMINS:
+        return all_admins(exclude_user_id)
+    raise ValueError(f"Unknown broadcast audience '{audience}'")
+
+
+def broadcast_notification(audience, message, notification_type=NotificationType.GENERAL,
+                           audience_club_id=None, exclude_user_id=None,
+                           related_club_id=None, related_event_id=None, related_user_id=None,
+                           chunk_size=FANOUT_CHUNK_SIZE, push=True):
+    """
+    Store one broadcast for `audience` and push it to every recipient.
+    Recipients see it under id -broadcast_id so it never collides with a
+    direct notification id. Returns {'broadcast_id', 'recipients', 'pushed'}.
+    """
+    notification_type = normalize_notification_type(notification_type)
+    broadcast = BroadcastNotification(
+        audience=audience,
+        audience_club_id=audience_club_id,
+        exclude_user_id=exclude_user_id,
+        message=message,
+        notification_type=notification_type,
+        related_club_id=related_club_id,
+        related_event_id=related_event_id,
+        related_user_id=related_user_id,
+        created_at=datetime.utcnow()
+    )
+    db.session.add(broadcast)
+    db.session.commit()
+    unread_counts.invalidate_all()
+
+    stats = {'broadcast_id': broadcast.broadcast_id, 'recipients': 0, 'pushed': 0}
+    if not push:
+        return stats
+
+    # The broadcast is already stored; a failed push must not make callers retry it
+    try:
+        user_ids = list(dict.fromkeys(db.session.execute(
+            broadcast_recipients(audience, audience_club_id, exclude_user_id)
+        ).scalars()))
+    except Exception as e:
+        db.session.rollback()
+        print(f"Failed to resolve recipients of broadcast {broadcast.broadcast_id}: {str(e)}")
+        return stats
+    stats['recipients'] = len(user_ids)
+
+    payload = notification_payload(
+        -broadcast.broadcast_id, message, notification_type, broadcast.created_at,
+        related_club_id=related_club_id,
+        related_event_id=related_event_id,
+        related_user_id=related_user_id
+    )
+    for start in range(0, len(user_ids), chunk_size):
+        stats['pushed'] += push_notifications([(user_id, payload) for user_id in user_ids[start:start + chunk_size]])
+    return stats
+
+
+def fan_out_notifications(recipients, message, notification_type=NotificationType.GENERAL,
+                          related_club_id=None, related_event_id=None, related_user_id=None,
+                          chunk_size=FANOUT_CHUNK_SIZE, push=True):
+    """
+    Notify every user_id selected by `recipients` (a select of one user_id column).
+
+    Returns {'recipients', 'created', 'pushed', 'failed_chunks'}. A failing
+    chunk is rolled back and counted; the remaining chunks still go out.
+    """
+    notification_type = normalize_notification_type(notification_type)
+    created_at = datetime.utcnow()
+    stats = {'recipients': 0, 'created': 0, 'pushed': 0, 'failed_chunks': 0}
+
+    user_ids = list(dict.fromkeys(db.session.execute(recipients).scalars()))
+    stats['recipients'] = len(user_ids)
+
+    for start in range(0, len(user_ids), chunk_size):
+        rows = [
+            {
+                'user_id': user_id,
+                'message': message,
+                'notification_type': notification_type,
+                'related_club_id': related_club_id,
+                'related_event_id': related_event_id,
+                'related_user_id': related_user_id,
+                'is_read': False,
+                'created_at': created_at
+            }
+            for user_id in user_ids[start:start + chunk_size]
+        ]
+
+        try:
+            inserted = db.session.execute(
+                insert(Notification).returning(Notification.notification_id, Notification.user_id),
+                rows
+            ).all()
+            NotificationCounter.bump([user_id for _, user_id in inserted], 1)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            stats['failed_chunks'] += 1
+            print(f"Failed to write notification chunk of {len(rows)}: {str(e)}")
+            continue
+
+        stats['created'] += len(inserted)
+        unread_counts.adjust([user_id for _, user_id in inserted], 1)
+        if push:
+            stats['pushed'] += push_notifications([
+                (user_id, notification_payload(
+                    notification_id, message, notification_type, created_at,
+                    related_club_id=related_club_id,
+                    related_event_id=related_event_id,
+                    related_user_id=related_user_id
+                ))
+                for notification_id, user_id in inserted
+            ])
+
+    return stats
+
+
+def push_notifications(payloads):
+    """Emit (user_id, payload) pairs to the users' rooms; returns how many were sent"""
+    from .. import socketio
+
+    pushed = 0
+    for user_id, payload in payloads:
+        try:
+            socketio.emit('new_notification', payload, room=f'user_{user_id}')
+            pushed += 1
+        except Exception as e:
+            print(f"Failed to push notification to user {user_id}: {str(e)}")
+    # Let other greenlets/threads run between chunks
+    socketio.sleep(0)
+    return pushed
@@ -1,5 +1,12 @@
 from ..models.notification import Notification, NotificationType
+from ..models.notification_counter import NotificationCounter
+from .unread_cache import unread_counts
 from .. import db
+from ..models.broadcast_notification import BROADCAST_ALL_USERS, BROADCAST_CLUB_MEMBERS, BROADCAST_ADMINS
+from .notification_fanout import (
+    fan_out_notifications, broadcast_notification, notification_payload,
+    normalize_notification_type, event_registrants
+)
 from datetime import datetime
 
 def create_notification(user_id, message, notification_type=NotificationType.GENERAL, 
@@ -22,7 +29,7 @@ def create_notification(user_id, message, notification_type=NotificationType.GEN
         notification = Notification(
             user_id=user_id,
             message=message,
-            notification_type=notification_type,
+            notification_type=normalize_notification_type(notification_type),
             related_club_id=related_club_id,
             related_event_id=related_event_id,
             related_user_id=related_user_id,
@@ -30,7 +37,10 @@ def create_notification(user_id, message, notification_type=NotificationType.GEN
         )
         
         db.session.add(notification)
+        db.session.flush()
+        NotificationCounter.bump(user_id, 1)
         db.session.commit()
+        unread_counts.adjust([user_id], 1)
         
         return notification
     except Exception as e:
@@ -81,38 +91,20 @@ def create_event_notification(event, user_id, message_type="created"):
 
 def create_event_notification_for_club_members(event, club):
     """Create notifications for all club members about a new event"""
-    from ..models.association_tables import user_club_association, ClubMembershipStatus
-    from ..models.user import User
-    
     try:
-        # Get all approved members of the club
-        approved_members = db.session.query(User).join(
-            user_club_association,
-            User.user_id == user_club_association.c.user_id
-        ).filter(
-            user_club_association.c.club_id == club.club_id,
-            user_club_association.c.status == ClubMembershipStatus.APPROVED.value
-        ).all()
-        
-        # Create notifications for all members except the event creator
-        notifications_created = 0
-        for member in approved_members:
-            if member.user_id != event.created_by:  # Don't notify the creator
-                try:
-                    create_notification(
-                        user_id=member.user_id,
-                        message=f"New event '{event.title}' has been created in {club.name}! 📅",
-                        notification_type=NotificationType.EVENT_CREATED.value,
-                        related_event_id=event.event_id,
-                        related_club_id=club.club_id
-                    )
-                    notifications_created += 1
-                except Exception as e:
-                    print(f"Failed to create notification for user {member.user_id}: {str(e)}")
-                    continue
+        # One broadcast to the approved members except the event creator
+        stats = broadcast_notification(
+            BROADCAST_CLUB_MEMBERS,
+            message=f"New event '{event.title}' has been created in {club.name}! 📅",
+            notification_type=NotificationType.EVENT_CREATED,
+            audience_club_id=club.club_id,
+            exclude_user_id=event.created_by,
+            related_event_id=event.event_id,
+            related_club_id=club.club_id
+        )
         
-        print(f"Created {notifications_created} notifications for event '{event.title}'")
-        return notifications_created
+        print(f"Broadcast event '{event.title}' to {stats['recipients']} club members")
+        return stats['recipients']
         
     except Exception as e:
         print(f"Error creating event notifications: {str(e)}")
@@ -120,36 +112,24 @@ def create_event_notification_for_club_members(event, club):
 
 def create_event_notification_for_all_users(event, club=None):
     """Create notifications for all users about a new public event"""
-    from ..models.user import User
-    
     try:
-        # Get all active users
-        all_users = User.query.filter_by(is_active=True).all()
-        
-        # Create notifications for all users except the event creator
-        notifications_created = 0
-        for user in all_users:
-            if user.user_id != event.created_by:  # Don't notify the creator
-                try:
-                    if club:
-                        message = f"🎉 New event '{event.title}' by {club.name} is now available!"
-                    else:
-                        message = f"🎉 New event '{event.title}' is now available!"
-                    
-                    create_notification(
-                        user_id=user.user_id,
-                        message=message,
-                        notification_type=NotificationType.EVENT_CREATED.value,
-                        related_event_id=event.event_id,
-                        related_club_id=club.club_id if club else None
-                    )
-                    notifications_created += 1
-                except Exception as e:
-                    print(f"Failed to create notification for user {user.user_id}: {str(e)}")
-                    continue
+        if club:
+            message = f"🎉 New event '{event.title}' by {club.name} is now available!"
+        else:
+            message = f"🎉 New event '{event.title}' is now available!"
+        
+        # One broadcast to all users except the event creator
+        stats = broadcast_notification(
+            BROADCAST_ALL_USERS,
+            message=message,
+            notification_type=NotificationType.EVENT_CREATED,
+            exclude_user_id=event.created_by,
+            related_event_id=event.event_id,
+            related_club_id=club.club_id if club else None
+        )
         
-        print(f"Created {notifications_created} public notifications for event '{event.title}'")
-        return notifications_created
+        print(f"Broadcast public event '{event.title}' to {stats['recipients']} users")
+        return stats['recipients']
         
     except Exception as e:
         print(f"Error creating public event notifications: {str(e)}")
@@ -157,29 +137,16 @@ def create_event_notification_for_all_users(event, club=None):
 
 def create_event_reminder_notifications(event):
     """Create reminder notifications for event participants"""
-    from ..models.event_registration import EventRegistration
-    from ..models.user import User
-    
     try:
-        # Get all registered users for the event
-        registrations = EventRegistration.query.filter_by(event_id=event.event_id).all()
-        
-        notifications_created = 0
-        for registration in registrations:
-            try:
-                create_notification(
-                    user_id=registration.user_id,
-                    message=f"⏰ Reminder: '{event.title}' is starting soon! Don't forget to attend.",
-                    notification_type=NotificationType.EVENT_REMINDER,
-                    related_event_id=event.event_id
-                )
-                notifications_created += 1
-            except Exception as e:
-                print(f"Failed to create reminder for user {registration.user_id}: {str(e)}")
-                continue
+        stats = fan_out_notifications(
+            event_registrants(event.event_id),
+            message=f"⏰ Reminder: '{event.title}' is starting soon! Don't forget to attend.",
+            notification_type=NotificationType.EVENT_REMINDER,
+            related_event_id=event.event_id
+        )
         
-        print(f"Created {notifications_created} reminder notifications for event '{event.title}'")
-        return notifications_created
+        print(f"Created {stats['created']} reminder notifications for event '{event.title}'")
+        return stats['created']
         
     except Exception as e:
         print(f"Error creating event reminders: {str(e)}")
@@ -187,31 +154,18 @@ def create_event_reminder_notifications(event):
 
 def create_admin_notification(message, notification_type=NotificationType.SYSTEM_ALERT, related_event_id=None, related_club_id=None, related_user_id=None):
     """Create notifications for all admins"""
-    from ..models.user import User
-    from ..models.admin import Admin
-    
     try:
-        # Get all admin users
-        admin_users = db.session.query(User).join(Admin, User.user_id == Admin.user_id).all()
-        
-        notifications_created = 0
-        for admin_user in admin_users:
-            try:
-                create_notification(
-                    user_id=admin_user.user_id,
-                    message=message,
-                    notification_type=notification_type,
-                    related_event_id=related_event_id,
-                    related_club_id=related_club_id,
-                    related_user_id=related_user_id
-                )
-                notifications_created += 1
-            except Exception as e:
-                print(f"Failed to create admin notification for user {admin_user.user_id}: {str(e)}")
-                continue
+        stats = broadcast_notification(
+            BROADCAST_ADMINS,
+            message=message,
+            notification_type=notification_type,
+            related_event_id=related_event_id,
+            related_club_id=related_club_id,
+            related_user_id=related_user_id
+        )
         
-        print(f"Created {notifications_created} admin notifications")
-        return notifications_created
+        print(f"Broadcast admin notification to {stats['recipients']} admins")
+        return stats['recipients']
         
     except Exception as e:
         print(f"Error creating admin notifications: {str(e)}")
@@ -241,17 +195,16 @@ def create_and_broadcast_notification(user_id, message, notification_type=Notifi
         )
         
         # Prepare notification data for real-time broadcast
-        notification_data = {
-            'id': notification.notification_id,
-            'message': notification.message,
-            'type': notification.notification_type.value,
-            'read': notification.is_read,
-            'time': 'Just now',
-            'created_at': notification.created_at.isoformat(),
-            'related_club_id': notification.related_club_id,
-            'related_event_id': notification.related_event_id,
-            'related_user_id': notification.related_user_id
-        }
+        notification_data = notification_payload(
+            notification.notification_id,
+            notification.message,
+            notification.notification_type,
+            notification.created_at,
+            is_read=notification.is_read,
+            related_club_id=notification.related_club_id,
+            related_event_id=notification.related_event_id,
+            related_user_id=notification.related_user_id
+        )
         
         # Broadcast in real-time
         broadcast_notification_realtime(user_id, notification_data)
@@ -0,0 +1,304 @@
+"""
+Socket presence store
+Maps socket sids to authenticated users (and whether the session is an admin
+session) and who is typing in which room, each typist with their own expiry
+(see typing_presence). The memory backend is enough for a single server
+process; with several processes behind a Socket.IO message queue the Redis
+backend makes every process see the same sessions and typists. Shared
+entries expire PRESENCE_TTL_SECONDS after their process's last heartbeat.
+"""
+
+import os
+import socket
+import threading
+import time
+import uuid
+
+
+class MemoryPresenceStore:
+    """In-process backend (default)"""
+
+    name = 'memory'
+
+    def __init__(self):
+        self._sessions = {}  # sid -> (user_id, is_admin)
+        self._user_sids = {}  # user_id -> {sid}
+        self._typing = {}  # room -> {user_id: expires_at}
+        self._lock = threading.Lock()
+
+    def add_session(self, sid, user_id, is_admin=False):
+        with self._lock:
+            self._sessions[sid] = (user_id, is_admin)
+            self._user_sids.setdefault(user_id, set()).add(sid)
+
+    def remove_session(self, sid):
+        with self._lock:
+            session = self._sessions.pop(sid, None)
+            if session is not None:
+                sids = self._user_sids.get(session[0], set())
+                sids.discard(sid)
+                if not sids:
+                    self._user_sids.pop(session[0], None)
+            return session
+
+    def get_session(self, sid):
+        with self._lock:
+            return self._sessions.get(sid)
+
+    def user_sids(self, user_id):
+        with self._lock:
+            return set(self._user_sids.get(user_id, ()))
+
+    def session_count(self):
+        with self._lock:
+            return len(self._sessions)
+
+    def online_count(self):
+        with self._lock:
+            return len(self._user_sids)
+
+    def touch_typing(self, room, user_id, expires_at):
+        with self._lock:
+            self._typing.setdefault(room, {})[user_id] = expires_at
+
+    def clear_typing(self, room, user_id):
+        with self._lock:
+            typing = self._typing.get(room, {})
+            typing.pop(user_id, None)
+            if not typing:
+                self._typing.pop(room, None)
+
+    def typing_users(self, room, now):
+        with self._lock:
+            typing = self._typing.get(room, {})
+            for user_id in [user_id for user_id, expires_at in typing.items() if expires_at < now]:
+                del typing[user_id]
+            if not typing:
+                self._typing.pop(room, None)
+            return set(typing)
+
+
+class RedisPresenceStore:
+    """
+    Backend shared by all server processes (one Redis instance). Each process
+    keeps its sids in its own hash; a user is online while any of their sids
+    has an unexpired score in presence:user:<id>. heartbeat() pushes every
+    expiry ttl_seconds ahead, so the sessions of a crashed or redeployed
+    process stop counting on their own. Adding, removing and refreshing
+    sessions are Lua scripts, so a disconnect on one process cannot mark
+    offline a user who connected on another in between.
+    """
+
+    name = 'redis'
+
+    # KEYS: process sessions, user sids, online users, processes
+    # ARGV: sid, user_id:is_admin, expires_at, user_id, ttl, process_id
+    ADD_SESSION = """
+        redis.call('HSET', KEYS[1], ARGV[1], ARGV[2])
+        redis.call('EXPIRE', KEYS[1], ARGV[5])
+        redis.call('ZADD', KEYS[2], ARGV[3], ARGV[1])
+        redis.call('EXPIRE', KEYS[2], ARGV[5])
+        redis.call('ZADD', KEYS[3], 'GT', ARGV[3], ARGV[4])
+        redis.call('ZADD', KEYS[4], 'GT', ARGV[3], ARGV[6])
+        return 1
+    """
+
+    # KEYS: process sessions, user sids, online users
+    # ARGV: sid, user_id, now
+    REMOVE_SESSION = """
+        if redis.call('HDEL', KEYS[1], ARGV[1]) == 0 then
+            return 0
+        end
+        redis.call('ZREM', KEYS[2], ARGV[1])
+        redis.call('ZREMRANGEBYSCORE', KEYS[2], '-inf', ARGV[3])
+        if redis.call('ZCARD', KEYS[2]) == 0 then
+            redis.call('ZREM', KEYS[3], ARGV[2])
+        end
+        return 1
+    """
+
+    # KEYS: process sessions, online users, processes
+    # ARGV: expires_at, ttl, process_id, user key prefix
+    HEARTBEAT = """
+        local sessions = redis.call('HGETALL', KEYS[1])
+        for i = 1, #sessions, 2 do
+            local user_id = string.match(sessions[i + 1], '^(%d+):')
+            local user_key = ARGV[4] .. user_id
+            redis.call('ZADD', user_key, ARGV[1], sessions[i])
+            redis.call('EXPIRE', user_key, ARGV[2])
+            redis.call('ZADD', KEYS[2], 'GT', ARGV[1], user_id)
+        end
+        redis.call('EXPIRE', KEYS[1], ARGV[2])
+        redis.call('ZADD', KEYS[3], ARGV[1], ARGV[3])
+        return #sessions / 2
+    """
+
+    def __init__(self, client, prefix='presence:', ttl_seconds=60, process_id=None):
+        self.client = client
+        self.prefix = prefix
+        self.ttl_seconds = ttl_seconds
+        self.process_id = process_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._add = client.register_script(self.ADD_SESSION)
+        self._remove = client.register_script(self.REMOVE_SESSION)
+        self._heartbeat = client.register_script(self.HEARTBEAT)
+
+    def add_session(self, sid, user_id, is_admin=False):
+        self._add(
+            keys=[self._sessions_key(), self._user_key(user_id), self.prefix + 'online', self.prefix + 'processes'],
+            args=[sid, f"{user_id}:{int(bool(is_admin))}", time.time() + self.ttl_seconds, user_id,
+                  self.ttl_seconds, self.process_id]
+        )
+
+    def remove_session(self, sid):
+        # Only this process adds or removes its own sids, so this read cannot go stale
+        session = self.get_session(sid)
+        if session is None:
+            return None
+        self._remove(
+            keys=[self._sessions_key(), self._user_key(session[0]), self.prefix + 'online'],
+            args=[sid, session[0], time.time()]
+        )
+        return session
+
+    def get_session(self, sid):
+        """Sessions of this process only: a sid's events are handled where it is connected"""
+        raw = self.client.hget(self._sessions_key(), sid)
+        if raw is None:
+            return None
+        if isinstance(raw, bytes):
+            raw = raw.decode('utf-8')
+        user_id, is_admin = raw.rsplit(':', 1)
+        return int(user_id), is_admin == '1'
+
+    def user_sids(self, user_id):
+        return {
+            sid.decode('utf-8') if isinstance(sid, bytes) else sid
+            for sid in self.client.zrangebyscore(self._user_key(user_id), time.time(), '+inf')
+        }
+
+    def session_count(self):
+        processes = self.live_processes()
+        if not processes:
+            return 0
+        pipeline = self.client.pipeline(transaction=False)
+        for process_id in processes:
+            pipeline.hlen(self._sessions_key(process_id))
+        return sum(pipeline.execute())
+
+    def online_count(self):
+        self.client.zremrangebyscore(self.prefix + 'online', '-inf', time.time())
+        return self.client.zcard(self.prefix + 'online')
+
+    def live_processes(self):
+        """Processes whose last heartbeat has not expired"""
+        self.client.zremrangebyscore(self.prefix + 'processes', '-inf', time.time())
+        return [
+            process_id.decode('utf-8') if isinstance(process_id, bytes) else process_id
+            for process_id in self.client.zrange(self.prefix + 'processes', 0, -1)
+        ]
+
+    def heartbeat(self):
+        """Push this process's expiries ttl_seconds ahead; returns its session count"""
+        return self._heartbeat(
+            keys=[self._sessions_key(), self.prefix + 'online', self.prefix + 'processes'],
+            args=[time.time() + self.ttl_seconds, self.ttl_seconds, self.process_id, self.prefix + 'user:']
+        )
+
+    def touch_typing(self, room, user_id, expires_at):
+        # Scored by expiry time; the key itself goes once its last typist would have
+        key = self.prefix + f'typing:{room}'
+        self.client.zadd(key, {user_id: expires_at})
+        self.client.expire(key, max(int(expires_at - time.time()) + 1, 1))
+
+    def clear_typing(self, room, user_id):
+        self.client.zrem(self.prefix + f'typing:{room}', user_id)
+
+    def typing_users(self, room, now):
+        key = self.prefix + f'typing:{room}'
+        self.client.zremrangebyscore(key, '-inf', now)
+        return {int(member) for member in self.client.zrange(key, 0, -1)}
+
+    def _sessions_key(self, process_id=None):
+        return self.prefix + f'sessions:{process_id or self.process_id}'
+
+    def _user_key(self, user_id):
+        return self.prefix + f'user:{user_id}'
+
+
+class PresenceStore:
+    """Facade the socket handlers use; the backend is picked by init_app"""
+
+    def __init__(self, backend=None):
+        self.backend = backend or MemoryPresenceStore()
+        self._heartbeat_thread = None
+
+    def init_app(self, app):
+        if app.config.get('PRESENCE_BACKEND', 'memory') == 'redis':
+            try:
+                import redis
+                self.set_backend(RedisPresenceStore(
+                    redis.Redis.from_url(app.config['PRESENCE_REDIS_URL']),
+                    ttl_seconds=app.config.get('PRESENCE_TTL_SECONDS', 60)
+                ))
+                self.start_heartbeat()
+                return
+            except Exception as e:
+                print(f"Warning: Could not use Redis presence store, falling back to memory: {str(e)}")
+        self.set_backend(MemoryPresenceStore())
+
+    def start_heartbeat(self):
+        """Refresh the shared backend's expiries three times per TTL from a daemon thread"""
+        if self._heartbeat_thread is not None:
+            return
+        self._heartbeat_thread = threading.Thread(target=self._run_heartbeat, daemon=True, name='presence-heartbeat')
+        self._heartbeat_thread.start()
+
+    def _run_heartbeat(self):
+        while True:
+            try:
+                self.backend.heartbeat()
+            except Exception as e:
+                print(f"Error in presence heartbeat: {str(e)}")
+            time.sleep(self.backend.ttl_seconds / 3)
+
+    def set_backend(self, backend):
+        self.backend = backend
+
+    def add_session(self, sid, user_id, is_admin=False):
+        self.backend.add_session(sid, user_id, is_admin)
+
+    def remove_session(self, sid):
+        """Forget sid; returns (user_id, is_admin) or None"""
+        return self.backend.remove_session(sid)
+
+    def user_id(self, sid):
+        session = self.backend.get_session(sid)
+        return session[0] if session else None
+
+    def is_admin(self, sid):
+        session = self.backend.get_session(sid)
+        return bool(session and session[1])
+
+    def is_online(self, user_id):
+        return bool(self.backend.user_sids(user_id))
+
+    def touch_typing(self, room, user_id, expires_at):
+        """user_id is typing in room until expires_at (epoch seconds)"""
+        self.backend.touch_typing(room, user_id, expires_at)
+
+    def clear_typing(self, room, user_id):
+        self.backend.clear_typing(room, user_id)
+
+    def typing_users(self, room, now):
+        """user_ids typing in room at now; expired typists are dropped"""
+        return self.backend.typing_users(room, now)
+
+    def stats(self):
+        return {
+            'backend': self.backend.name,
+            'sessions': self.backend.session_count(),
+            'online_users': self.backend.online_count()
+        }
+
+
+presence = PresenceStore()
\ No newline at end of file
@@ -0,0 +1,120 @@
+"""
+In-process cache of resolved auth tokens
+Shared by the REST auth decorators and the Socket.IO authentication handlers
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+
+class TokenCache:
+    """
+    Bounded TTL + LRU cache mapping a token string to its resolved identity.
+
+    Each entry is a dict holding user_id, expires_at (token expiry, naive UTC)
+    and the role flags (role, is_admin, is_active) so that auth checks do not
+    have to touch the auth_tokens table or probe the role relationships.
+    """
+
+    def __init__(self, max_size=10000, ttl_seconds=60):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._tokens_by_user = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def init_app(self, app):
+        """Read cache sizing from the app config"""
+        self.max_size = app.config.get('TOKEN_CACHE_MAX_SIZE', self.max_size)
+        self.ttl_seconds = app.config.get('TOKEN_CACHE_TTL_SECONDS', self.ttl_seconds)
+
+    def get(self, token):
+        """Return the cached entry for a token, or None on miss/expiry"""
+        with self._lock:
+            item = self._entries.get(token)
+            if item is None:
+                self.misses += 1
+                return None
+
+            cached_until, entry = item
+            if cached_until < time.monotonic() or entry['expires_at'] < datetime.utcnow():
+                self._remove(token)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return entry
+
+    def set(self, token, entry):
+        """Cache a resolved token entry"""
+        if self.max_size <= 0:
+            return
+
+        with self._lock:
+            if token in self._entries:
+                self._remove(token)
+
+            self._entries[token] = (time.monotonic() + self.ttl_seconds, entry)
+            self._tokens_by_user.setdefault(entry['user_id'], set()).add(token)
+
+            while len(self._entries) > self.max_size:
+                oldest_token = next(iter(self._entries))
+                self._remove(oldest_token)
+                self.evictions += 1
+
+    def invalidate(self, token):
+        """Drop a single token (e.g. on logout)"""
+        with self._lock:
+            if token in self._entries:
+                self._remove(token)
+                self.invalidations += 1
+
+    def invalidate_user(self, user_id):
+        """Drop every cached token of a user (token rotation, ban, role change)"""
+        with self._lock:
+            for token in list(self._tokens_by_user.get(user_id, ())):
+                self._remove(token)
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tokens_by_user.clear()
+
+    def stats(self):
+        """Return hit/miss counters for monitoring"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations
+            }
+
+    def _remove(self, token):
+        # Caller must hold the lock
+        _, entry = self._entries.pop(token)
+        user_tokens = self._tokens_by_user.get(entry['user_id'])
+        if user_tokens is not None:
+            user_tokens.discard(token)
+            if not user_tokens:
+                del self._tokens_by_user[entry['user_id']]
+
+
+token_cache = TokenCache(
+    max_size=int(os.getenv('TOKEN_CACHE_MAX_SIZE', 10000)),
+    ttl_seconds=int(os.getenv('TOKEN_CACHE_TTL_SECONDS', 60))
+)
@@ -0,0 +1,130 @@
+"""
+Debounced typing indicators
+Typing events only record state: each typist is kept in the presence store
+until TYPING_TTL_SECONDS after their last keystroke event, and the room is
+marked dirty. One background task emits, at most every TYPING_EMIT_INTERVAL_MS
+per room, the change since the last emit for that room, and notices typists
+whose entry expired (closed tab, lost connection). Disconnecting or leaving
+a room clears the socket's entries straight away.
+
+Payloads are the ones the clients already handle: club rooms get
+userTyping {'users', 'isTyping'}; event chat rooms get one user_typing_event
+{'user_id', 'is_typing'} per user whose state changed in the interval.
+"""
+
+import threading
+import time
+from .presence_store import presence
+
+
+class TypingPresence:
+    """Coalesces typing updates per room; emits from a single background task"""
+
+    def __init__(self, store=None):
+        self.store = store or presence
+        self.socketio = None
+        self.emit_interval = 0.5
+        self.ttl_seconds = 5
+        self._dirty = set()
+        self._emitted = {}  # room -> user_ids in the last emit; rooms with typists stay here until empty
+        self._sid_rooms = {}  # sid -> {room: user_id}
+        self._lock = threading.Lock()
+        self._task = None
+        self.updates = 0
+        self.emits = 0
+
+    def init_app(self, app, socketio):
+        """Read the intervals from config and start the emitter task"""
+        self.emit_interval = app.config.get('TYPING_EMIT_INTERVAL_MS', 500) / 1000
+        self.ttl_seconds = app.config.get('TYPING_TTL_SECONDS', self.ttl_seconds)
+        self.socketio = socketio
+        if self._task is None:
+            self._task = socketio.start_background_task(self.run_forever)
+
+    def update(self, sid, room, user_id, is_typing):
+        """Record a typing event from sid; nothing is emitted here"""
+        if is_typing:
+            self.store.touch_typing(room, user_id, time.time() + self.ttl_seconds)
+        else:
+            self.store.clear_typing(room, user_id)
+
+        with self._lock:
+            rooms = self._sid_rooms.setdefault(sid, {})
+            if is_typing:
+                rooms[room] = user_id
+            else:
+                rooms.pop(room, None)
+            self._dirty.add(room)
+            self.updates += 1
+
+    def leave(self, sid, room):
+        """sid left room; stop showing it as typing there"""
+        with self._lock:
+            user_id = self._sid_rooms.get(sid, {}).pop(room, None)
+        if user_id is not None:
+            self.update(sid, room, user_id, False)
+
+    def disconnect(self, sid):
+        """Clear every room sid was typing in"""
+        with self._lock:
+            rooms = self._sid_rooms.pop(sid, {})
+            self._dirty.update(rooms)
+        for room, user_id in rooms.items():
+            self.store.clear_typing(room, user_id)
+
+    def flush(self):
+        """Emit the rooms whose typists changed since their last emit; returns emits sent"""
+        with self._lock:
+            rooms = self._dirty | set(self._emitted)
+            self._dirty = set()
+
+        sent = 0
+        now = time.time()
+        for room in rooms:
+            current = self.store.typing_users(room, now)
+            with self._lock:
+                previous = self._emitted.get(room, set())
+                if current:
+                    self._emitted[room] = current
+                else:
+                    self._emitted.pop(room, None)
+            if current != previous:
+                sent += self._emit(room, previous, current)
+
+        self.emits += sent
+        return sent
+
+    def run_forever(self):
+        while True:
+            self.socketio.sleep(self.emit_interval)
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Error in typing presence: {str(e)}")
+
+    def stats(self):
+        with self._lock:
+            return {
+                'active_rooms': len(self._emitted),
+                'typing_sockets': sum(1 for rooms in self._sid_rooms.values() if rooms),
+                'updates': self.updates,
+                'emits': self.emits
+            }
+
+    def _emit(self, room, previous, current):
+        if room.startswith('event_'):
+            changes = [(user_id, True) for user_id in sorted(current - previous)]
+            changes += [(user_id, False) for user_id in sorted(previous - current)]
+            for user_id, is_typing in changes:
+                # Clients ignore their own user_id
+                self.socketio.emit('user_typing_event', {'user_id': user_id, 'is_typing': is_typing}, to=room)
+            return len(changes)
+
+        if current:
+            self.socketio.emit('userTyping', {'users': sorted(current), 'isTyping': True}, to=room)
+        else:
+            self.socketio.emit('userTyping', {'isTyping': False}, to=room)
+        return 1
+
+
+typing_presence = TypingPresence()
\ No newline at end of file
@@ -0,0 +1,97 @@
+"""
+Unread notification count cache
+Hot per-user unread totals kept in process so unread-count polling and socket
+requests do not hit the database. Writers adjust or invalidate entries after
+they commit; a version per user stops a reader that computed a count before
+a write from storing it afterwards. A new broadcast invalidates everyone.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class UnreadCountCache:
+    """TTL + LRU cache of user_id -> unread count with hit/miss counters"""
+
+    def __init__(self, max_size=10000, ttl_seconds=60):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()  # user_id -> (expires_at, version, count)
+        self._versions = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def init_app(self, app):
+        self.max_size = app.config.get('UNREAD_CACHE_MAX_SIZE', self.max_size)
+        self.ttl_seconds = app.config.get('UNREAD_CACHE_TTL_SECONDS', self.ttl_seconds)
+
+    def version(self, user_id):
+        """Read before computing a count and pass to set()"""
+        with self._lock:
+            return (self._generation, self._versions.get(user_id, 0))
+
+    def get(self, user_id):
+        with self._lock:
+            item = self._entries.get(user_id)
+            if item is not None:
+                expires_at, version, count = item
+                if expires_at >= time.monotonic() and version == (self._generation, self._versions.get(user_id, 0)):
+                    self._entries.move_to_end(user_id)
+                    self.hits += 1
+                    return count
+                del self._entries[user_id]
+            self.misses += 1
+            return None
+
+    def set(self, user_id, version, count):
+        with self._lock:
+            if version != (self._generation, self._versions.get(user_id, 0)):
+                return
+            self._store(user_id, version, count)
+
+    def adjust(self, user_ids, delta):
+        """Apply delta to the cached counts of user_ids (uncached users stay uncached)"""
+        with self._lock:
+            for user_id in user_ids:
+                item = self._entries.get(user_id)
+                self._versions[user_id] = self._versions.get(user_id, 0) + 1
+                version = (self._generation, self._versions[user_id])
+                if item is None or item[0] < time.monotonic() or item[1][0] != self._generation:
+                    self._entries.pop(user_id, None)
+                    continue
+                self._store(user_id, version, max(item[2] + delta, 0))
+
+    def invalidate(self, *user_ids):
+        with self._lock:
+            for user_id in user_ids:
+                self._versions[user_id] = self._versions.get(user_id, 0) + 1
+                self._entries.pop(user_id, None)
+
+    def invalidate_all(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+    def _store(self, user_id, version, count):
+        self._entries[user_id] = (time.monotonic() + self.ttl_seconds, version, count)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+
+unread_counts = UnreadCountCache()
\ No newline at end of file
@@ -0,0 +1,27 @@
+"""
+Standalone job worker
+Runs the job queue workers in their own process, so the web process can set
+JOB_WORKER_THREADS=0 and serve requests only. Schedulers and other background
+tasks are left to the web process.
+
+Usage:
+    python -m Backend.worker [--threads N] [--queue NAME ...]
+"""
+import argparse
+import os
+from Backend import create_app
+from Backend.tasks.job_queue import job_workers
+
+def main():
+    parser = argparse.ArgumentParser(description='Run background job workers')
+    parser.add_argument('--threads', type=int, default=int(os.getenv('JOB_WORKER_PROCESS_THREADS', 4)))
+    parser.add_argument('--queue', action='append', dest='queues',
+                        help='Only claim jobs from this queue (repeatable); default is all queues')
+    args = parser.parse_args()
+
+    app = create_app(start_background_tasks=False)
+    print(f"✓ Job worker process started ({args.threads} threads, queues: {', '.join(args.queues or ['all'])})")
+    job_workers.run_forever(app, args.threads, queues=args.queues)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
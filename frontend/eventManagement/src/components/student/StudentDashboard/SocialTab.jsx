@@ -101,41 +101,39 @@ const SocialTab = () => {
     fetchCurrentUser();
   }, [apiCall]);
 
-  useEffect(() => {
-    const fetchPosts = async () => {
-      try {
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+
+  // One page of the feed; pass the previous page's next_cursor to append the following page
+  const fetchPosts = useCallback(async (cursor = null) => {
+    try {
+      if (cursor) {
+        setLoadingMore(true);
+      } else {
         setLoading(true);
-        const response = await apiCall('/social/posts');
-        
-        console.log('API Response:', response); // Debug log
-        
-        let postsData = [];
-        
-        if (Array.isArray(response)) {
-          postsData = response;
-        } else if (response && Array.isArray(response.posts)) {
-          postsData = response.posts;
-        } else if (response && Array.isArray(response.data)) {
-          postsData = response.data;
-        } else {
-          const possibleArrays = Object.values(response || {}).filter(item => Array.isArray(item));
-          postsData = possibleArrays.length > 0 ? possibleArrays[0] : [];
-        }
-        
-        setPosts(postsData);
-        setFilteredPosts(postsData);
-      } catch (err) {
-        console.error('Error fetching posts:', err);
-        setError(err.message || 'Failed to load posts');
+      }
+      const response = await apiCall(`/social/feed${cursor ? `?cursor=${encodeURIComponent(cursor)}` : ''}`);
+      const postsData = Array.isArray(response?.posts) ? response.posts : [];
+
+      setPosts(prev => (cursor ? [...prev, ...postsData] : postsData));
+      setNextCursor(response?.next_cursor || null);
+    } catch (err) {
+      console.error('Error fetching posts:', err);
+      setError(err.message || 'Failed to load posts');
+      if (!cursor) {
         setPosts([]);
         setFilteredPosts([]);
-      } finally {
-        setLoading(false);
       }
-    };
-    fetchPosts();
+    } finally {
+      setLoading(false);
+      setLoadingMore(false);
+    }
   }, [apiCall]);
 
+  useEffect(() => {
+    fetchPosts();
+  }, [fetchPosts]);
+
   useEffect(() => {
     const postsArray = Array.isArray(posts) ? posts : [];
     
@@ -619,6 +617,21 @@ const SocialTab = () => {
         </Grid>
       )}
 
+      {/* Next feed page */}
+      {nextCursor && (
+        <Box textAlign="center" mt={3}>
+          <Button
+            variant="outlined"
+            size="small"
+            onClick={() => fetchPosts(nextCursor)}
+            disabled={loadingMore}
+            startIcon={loadingMore ? <CircularProgress size={16} /> : null}
+          >
+            {loadingMore ? 'Loading...' : 'Load more'}
+          </Button>
+        </Box>
+      )}
+
       {/* Confirmation Dialog */}
       <Dialog 
         open={dialogOpen} 